@@ -0,0 +1,89 @@
+"""import_time.py - Cold-start guard for the headless core
+
+Imports each module in a fresh interpreter several times and checks that
+  * no heavy dependency (Streamlit, transformers, torch, Plotly, Matplotlib) is pulled in
+  * the median import time stays under the budget
+
+Usage (from the repository root):
+    python benchmarks/import_time.py [--repeats 7] [--budget-ms 300] [--out results.json]
+
+Exits with status 1 if a guard is violated.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Modules that must stay cheap to import (headless entry points)
+MODULES = [
+    "fearsense.core",
+    "backend.fear_monger_processor.model",
+    "backend.fear_monger_processor.inference",
+    "backend.fear_monger_processor.transcript",
+]
+
+HEAVY = ["streamlit", "transformers", "torch", "plotly", "matplotlib", "onnxruntime", "nltk"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(module, repeats):
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # any value, even "0", disables .pyc writes
+    samples, heavy = [], set()
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy.update(result["heavy"])
+
+    samples.sort()
+    return {
+        "module": module,
+        "repeats": repeats,
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 2),
+        "max_ms": round(samples[-1], 2),
+        "heavy_imports": sorted(heavy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard cold-start import time of the headless core.")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Max allowed median import time per module")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeats) for module in MODULES]
+    failures = []
+    for result in results:
+        if result["heavy_imports"]:
+            failures.append(f"{result['module']} imports {', '.join(result['heavy_imports'])}")
+        if result["p50_ms"] > args.budget_ms:
+            failures.append(f"{result['module']} p50 {result['p50_ms']} ms > budget {args.budget_ms} ms")
+
+    report = {"budget_ms": args.budget_ms, "results": results, "failures": failures}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
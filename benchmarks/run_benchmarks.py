@@ -0,0 +1,236 @@
+"""run_benchmarks.py - Offline benchmark suite for the fear-scoring pipeline
+
+Runs every stage on synthetic transcripts with a tiny randomly initialised
+DistilBERT (no downloads, no score cache) and writes percentiles as JSON:
+
+    segment_text         per transcript size / sentence shape
+    tokenize             padded batch tokenization of the segments
+    run_inference        per engine x batch size x thread count
+    create_analysis_df   DataFrame + smoothing for the scored segments
+    align_fear_and_heart alignment with a synthetic heart-rate series (+ Plotly figure)
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py [--size medium] [--engines pytorch onnx]
+        [--batch-sizes 1 8 16 32] [--threads 1 4] [--repeats 5] [--out results.json]
+        [--baseline previous.json --tolerance 0.2]
+
+With --baseline, every benchmark whose p50 got slower by more than
+`tolerance` is listed under "regressions" and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from synthetic import TRANSCRIPT_SIZES, generate_corpus  # noqa: E402
+from tiny_model import build_tiny_model, load_tiny_onnx, load_tiny_pipeline  # noqa: E402
+
+
+# ======================================================
+# TIMING
+# ======================================================
+def summarize(samples_ms, items=None):
+    """Percentiles of a list of wall-clock samples (ms); adds throughput if `items` is given"""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    stats = {
+        "runs": len(samples),
+        "mean_ms": round(float(samples.mean()), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p90_ms": round(float(np.percentile(samples, 90)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+    }
+    if items:
+        stats["items"] = items
+        stats["items_per_s"] = round(items / max(stats["p50_ms"] / 1000, 1e-9), 2)
+    return stats
+
+
+def measure(fn, repeats, warmup=1, items=None):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples, items)
+
+
+# ======================================================
+# STAGES
+# ======================================================
+def bench_segmentation(corpus, repeats):
+    from backend.fear_monger_processor.utils import segment_text
+
+    results, segments = {}, {}
+    for name, text in corpus.items():
+        segments[name] = segment_text(text)
+        results[f"segment_text/{name}"] = measure(lambda: segment_text(text), repeats, items=len(segments[name]))
+    return results, segments
+
+
+def bench_tokenization(segments, tokenizer, repeats, batch_size=16):
+    from backend.fear_monger_processor.config import MAX_TOKENS
+
+    def tokenize(paragraphs):
+        for start in range(0, len(paragraphs), batch_size):
+            tokenizer(paragraphs[start:start + batch_size], padding=True, truncation=True,
+                      max_length=MAX_TOKENS, return_tensors="np")
+
+    return {
+        f"tokenize/{name}": measure(lambda: tokenize(paragraphs), repeats, items=len(paragraphs))
+        for name, paragraphs in segments.items()
+    }
+
+
+def _classifiers(model_dir, engines, threads):
+    """Yield (engine, threads, classifier) for every requested combination"""
+    for engine in engines:
+        for n_threads in threads:
+            if engine == "pytorch":
+                import torch
+                torch.set_num_threads(n_threads)
+                yield engine, n_threads, load_tiny_pipeline(model_dir)
+            elif engine == "onnx":
+                try:
+                    classifier = load_tiny_onnx(model_dir, intra_op_threads=n_threads)
+                except ImportError as exc:
+                    print(f"Skipping onnx engine: {exc}", file=sys.stderr)
+                    break
+                yield engine, n_threads, classifier
+            else:
+                raise ValueError(f"Unknown engine {engine!r} (expected 'pytorch' or 'onnx')")
+
+
+def bench_inference(paragraphs, model_dir, engines, batch_sizes, threads, repeats):
+    from backend.fear_monger_processor.inference import run_inference
+
+    results = {}
+    for engine, n_threads, classifier in _classifiers(model_dir, engines, threads):
+        for batch_size in batch_sizes:
+            results[f"run_inference/{engine}/bs{batch_size}/t{n_threads}"] = measure(
+                lambda: run_inference(classifier, paragraphs, batch_size=batch_size,
+                                      show_progress=False, use_cache=False),
+                repeats,
+                items=len(paragraphs),
+            )
+    return results
+
+
+def bench_analysis(paragraphs, repeats, seed=0):
+    import pandas as pd
+    from backend.fear_monger_processor.utils import assign_timestamps, create_analysis_df
+    from backend.fitbit_app.aligner import align_fear_and_heart
+
+    rng = np.random.default_rng(seed)
+    scores = rng.random(len(paragraphs), dtype=np.float32)
+    timestamps = assign_timestamps(paragraphs)
+
+    results = {"create_analysis_df": measure(
+        lambda: create_analysis_df(paragraphs, timestamps, scores, smoothing_window=7), repeats, items=len(paragraphs)
+    )}
+
+    # One heart-rate reading per second across the playback window
+    fear_df = create_analysis_df(paragraphs, timestamps, scores, smoothing_window=7)
+    start = pd.Timestamp("2025-01-01 12:00:00", tz="US/Eastern")
+    end = start + pd.Timedelta(minutes=10)
+    heart_df = pd.DataFrame({
+        "datetime": pd.date_range(start, end, freq="1s"),
+        "value": rng.normal(75, 8, 601).round(),
+    })
+
+    def align():
+        with contextlib.redirect_stdout(io.StringIO()):  # the aligner logs with print()
+            align_fear_and_heart(fear_df, heart_df, start, end)
+
+    results["align_fear_and_heart"] = measure(align, repeats, items=len(paragraphs))
+    return results
+
+
+# ======================================================
+# REPORT
+# ======================================================
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    versions = {}
+    for module in ("numpy", "pandas", "torch", "transformers", "onnxruntime"):
+        with contextlib.suppress(ImportError):
+            versions[module] = __import__(module).__version__
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "versions": versions,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Benchmarks whose p50 grew by more than `tolerance` (fraction) versus the baseline run"""
+    regressions = {}
+    for name, stats in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before and before["p50_ms"] > 0:
+            change = stats["p50_ms"] / before["p50_ms"] - 1
+            if change > tolerance:
+                regressions[name] = {"before_p50_ms": before["p50_ms"], "after_p50_ms": stats["p50_ms"],
+                                     "change": round(change, 3)}
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic transcripts with a tiny model.")
+    parser.add_argument("--size", default="medium", choices=list(TRANSCRIPT_SIZES))
+    parser.add_argument("--engines", nargs="+", default=["pytorch"], choices=["pytorch", "onnx"])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 16, 32])
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--model-dir", default=None, help="Where to keep the tiny model (default: a temp dir)")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown before flagging")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = build_tiny_model(args.model_dir or Path(tmp) / "tiny-distilbert")
+        corpus = generate_corpus(args.size)
+
+        results, segments = bench_segmentation(corpus, args.repeats)
+        results.update(bench_tokenization(segments, load_tiny_pipeline(model_dir).tokenizer, args.repeats))
+
+        # Inference and analysis run on the mixed-shape transcript (closest to real talks)
+        paragraphs = segments[f"{args.size}/mixed"]
+        results.update(bench_inference(paragraphs, model_dir, args.engines, sorted(set(args.batch_sizes)),
+                                       sorted(set(args.threads)), args.repeats))
+        results.update(bench_analysis(paragraphs, args.repeats))
+
+    report = {"environment": environment(), "config": vars(args), "results": results}
+    if args.baseline:
+        report["regressions"] = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""synthetic.py - Reproducible synthetic transcripts for benchmarks
+
+Transcripts mix neutral narration, fear-mongering sentences, stage directions
+such as "(Laughter)" and repeated boilerplate, with short, medium and run-on
+sentences so segmentation and padding behave like real TED / YouTube text.
+"""
+import random
+
+NEUTRAL_WORDS = (
+    "people research study city music science school family story history data water energy "
+    "design language health market children world idea team project learning question answer "
+    "garden museum journey book planet ocean forest computer network engineer artist teacher"
+).split()
+
+FEAR_WORDS = (
+    "crisis danger disaster collapse threat deadly panic catastrophe attack poison chaos "
+    "emergency terror victims destroy warning invasion starve toxic doom"
+).split()
+
+CONNECTORS = "and but because so while when although however then also".split()
+
+STAGE_DIRECTIONS = ["(Laughter)", "(Applause)", "(Music)", "Thank you.", "Thank you so much."]
+
+BOILERPLATE = [
+    "Before we start, please like and subscribe and hit the bell for more videos like this one.",
+    "This episode is brought to you by our sponsor, who makes everything a little bit easier.",
+]
+
+# Sentence length profiles in words: (min, max)
+SENTENCE_SHAPES = {"short": (4, 10), "medium": (10, 25), "long": (25, 70)}
+
+# Transcript sizes in sentences
+TRANSCRIPT_SIZES = {"small": 30, "medium": 300, "large": 1500}
+
+# Vocabulary the tiny benchmark tokenizer needs to cover (see tiny_model.py)
+VOCABULARY = sorted(set(NEUTRAL_WORDS + FEAR_WORDS + CONNECTORS + [
+    w.strip(".,()").lower() for line in STAGE_DIRECTIONS + BOILERPLATE for w in line.split()
+]))
+
+
+def _sentence(rng, shape, fear_rate):
+    low, high = SENTENCE_SHAPES[shape]
+    words = []
+    for _ in range(rng.randint(low, high)):
+        pool = FEAR_WORDS if rng.random() < fear_rate else NEUTRAL_WORDS
+        words.append(rng.choice(pool))
+        if rng.random() < 0.08:
+            words.append(rng.choice(CONNECTORS))
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + rng.choice([".", ".", ".", "!", "?"])
+
+
+def generate_transcript(n_sentences, shape="mixed", fear_rate=0.1, seed=0):
+    """One synthetic transcript with `n_sentences` sentences.
+
+    shape: "short", "medium", "long" or "mixed" (random per sentence).
+    fear_rate: probability that a word is a fear cue.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(n_sentences):
+        roll = rng.random()
+        if roll < 0.04:
+            sentences.append(rng.choice(STAGE_DIRECTIONS))
+        elif roll < 0.06:
+            sentences.append(rng.choice(BOILERPLATE))
+        else:
+            sentence_shape = rng.choice(list(SENTENCE_SHAPES)) if shape == "mixed" else shape
+            sentences.append(_sentence(rng, sentence_shape, fear_rate))
+    return " ".join(sentences)
+
+
+def generate_corpus(size="medium", shapes=("short", "medium", "long", "mixed"), seed=0):
+    """{name: transcript} for every sentence shape at one transcript size"""
+    return {
+        f"{size}/{shape}": generate_transcript(TRANSCRIPT_SIZES[size], shape=shape, seed=seed + i)
+        for i, shape in enumerate(shapes)
+    }
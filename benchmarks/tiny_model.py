@@ -0,0 +1,77 @@
+"""tiny_model.py - Tiny randomly initialised DistilBERT classifier for offline benchmarks
+
+Same architecture and label names as the production fear model, with about
+a hundred thousand parameters instead of 66M and a WordPiece vocabulary generated from
+the synthetic transcript words. Nothing is downloaded.
+"""
+import string
+from pathlib import Path
+
+from synthetic import VOCABULARY
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+LABELS = ["Non_Fear_Mongering", "Fear_Mongering"]
+
+
+def _vocab():
+    # Whole words first, then single characters (plain and "##" continuation) so any word can be split
+    chars = list(string.ascii_lowercase + string.digits + string.punctuation)
+    tokens = SPECIAL_TOKENS + VOCABULARY + chars + [f"##{c}" for c in string.ascii_lowercase + string.digits]
+    return list(dict.fromkeys(tokens))  # a token may only appear once in vocab.txt
+
+
+def build_tiny_model(out_dir, seed=0, dim=64, layers=2, heads=2, max_positions=512):
+    """Write a random DistilBERT sequence classifier + tokenizer to `out_dir` (once) and return the path"""
+    out_dir = Path(out_dir)
+    if (out_dir / "config.json").exists():
+        return out_dir
+
+    import torch
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vocab_file = out_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(_vocab()) + "\n")
+
+    tokenizer = DistilBertTokenizerFast(vocab_file=str(vocab_file), do_lower_case=True, model_max_length=max_positions)
+    config = DistilBertConfig(
+        vocab_size=len(tokenizer),
+        dim=dim,
+        hidden_dim=dim * 4,
+        n_layers=layers,
+        n_heads=heads,
+        max_position_embeddings=max_positions,
+        id2label=dict(enumerate(LABELS)),
+        label2id={label: i for i, label in enumerate(LABELS)},
+    )
+
+    torch.manual_seed(seed)
+    model = DistilBertForSequenceClassification(config).eval()
+    model.save_pretrained(out_dir)
+    tokenizer.save_pretrained(out_dir)
+    return out_dir
+
+
+def load_tiny_pipeline(model_dir):
+    """text-classification pipeline over the tiny model, configured like model.build_pipeline"""
+    from transformers import AutoTokenizer, pipeline
+
+    from backend.fear_monger_processor.config import MAX_TOKENS
+
+    return pipeline(
+        "text-classification",
+        model=str(model_dir),
+        tokenizer=AutoTokenizer.from_pretrained(model_dir),
+        truncation=True,
+        max_length=MAX_TOKENS,
+        top_k=1,
+    )
+
+
+def load_tiny_onnx(model_dir, quantize=True, intra_op_threads=0):
+    """ONNX engine over the tiny model (exported next to it on first use); needs onnxruntime"""
+    from backend.fear_monger_processor.onnx_engine import OnnxTextClassifier, export_onnx
+
+    onnx_dir = Path(model_dir) / "onnx"
+    export_onnx(model_name=str(model_dir), out_dir=onnx_dir, quantize=quantize)
+    return OnnxTextClassifier(onnx_dir, quantized=quantize, intra_op_threads=intra_op_threads)
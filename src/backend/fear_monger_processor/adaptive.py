@@ -0,0 +1,150 @@
+"""adaptive.py - Coarse-to-fine adaptive scoring for a variable-resolution fear timeline
+
+The transcript is first scored in large segments (ADAPTIVE_COARSE_CHARS).
+Each level halves the segment size, down to the normal segment size. At each
+level, only regions that need more detail are split and their parts re-scored:
+- regions scoring within ADAPTIVE_MARGIN of the threshold;
+- regions whose score differs from a neighbour's by at least ADAPTIVE_JUMP.
+
+Uniformly calm (or uniformly alarming) stretches keep one coarse score. All
+regions refined on a level are scored together in one run_inference call.
+
+Usage (forward passes vs. fixed fine-grained segmentation on TED talks):
+    cd src && python -m backend.fear_monger_processor.adaptive [--limit 5]
+"""
+import argparse
+import datetime
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from backend.fear_monger_processor.config import (
+    ADAPTIVE_COARSE_CHARS, ADAPTIVE_JUMP, ADAPTIVE_MARGIN, DATA_DIR, DEFAULT_FEAR_THRESHOLD, FIXED_DURATION,
+    MAX_CHARS, MAX_SENTENCES,
+)
+from backend.fear_monger_processor.inference import run_inference
+from backend.fear_monger_processor.utils import group_sentences, split_sentences
+
+
+def resolution_levels(coarse_chars=ADAPTIVE_COARSE_CHARS, fine_chars=MAX_CHARS, max_sentences=MAX_SENTENCES):
+    """(max_chars, max_sentences) per level, coarsest first, halving down to the fine segment size.
+
+    Either limit may be unbounded (inf), as in the apps' "Characters" and "Sentences" modes;
+    the other limit then sets the resolution.
+    """
+    levels = []
+    if math.isinf(fine_chars):
+        # No character limit: coarsen by sentence count instead, in the ratio of the default sizes
+        sentences = 0 if math.isinf(max_sentences) else max_sentences * max(coarse_chars // MAX_CHARS, 1)
+        while sentences > max_sentences:
+            levels.append((fine_chars, sentences))
+            sentences //= 2
+        return levels + [(fine_chars, max_sentences)]
+
+    chars = max(coarse_chars, fine_chars)
+    while chars > fine_chars:
+        sentences = max_sentences
+        if not math.isinf(max_sentences):
+            sentences = max(max_sentences, round(max_sentences * chars / fine_chars))
+        levels.append((chars, sentences))
+        chars //= 2
+    levels.append((fine_chars, max_sentences))
+    return levels
+
+
+def needs_refinement(scores, threshold=DEFAULT_FEAR_THRESHOLD, margin=ADAPTIVE_MARGIN, jump=ADAPTIVE_JUMP):
+    """Mask of regions that are near the threshold or sit at a sharp change between neighbours"""
+    scores = np.asarray(scores, dtype=np.float32)
+    refine = np.abs(scores - threshold) <= margin
+    sharp = np.abs(np.diff(scores)) >= jump
+    refine[:-1] |= sharp  # the region before the jump
+    refine[1:] |= sharp  # and the one after it
+    return refine
+
+
+def adaptive_score(classifier, text, threshold=DEFAULT_FEAR_THRESHOLD, margin=ADAPTIVE_MARGIN, jump=ADAPTIVE_JUMP,
+                   coarse_chars=ADAPTIVE_COARSE_CHARS, fine_chars=MAX_CHARS, max_sentences=MAX_SENTENCES,
+                   duration=FIXED_DURATION, **inference_kwargs):
+    """Score `text` coarse-to-fine.
+
+    Returns (paragraphs, timestamps, scores, stats):
+    - `paragraphs`: the variable-length regions in reading order;
+    - `timestamps`: like assign_timestamps, but placed by character position over `duration`,
+      plus a `level` column (0 = coarsest);
+    - `scores`: float32 fear scores;
+    - `stats`: segments scored vs. the fixed fine-grained segmentation.
+    """
+    inference_kwargs.setdefault("show_progress", False)
+    sentences = split_sentences(text)
+    levels = resolution_levels(coarse_chars, fine_chars, max_sentences)
+    fine_segments = len(group_sentences(sentences, fine_chars, max_sentences))
+
+    # Regions are (start, end) sentence ranges; level-0 regions cover the whole transcript
+    regions = group_sentences(sentences, *levels[0])
+    region_levels = [0] * len(regions)
+    scores = run_inference(classifier, [" ".join(sentences[s:e]) for s, e in regions], **inference_kwargs)
+    scored = len(regions)
+
+    for level, (level_chars, level_sentences) in enumerate(levels[1:], start=1):
+        refine = needs_refinement(scores, threshold, margin, jump) if len(regions) else []
+        next_regions, next_levels, next_scores, pending = [], [], [], []
+        for (start, end), region_level, score, flag in zip(regions, region_levels, scores, refine):
+            parts = group_sentences(sentences[start:end], level_chars, level_sentences) if flag else []
+            if len(parts) > 1:
+                for a, b in parts:
+                    pending.append(len(next_regions))
+                    next_regions.append((start + a, start + b))
+                    next_levels.append(level)
+                    next_scores.append(np.nan)
+            else:  # settled, or already at this level's size
+                next_regions.append((start, end))
+                next_levels.append(region_level)
+                next_scores.append(score)
+
+        if not pending:
+            break
+        next_scores = np.asarray(next_scores, dtype=np.float32)
+        next_scores[pending] = run_inference(
+            classifier, [" ".join(sentences[slice(*next_regions[i])]) for i in pending], **inference_kwargs
+        )
+        regions, region_levels, scores = next_regions, next_levels, next_scores
+        scored += len(pending)
+
+    # Place each region on the timeline by the character offset of its first sentence
+    offsets = np.concatenate([[0], np.cumsum([len(s) + 1 for s in sentences])])
+    total = max(offsets[-1], 1)
+    seconds = [duration * offsets[start] / total for start, _ in regions]
+    timestamps = pd.DataFrame({
+        "seconds": seconds,
+        "timestamp_str": [str(datetime.timedelta(seconds=int(sec))) for sec in seconds],
+        "level": region_levels,
+    })
+
+    stats = {
+        "levels": len(levels),
+        "segments": len(regions),
+        "segments_scored": scored,
+        "fine_segments": fine_segments,
+        "forward_pass_ratio": round(scored / fine_segments, 4) if fine_segments else 0.0,
+    }
+    paragraphs = [" ".join(sentences[s:e]) for s, e in regions]
+    return paragraphs, timestamps, np.asarray(scores, dtype=np.float32), stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare adaptive scoring with fixed fine-grained segmentation.")
+    parser.add_argument("--limit", type=int, default=5, help="Number of TED talks to score")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_FEAR_THRESHOLD)
+    args = parser.parse_args()
+
+    from backend.fear_monger_processor.model import load_classifier
+
+    transcripts = pd.read_csv(DATA_DIR / "ted_talks_transcripts.csv").head(args.limit)
+    classifier = load_classifier()
+    report = []
+    for transcript in transcripts["transcript"].dropna():
+        _, _, _, stats = adaptive_score(classifier, transcript, threshold=args.threshold, use_cache=False)
+        report.append(stats)
+    print(json.dumps(report, indent=2))
@@ -1,12 +1,13 @@
 """quick_check_app.py - Fear Mongering Quick Check Tool"""
 import re
-import time
 import datetime
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 from transformers import pipeline, AutoTokenizer
 from backend.fear_monger_processor.config import DEFAULT_FEAR_THRESHOLD, MODEL_NAME, MAX_CHARS
+from backend.fear_monger_processor.inference import run_inference as run_batched_inference
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 from nltk.tokenize import sent_tokenize
@@ -28,18 +29,8 @@ def load_classifier():
 
 @st.cache_data
 def run_inference(_classifier, paragraphs):
-    """Run classifier on paragraphs with progress bar"""
-    results = []
-    progress = st.progress(0)
-
-    for i, para in enumerate(paragraphs):
-        prediction = _classifier(para)
-        results.append(prediction)  # Keep nesting intact for flattening
-        progress.progress((i + 1) / len(paragraphs))
-        time.sleep(0.05)
-
-    progress.empty()
-    return results
+    """Run classifier on paragraphs in length-sorted batches with progress bar"""
+    return run_batched_inference(_classifier, paragraphs)  # float32 fear probability per paragraph
 
 
 # ======================================================
@@ -103,25 +94,9 @@ def smooth_scores(scores, window=3):
     return pd.Series(scores).rolling(window=window, min_periods=1, center=True).mean().tolist()
 
 
-def extract_fear_score(prediction):
-    """Extract Fear_Mongering score from nested prediction list."""
-    # Flatten if nested
-    if isinstance(prediction, list) and len(prediction) == 1 and isinstance(prediction[0], list):
-        prediction = prediction[0]
-
-    if isinstance(prediction, list):
-        for label_score in prediction:
-            if label_score.get("label") == "Fear_Mongering":
-                return round(label_score.get("score", 0.0), 4)
-    elif isinstance(prediction, dict):
-        if prediction.get("label") == "Fear_Mongering":
-            return round(prediction.get("score", 0.0), 4)
-    return 0.0
-
-
 def create_analysis_df(paragraphs, timestamps, predictions, smoothing_window=3):
     """Create analysis dataframe with smoothing"""
-    fear_scores = [extract_fear_score(pred) for pred in predictions]
+    fear_scores = np.asarray(predictions, dtype=np.float32)  # run_inference returns fear probabilities
     fear_scores_smoothed = smooth_scores(fear_scores, window=smoothing_window)
     return pd.DataFrame({
         "Timestamp": timestamps["timestamp_str"],
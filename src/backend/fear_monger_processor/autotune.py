@@ -0,0 +1,165 @@
+"""autotune.py - One-off calibration of batch size and CPU threads per host
+
+The best batch size and thread count depend on the machine (4 vs 64 cores)
+and on segment length. A short sweep over both is run once, the fastest
+configuration is stored in TUNING_PATH keyed by host + engine + model, and
+every later load on that host reuses it.
+
+Usage:
+    cd src && python -m backend.fear_monger_processor.autotune [--engine pytorch] [--force]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import threading
+import time
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import (
+    AUTOTUNE_BATCH_SIZES, AUTOTUNE_SEGMENTS, ENGINE, MODEL_NAME, MODEL_REVISION, PRECISION, TUNING_PATH,
+)
+from backend.fear_monger_processor.reference import REFERENCE_PARAGRAPHS
+
+_file_lock = threading.Lock()
+
+
+def host_key(engine=ENGINE, precision=PRECISION):
+    """Tuning entries are only valid for the same machine, engine, precision and model commit"""
+    if engine == "pytorch":
+        engine = f"{engine}-{precision}"  # bf16 / int8 kernels favour different batch sizes than fp32
+    return f"{platform.node()}/{os.cpu_count()}cpu/{engine}/{MODEL_NAME}@{resolve_revision(MODEL_NAME, MODEL_REVISION)}"
+
+
+def thread_candidates(cores=None):
+    """1, 2, 4, ... up to the core count, plus the core count itself"""
+    cores = cores or os.cpu_count() or 1
+    candidates = {cores}
+    n = 1
+    while n < cores:
+        candidates.add(n)
+        n *= 2
+    return sorted(candidates)
+
+
+def load_tuning(engine=ENGINE, path=TUNING_PATH, precision=PRECISION):
+    """Stored tuning for this host + engine + precision, or None"""
+    try:
+        return json.loads(path.read_text()).get(host_key(engine, precision))
+    except (OSError, ValueError):
+        return None
+
+
+def save_tuning(tuning, engine=ENGINE, path=TUNING_PATH, precision=PRECISION, aliases=()):
+    """Store `tuning` for this host + engine + precision, and under each precision in `aliases`"""
+    with _file_lock:
+        try:
+            entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        for name in (precision, *aliases):
+            entries[host_key(engine, name)] = tuning
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entries, indent=2))
+        tmp.replace(path)  # atomic, so concurrent readers never see a half-written file
+
+
+def _set_threads(engine, classifier, threads):
+    """Apply an intra-op thread count; returns the classifier to time (ONNX needs a new session)"""
+    if engine == "onnx":
+        from backend.fear_monger_processor.model import build_classifier
+        return build_classifier(engine, threads=threads, autotune=False)
+
+    import torch
+    torch.set_num_threads(threads)
+    return classifier
+
+
+def sweep(classifier, engine=ENGINE, paragraphs=None, batch_sizes=AUTOTUNE_BATCH_SIZES, threads=None, repeats=1):
+    """Time every batch size x thread count on representative segments; returns one row per configuration.
+
+    Calls predict_proba on full batches of exactly `batch_size` segments (cycled from
+    `paragraphs`), bypassing dedup and the score cache, so every configuration runs
+    at least AUTOTUNE_SEGMENTS real forward items.
+    """
+    from backend.fear_monger_processor.inference import predict_proba
+
+    paragraphs = list(paragraphs or REFERENCE_PARAGRAPHS)
+
+    rows = []
+    for n_threads in threads or thread_candidates():
+        timed = _set_threads(engine, classifier, n_threads)
+        predict_proba(timed, paragraphs[:4])  # warm up this thread pool / session
+
+        for batch_size in batch_sizes:
+            n_batches = -(-AUTOTUNE_SEGMENTS // batch_size)
+            cycle = itertools.cycle(paragraphs)
+            batches = [list(itertools.islice(cycle, batch_size)) for _ in range(n_batches)]
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                for batch in batches:
+                    predict_proba(timed, batch)
+                best = min(best, time.perf_counter() - start)
+            rows.append({
+                "threads": n_threads,
+                "batch_size": batch_size,
+                "items_per_s": round(n_batches * batch_size / best, 2),
+            })
+    return rows
+
+
+def calibrate(classifier, engine=ENGINE, paragraphs=None, path=TUNING_PATH, precision=PRECISION, **sweep_kwargs):
+    """Sweep, persist the throughput-optimal configuration for this host and return it.
+
+    The result is stored under the precision that actually ran and under the
+    requested one, so a load that fell back (e.g. bf16 -> fp32) finds it next time.
+    For the PyTorch engine the winning thread count is left applied.
+    """
+    rows = sweep(classifier, engine=engine, paragraphs=paragraphs, **sweep_kwargs)
+    best = max(rows, key=lambda row: row["items_per_s"])
+    tuning = {
+        "batch_size": best["batch_size"],
+        "threads": best["threads"],
+        "items_per_s": best["items_per_s"],
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sweep": rows,
+    }
+    resolved = getattr(classifier, "precision", precision)
+    save_tuning(tuning, engine=engine, path=path, precision=resolved,
+                aliases=(precision,) if precision != resolved else ())
+
+    if engine != "onnx":
+        _set_threads(engine, classifier, tuning["threads"])
+    return tuning
+
+
+def apply_interop_threads(threads=1):
+    """Cap PyTorch inter-op threads; only possible before any parallel work ran in this process"""
+    import torch
+    try:
+        torch.set_num_interop_threads(threads)
+    except RuntimeError:
+        pass  # already fixed for this process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the fastest batch size and thread count on this host.")
+    parser.add_argument("--engine", default="pytorch" if ENGINE == "server" else ENGINE, choices=["pytorch", "onnx"])
+    parser.add_argument("--force", action="store_true", help="Re-run the sweep even if this host is already tuned")
+    parser.add_argument("--precision", default=PRECISION, choices=["fp32", "bf16", "int8"],
+                        help="PyTorch engine precision to tune for")
+    args = parser.parse_args()
+
+    from backend.fear_monger_processor.model import build_classifier
+
+    key = host_key(args.engine, args.precision)
+    existing = load_tuning(args.engine, precision=args.precision)
+    if existing and not args.force:
+        print(json.dumps({key: existing}, indent=2))
+    else:
+        classifier = build_classifier(args.engine, autotune=False, precision=args.precision)
+        result = calibrate(classifier, engine=args.engine, precision=args.precision)
+        print(json.dumps({key: result}, indent=2))
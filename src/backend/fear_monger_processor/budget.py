@@ -0,0 +1,230 @@
+"""budget.py - Latency-budgeted scoring with approximate fallbacks
+
+The cost of a scoring call is estimated before any model run:
+    uncached model tokens / measured throughput (tokens per second, EWMA per model)
+If the estimate fits the budget, every paragraph is scored as usual. Otherwise
+the call degrades, and the result is flagged as approximate:
+- "sampled": an evenly spaced sample of the uncached paragraphs, as large as
+  the budget allows, is scored. The paragraphs in between are interpolated from
+  their scored neighbours on the timeline.
+- "lexical": when even BUDGET_MIN_SAMPLE_FRACTION would not fit, the lexical
+  scorer (lexical.py) is used.
+Cached paragraphs always keep their exact score. A degraded call also starts
+full-fidelity scoring in the background, at "batch" priority. Its scores land
+in the score cache, so the next call for the same text is exact and fast.
+Background jobs of all sessions share one executor of BUDGET_BACKGROUND_WORKERS threads.
+Pass a superseded job to cancel_background(), so it does not hold up the next one.
+
+    scores, info = score_within_budget(classifier, paragraphs, budget_s=2.0)
+    if info["approximate"]:
+        scores = info["background"].result()  # or rerun later: the cache has them
+
+Usage (modes and estimates for a range of budgets on a TED talk):
+    cd src && python -m backend.fear_monger_processor.budget [--budgets 0.5 2 10] [--talk 0]
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import numpy as np
+
+from backend.fear_monger_processor.cache import cache_for
+from backend.fear_monger_processor.config import (
+    BUDGET_BACKGROUND_WORKERS, BUDGET_EWMA_ALPHA, BUDGET_MIN_SAMPLE_FRACTION, BUDGET_SAFETY,
+    BUDGET_SEED_TOKENS_PER_S, CACHE_ENABLED, DATA_DIR,
+)
+from backend.fear_monger_processor.inference import dedupe, iter_inference, run_inference, token_lengths
+from backend.fear_monger_processor.lexical import is_filler, lexical_scores
+from backend.fear_monger_processor.scheduler import inference_priority
+
+
+def _model_key(classifier):
+    return getattr(classifier, "cache_revision", None) or type(classifier).__name__
+
+
+class ThroughputMeter:
+    """Exponentially weighted tokens-per-second per model, updated after every model run"""
+
+    def __init__(self, alpha=BUDGET_EWMA_ALPHA, seed=BUDGET_SEED_TOKENS_PER_S):
+        self.alpha = alpha
+        self.seed = seed
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def tokens_per_s(self, classifier):
+        return self._rates.get(_model_key(classifier), self.seed)
+
+    def observe(self, classifier, tokens, seconds):
+        if tokens <= 0 or seconds <= 0:
+            return
+        key, rate = _model_key(classifier), tokens / seconds
+        with self._lock:
+            previous = self._rates.get(key)
+            self._rates[key] = rate if previous is None else self.alpha * rate + (1 - self.alpha) * previous
+
+    def estimate(self, classifier, tokens):
+        """Predicted model seconds for `tokens` uncached tokens"""
+        return tokens / self.tokens_per_s(classifier)
+
+
+_meter = ThroughputMeter()
+_background = ThreadPoolExecutor(max_workers=BUDGET_BACKGROUND_WORKERS, thread_name_prefix="fear-full-fidelity")
+
+
+def get_meter():
+    """The process-wide ThroughputMeter"""
+    return _meter
+
+
+def sample_positions(n, k):
+    """`k` evenly spaced, sorted positions out of `n`; with k >= 2 the first and the last are included"""
+    if k >= n:
+        return np.arange(n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.unique(np.round(np.linspace(0, n - 1, k)).astype(np.intp))
+
+
+def _full_fidelity(classifier, paragraphs, tokens, meter, use_cache, stop):
+    # Background work must not slow down interactive sessions on the same model
+    with inference_priority("batch"):
+        start = time.perf_counter()
+        scores = np.zeros(len(paragraphs), dtype=np.float32)
+        for indices, batch_scores in iter_inference(classifier, paragraphs, use_cache=use_cache):
+            if stop.is_set():
+                raise CancelledError("superseded by a newer job")
+            scores[indices] = batch_scores
+        meter.observe(classifier, tokens, time.perf_counter() - start)
+    return scores
+
+
+class BackgroundJob:
+    """Handle on a full-fidelity background run: its Future plus the event that stops it early.
+
+    `done()`, `result()` and `exception()` are the Future's.
+    """
+
+    def __init__(self, future, stop):
+        self.future = future
+        self.stop = stop
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        return self.future.exception(timeout)
+
+    def cancel(self):
+        """Drop the job if it is still queued, or stop it after its current batch"""
+        self.stop.set()
+        return self.future.cancel()
+
+
+def cancel_background(job):
+    """Cancel a superseded BackgroundJob (None is ignored)"""
+    if job is not None:
+        job.cancel()
+
+
+def score_within_budget(classifier, paragraphs, budget_s, meter=None, min_sample_fraction=BUDGET_MIN_SAMPLE_FRACTION,
+                        safety=BUDGET_SAFETY, background=True, use_cache=CACHE_ENABLED, **inference_kwargs):
+    """Fear scores that are ready within about `budget_s` seconds.
+
+    Returns (scores, info). `scores` is a float32 array in paragraph order. `info` has
+    - `mode`: "full", "sampled" or "lexical";
+    - `approximate`: False only for "full";
+    - `estimated_s`: the predicted cost of exact scoring;
+    - `elapsed_s`, `model_scored` and `cached` (unique paragraphs);
+    - `background`: a BackgroundJob computing the exact scores when degraded (and `background` is set),
+      else None.
+    """
+    start = time.perf_counter()
+    meter = meter or get_meter()
+    paragraphs = list(paragraphs)
+    unique, inverse = dedupe(paragraphs)
+    cache = cache_for(classifier) if use_cache else None
+    hits = cache.get_many(unique) if cache is not None else {}
+    pending = [j for j in range(len(unique)) if j not in hits]  # in order of first occurrence
+    lengths = token_lengths(classifier, [unique[j] for j in pending])
+    tokens = sum(lengths)
+    estimated = meter.estimate(classifier, tokens)
+
+    info = {"mode": "full", "approximate": False, "estimated_s": round(estimated, 3), "cached": len(hits),
+            "model_scored": len(pending), "background": None}
+    # What is left of the budget after tokenizing and the cache lookups, with some headroom
+    available = max(budget_s - (time.perf_counter() - start), 0.0) * safety
+
+    if estimated <= available:
+        model_start = time.perf_counter()
+        scores = run_inference(classifier, paragraphs, use_cache=use_cache, **inference_kwargs)
+        meter.observe(classifier, tokens, time.perf_counter() - model_start)
+        info["elapsed_s"] = round(time.perf_counter() - start, 3)
+        return scores, info
+
+    unique_scores = np.full(len(unique), np.nan, dtype=np.float32)
+    if hits:
+        unique_scores[list(hits)] = list(hits.values())
+
+    # Largest evenly spaced sample whose estimated cost fits what is left of the budget
+    fraction = available / estimated  # estimated > available >= 0 here
+    k = int(len(pending) * fraction)
+    if pending and fraction >= min_sample_fraction and k:
+        positions = sample_positions(len(pending), k)
+        chosen = [pending[p] for p in positions]
+        model_start = time.perf_counter()
+        unique_scores[chosen] = run_inference(classifier, [unique[j] for j in chosen], use_cache=use_cache,
+                                              **inference_kwargs)
+        meter.observe(classifier, sum(lengths[p] for p in positions), time.perf_counter() - model_start)
+        scores = unique_scores[inverse]
+        known = np.flatnonzero(~np.isnan(scores))
+        missing = np.flatnonzero(np.isnan(scores))
+        scores[missing] = np.interp(missing, known, scores[known])  # nearest scored neighbours on the timeline
+        info.update(mode="sampled", model_scored=len(chosen))
+    else:
+        scores = lexical_scores(paragraphs)
+        scores[is_filler(paragraphs)] = 0.0
+        cached = unique_scores[inverse]
+        exact = ~np.isnan(cached)  # cache hits are better than any approximation
+        scores[exact] = cached[exact]
+        info.update(mode="lexical", model_scored=0)
+
+    info.update(approximate=True, elapsed_s=round(time.perf_counter() - start, 3))
+    if background:
+        stop = threading.Event()
+        future = _background.submit(_full_fidelity, classifier, paragraphs, tokens, meter, use_cache, stop)
+        info["background"] = BackgroundJob(future, stop)
+    return scores.astype(np.float32), info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show how scoring degrades under tighter latency budgets.")
+    parser.add_argument("--budgets", nargs="+", type=float, default=[0.5, 2.0, 10.0], help="Budgets in seconds")
+    parser.add_argument("--talk", type=int, default=0, help="Row of the TED transcripts CSV to score")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    from backend.fear_monger_processor.model import load_classifier
+    from backend.fear_monger_processor.utils import segment_text
+
+    text = pd.read_csv(DATA_DIR / "ted_talks_transcripts.csv")["transcript"].iloc[args.talk]
+    paragraphs = segment_text(text)
+    classifier = load_classifier()
+
+    # Exact scores first (this also calibrates the throughput meter); cache off so every budget pays full cost
+    exact, _ = score_within_budget(classifier, paragraphs, budget_s=float("inf"), use_cache=False,
+                                   show_progress=False)
+    report = []
+    for budget in args.budgets:
+        scores, info = score_within_budget(classifier, paragraphs, budget, background=False, use_cache=False,
+                                           show_progress=False)
+        info.pop("background")
+        report.append({"budget_s": budget, **info,
+                       "mean_abs_error": round(float(np.abs(scores - exact).mean()), 4) if len(exact) else 0.0})
+    print(json.dumps({"segments": len(paragraphs), "tokens_per_s": round(get_meter().tokens_per_s(classifier), 1),
+                      "budgets": report}, indent=2))
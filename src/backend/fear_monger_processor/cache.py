@@ -0,0 +1,173 @@
+"""cache.py - Persistent, content-addressed fear-score cache (SQLite)"""
+import functools
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+from backend.fear_monger_processor.config import CACHE_PATH, CACHE_MAX_ENTRIES, MODEL_NAME, MODEL_REVISION
+
+_SQLITE_MAX_PARAMS = 500  # stay well below SQLite's bound-parameter limit
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_revision(model_name=MODEL_NAME, revision=MODEL_REVISION):
+    """Commit sha that a Hugging Face revision (branch or tag) points to, for the cache key.
+
+    Keying on "main" would keep serving old scores after the model is updated upstream.
+    The local hub cache (what from_pretrained loads) is asked first, then the Hub;
+    offline and never downloaded, `revision` itself is returned.
+    """
+    if re.fullmatch(r"[0-9a-f]{40}", revision):
+        return revision
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+        ref = Path(HF_HUB_CACHE) / f"models--{model_name.replace('/', '--')}" / "refs" / revision
+        return ref.read_text().strip()
+    except (ImportError, OSError):
+        pass
+    try:
+        from huggingface_hub import HfApi
+        return HfApi().model_info(model_name, revision=revision).sha or revision
+    except Exception:  # no network, no huggingface_hub, unknown model: best effort
+        return revision
+
+
+def normalize_paragraph(text):
+    """Normalize text so trivially different copies of a paragraph share one cache entry"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ScoreCache:
+    """On-disk cache of fear probabilities keyed by model name + revision + paragraph hash.
+
+    `revision` should be a commit sha (see resolve_revision), not a branch name.
+
+    Entries are evicted least-recently-used first once the table grows past
+    `max_entries`. The database is safe to share between processes (WAL mode)
+    and between threads of one process.
+    """
+
+    def __init__(self, path=CACHE_PATH, model_name=MODEL_NAME, revision=None,
+                 max_entries=CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.revision = revision or resolve_revision(model_name)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fear_scores ("
+            " key TEXT PRIMARY KEY,"
+            " score REAL NOT NULL,"
+            " last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fear_scores_last_used ON fear_scores(last_used)")
+        self._conn.commit()
+
+    def key(self, paragraph):
+        """Content address of a paragraph for this model + revision"""
+        payload = f"{self.model_name}\0{self.revision}\0{normalize_paragraph(paragraph)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, paragraphs):
+        """Return {index: fear probability} for every paragraph found in the cache"""
+        keys = [self.key(p) for p in paragraphs]
+        found = {}
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), _SQLITE_MAX_PARAMS):
+                chunk = unique_keys[start:start + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, score FROM fear_scores WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+
+            # Refresh recency of every hit so eviction is LRU, not FIFO
+            if found:
+                now = time.time_ns()
+                self._conn.executemany(
+                    "UPDATE fear_scores SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+            self.hits += len(hits)
+            self.misses += len(keys) - len(hits)
+
+        return hits
+
+    def put_many(self, paragraphs, scores):
+        """Store fear probabilities for paragraphs, then evict the oldest entries if over budget"""
+        now = time.time_ns()
+        rows = [(self.key(p), float(score), now) for p, score in zip(paragraphs, scores)]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fear_scores (key, score, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM fear_scores").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM fear_scores WHERE key IN "
+                "(SELECT key FROM fear_scores ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current number of stored entries"""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM fear_scores").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        """Drop every stored entry and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM fear_scores")
+            self._conn.commit()
+            self.hits = self.misses = 0
+
+
+def get_score_cache(model_name=MODEL_NAME, revision=None):
+    """Process-wide ScoreCache for a model + revision (opened once, then reused; default: resolved MODEL_REVISION)"""
+    revision = revision or resolve_revision(model_name)
+    with _caches_lock:
+        cache = _caches.get((model_name, revision))
+        if cache is None:
+            cache = ScoreCache(model_name=model_name, revision=revision)
+            _caches[(model_name, revision)] = cache
+        return cache
+
+
+def cache_for(classifier):
+    """Score cache matching a classifier; engines that change scores (e.g. int8) set `cache_revision`"""
+    return get_score_cache(revision=getattr(classifier, "cache_revision", None))
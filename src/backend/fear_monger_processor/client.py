@@ -0,0 +1,68 @@
+"""client.py - Thin client for the local inference server (server.py)"""
+import http.client
+import json
+import socket
+from urllib.parse import urlparse
+
+import numpy as np
+
+from backend.fear_monger_processor.config import SERVER_URL
+from backend.fear_monger_processor.scheduler import current_priority
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RemoteClassifier:
+    """Calls the shared inference server but looks like a local engine to run_inference.
+
+    `url` is "http://host:port" or "unix:///path/to/socket".
+    """
+
+    tokenizer = None  # batching by length happens server-side
+
+    def __init__(self, url=SERVER_URL, timeout=300):
+        self.url = url
+        self.timeout = timeout
+        health = self._request("GET", "/health")
+        # Share the server's score-cache namespace so client-side lookups hit the same entries
+        self.cache_revision = health.get("cache_revision")  # None: cache_for resolves MODEL_REVISION
+        self.engine = health.get("engine")
+
+    def _connection(self):
+        parsed = urlparse(self.url)
+        if parsed.scheme == "unix":
+            return _UnixHTTPConnection(parsed.path, self.timeout)
+        return http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=self.timeout)
+
+    def _request(self, method, path, payload=None):
+        conn = self._connection()
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"Inference server error {response.status}: {data.get('error')}")
+        return data
+
+    def predict_proba(self, texts):
+        """Fear-class probability per text as a float32 array (see inference.predict_proba)"""
+        payload = {"paragraphs": list(texts), "priority": current_priority()}
+        scores = self._request("POST", "/predict", payload)["scores"]
+        return np.asarray(scores, dtype=np.float32)
+
+    def health(self):
+        return self._request("GET", "/health")
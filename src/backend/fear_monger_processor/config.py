@@ -1,4 +1,5 @@
 """config.py - All settings in one place"""
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -6,13 +7,131 @@ DATA_DIR = BASE_DIR / "data" / "transcripts" / "ted_talks"
 
 # Model
 MODEL_NAME = "Falconsai/fear_mongering_detection"
+MODEL_REVISION = "main"  # Hugging Face revision; its commit sha is part of the score cache key (cache.resolve_revision)
+FEAR_LABEL = "Fear_Mongering"
 DEFAULT_FEAR_THRESHOLD = 0.6
 
+# Inference
+BATCH_SIZE = 16  # paragraphs per forward pass (length-sorted buckets)
+MAX_TOKENS = 512  # model context window; longer inputs are truncated
+WINDOW_OVERLAP = 64  # tokens shared by neighbouring windows in sliding-window scoring
+WINDOW_AGGREGATE = "max"  # "max", "mean" or "weighted" (by window token length)
+
+# Engine: "pytorch" (transformers pipeline, see PRECISION), "onnx" (onnxruntime, CPU)
+# or "server" (thin client for the local inference server in server.py)
+ENGINE = os.getenv("FEAR_ENGINE", "pytorch")
+MODELS_DIR = BASE_DIR / "data" / "models"
+ONNX_DIR = MODELS_DIR / "onnx"
+PREPARED_DIR = MODELS_DIR / "prepared"  # safetensors + tokenizer written by prepare_model.py (mmap-loaded)
+ONNX_QUANTIZE = os.getenv("FEAR_ONNX_QUANTIZE", "1") != "0"  # dynamic int8 weights
+# PyTorch engine precision (precision.py): "fp32", "bf16" or "int8" (dynamic int8 Linear layers);
+# falls back to fp32 when the CPU has no fast path for the requested precision
+PRECISION = os.getenv("FEAR_PRECISION", "fp32")
+
+# Auto-tuning (autotune.py): sweep batch size x threads once per host, reuse the best setting
+AUTOTUNE_ENABLED = os.getenv("FEAR_AUTOTUNE", "0") != "0"
+TUNING_PATH = Path(os.getenv("FEAR_TUNING_PATH", MODELS_DIR / "tuning.json"))
+AUTOTUNE_BATCH_SIZES = (1, 4, 8, 16, 32, 64)
+AUTOTUNE_SEGMENTS = 48  # representative segments timed per configuration
+
+# Process-wide model registry (registry.py): one classifier per engine, shared by every session
+INFERENCE_CONCURRENCY = int(os.getenv("FEAR_INFERENCE_CONCURRENCY", "2"))  # simultaneous model calls
+REGISTRY_KEEP_WARM = True  # keep a model loaded after its last session ends
+
+# Inference scheduler (scheduler.py): priority classes share the INFERENCE_CONCURRENCY model slots;
+# waiting interactive calls are admitted before batch calls at every batch boundary
+PRIORITY_CLASSES = ("interactive", "batch")  # highest priority first
+# Max simultaneous model calls per class. With two or more slots, batch always leaves one free for
+# interactive calls; with a single slot (no room to reserve one) an interactive call waits for at most
+# the batch call in flight, since it is admitted ahead of every queued batch call
+SCHEDULER_LIMITS = {
+    "interactive": INFERENCE_CONCURRENCY,
+    "batch": max(1, INFERENCE_CONCURRENCY - 1),
+}
+BATCH_NICENESS = 10  # CPU niceness of corpus-scoring worker processes (pool.py), so dashboards win the CPU
+
+# Latency budget (budget.py): cost = uncached model tokens / measured tokens per second (EWMA per model);
+# over budget, scoring falls back to a sample (interpolated) or the lexical scorer and is flagged approximate
+BUDGET_SEED_TOKENS_PER_S = 1500.0  # assumed throughput until the first measurement in this process
+BUDGET_EWMA_ALPHA = 0.3  # weight of the newest throughput measurement
+BUDGET_SAFETY = 0.8  # plan against this share of the remaining budget
+BUDGET_MIN_SAMPLE_FRACTION = 0.1  # smaller samples are not worth it; the lexical scorer is used instead
+# Full-fidelity re-scoring runs on one executor shared by every session in the process; more workers
+# than the scheduler's batch slots would only queue inside the scheduler
+BUDGET_BACKGROUND_WORKERS = SCHEDULER_LIMITS["batch"]
+
+# Local inference server (shared warm model with dynamic micro-batching)
+SERVER_URL = os.getenv("FEAR_SERVER_URL", "http://127.0.0.1:8765")  # or "unix:///path/to/socket"
+SERVER_MAX_BATCH = 64  # paragraphs coalesced into one model call
+SERVER_MAX_WAIT_MS = 10  # how long the first request waits for others to join its batch
+
+# Corpus scoring pool (one classifier per worker process)
+POOL_THREADS_PER_WORKER = 2  # intra-op threads each worker gets; workers = cores // this
+CORPUS_SCORES_PATH = BASE_DIR / "data" / "fear_mongering_processed_data" / "ted_corpus_scores.csv"
+
+# Corpus triage (triage.py): score a stratified sample of each talk's segments instead of all of them
+TRIAGE_STRATA = 5  # contiguous position strata per transcript (opening ... closing)
+TRIAGE_INITIAL_SAMPLES = 10  # segments scored per talk in the first round
+TRIAGE_STEP_SAMPLES = 10  # extra segments per round for talks still undecided
+TRIAGE_MAX_ROUNDS = 4
+TRIAGE_FLAG_FRACTION = 0.1  # a talk is flagged when at least this share of segments is above the threshold
+TRIAGE_PEAK_QUANTILE = 0.9  # "peak" fear = this quantile of segment scores (robust to one outlier)
+TRIAGE_CONFIDENCE_Z = 1.96  # 95% confidence intervals
+TRIAGE_SCORES_PATH = BASE_DIR / "data" / "fear_mongering_processed_data" / "ted_triage.csv"
+
+# Pre-tokenized corpus store (token_store.py): token ids of every TED segment in memory-mapped int32 arrays,
+# one directory per tokenizer version + segmentation + source file, so repeated runs skip tokenization
+TOKEN_STORE_DIR = BASE_DIR / "data" / "token_store"
+TOKEN_STORE_CHUNK = 64  # transcripts segmented and tokenized per call while building
+
+# Score cache (on-disk, shared by every process on the host)
+CACHE_ENABLED = os.getenv("FEAR_CACHE_ENABLED", "1") != "0"
+CACHE_PATH = Path(os.getenv("FEAR_CACHE_PATH", BASE_DIR / "data" / "cache" / "fear_scores.sqlite3"))
+CACHE_MAX_ENTRIES = 200_000  # least recently used entries are evicted beyond this
+
+# Lexical pre-filter cascade (lexical.py): filler like "(Laughter)" and segments outside the uncertain
+# band (CASCADE_LOW, CASCADE_HIGH) skip the model; segments inside it are scored by it
+CASCADE_ENABLED = os.getenv("FEAR_CASCADE_ENABLED", "0") != "0"
+CASCADE_LOW = 0.0  # lexical score <= this (no fear cues) -> not fear, no model; below 0 sends cue-free segments on
+CASCADE_HIGH = 1.0  # lexical score >= this (saturated with fear cues) -> fear, no model
+LEXICAL_SATURATION = 8.0  # weighted fear cues per 100 words that map to a lexical score of 1.0
+LEXICAL_MIN_WORDS = 50  # shorter segments count as this long, so a single cue can never saturate
+
+# Multi-signal ensemble (ensemble.py): weighted composite of independently switchable components
+# The emotion model shares the fear classifier's DistilBERT vocabulary, so segments are tokenized once for both
+EMOTION_MODEL_NAME = "bhadresh-savani/distilbert-base-uncased-emotion"
+EMOTION_MODEL_REVISION = "main"
+EMOTION_FEAR_LABELS = ("fear",)  # emotion classes counted as the fear signal
+ENSEMBLE_COMPONENTS = tuple(os.getenv("FEAR_ENSEMBLE_COMPONENTS", "fear_classifier,emotion,lexical").split(","))
+ENSEMBLE_WEIGHTS = {  # renormalized over the enabled components
+    "fear_classifier": 0.6, "emotion": 0.25, "lexical": 0.15, "zero_shot": 0.3,
+}
+ENSEMBLE_WORKERS = 3  # component models run concurrently on this many threads
+
+# Zero-shot NLI (zero_shot.py): entailment of fear hypotheses; costs one forward pass per (segment, hypothesis)
+NLI_MODEL_NAME = "typeform/distilbert-base-uncased-mnli"
+NLI_MODEL_REVISION = "main"
+FEAR_HYPOTHESES = (
+    "This text is trying to make people afraid.",
+    "This text warns of an imminent disaster.",
+    "This text exaggerates a threat.",
+)
+NLI_AGGREGATE = "max"  # combine per-hypothesis entailment: "max" or "mean"
+NLI_PAIR_BATCH_SIZE = 64  # premise-hypothesis pairs per forward pass
+
 # Text processing
 MAX_CHARS = 350
+SEGMENT_MAX_TOKENS = MAX_TOKENS  # token budget per segment in "Tokens" mode
+SENTENCE_AGGREGATE = "mean"  # sentence -> paragraph score: "mean" (length-weighted) or "max"
 
 MAX_SENTENCES = 5
 
+# Adaptive coarse-to-fine scoring (adaptive.py): only regions near the threshold or at sharp
+# score changes are re-segmented and re-scored, halving the segment size per level down to MAX_CHARS
+ADAPTIVE_COARSE_CHARS = 1400  # first-pass segment size (stays well inside the 512-token window)
+ADAPTIVE_MARGIN = 0.2  # refine regions scoring within this distance of the fear threshold
+ADAPTIVE_JUMP = 0.3  # ... or differing from a neighbouring region by at least this much
+
 
 # UI
 PREVIEW_CHARS = 500
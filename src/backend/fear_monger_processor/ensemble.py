@@ -0,0 +1,253 @@
+"""ensemble.py - Multi-signal fear scoring: fear classifier + emotion model + lexical cues (+ zero-shot NLI)
+
+Every component turns a segment into a fear signal in [0, 1]; the composite is
+their weighted mean (ENSEMBLE_WEIGHTS, renormalized over the enabled components).
+Components whose tokenizers share a vocabulary reuse one tokenization of each
+segment, the components run concurrently on a thread pool (PyTorch releases
+the GIL inside its kernels), and each model component has its own score cache.
+
+    runner = EnsembleRunner(build_components(classifier, ["fear_classifier", "lexical"]))
+    scores = runner.score(paragraphs)  # {"fear_classifier": ..., "lexical": ..., "composite": ...}
+
+Usage (per-component scores + timings on the reference paragraphs):
+    cd src && python -m backend.fear_monger_processor.ensemble [--components fear_classifier emotion lexical zero_shot]
+"""
+import argparse
+import contextlib
+import contextvars
+import functools
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.fear_monger_processor.cache import cache_for, get_score_cache, resolve_revision
+from backend.fear_monger_processor.config import (
+    CACHE_ENABLED, EMOTION_FEAR_LABELS, EMOTION_MODEL_NAME, EMOTION_MODEL_REVISION,
+    ENSEMBLE_COMPONENTS, ENSEMBLE_WEIGHTS, ENSEMBLE_WORKERS, FEAR_LABEL, MAX_TOKENS,
+)
+from backend.fear_monger_processor.inference import batched_predict, dedupe, resolve_batch_size
+from backend.fear_monger_processor.lexical import is_filler, lexical_scores
+from backend.fear_monger_processor.reference import REFERENCE_PARAGRAPHS
+from backend.fear_monger_processor.tokens import make_batches
+
+
+@functools.lru_cache(maxsize=None)
+def vocabulary_key(tokenizer):
+    """Tokenizers with equal keys map text to identical input ids, so one encoding serves both"""
+    payload = json.dumps([
+        sorted(tokenizer.get_vocab().items()),
+        getattr(tokenizer, "do_lower_case", None),
+        tokenizer.all_special_ids,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ======================================================
+# COMPONENTS
+# ======================================================
+class ModelComponent:
+    """Fear signal from a sequence classifier: the summed probability of `labels`.
+
+    PyTorch pipelines can score pre-tokenized segments (`vocab_key` is set);
+    ONNX / server classifiers tokenize themselves and report FEAR_LABEL only.
+    """
+
+    def __init__(self, name, classifier, labels, cache=None):
+        self.name = name
+        self.classifier = classifier
+        self.cache = cache
+        self.vocab_key = None
+        if hasattr(classifier, "model"):
+            self.vocab_key = vocabulary_key(classifier.tokenizer)
+            label2id = {label.lower(): int(i) for label, i in classifier.model.config.label2id.items()}
+            self.label_ids = [label2id[label.lower()] for label in labels]
+
+    @property
+    def tokenizer(self):
+        return self.classifier.tokenizer
+
+    def score_encoded(self, encoded):
+        """Fear signal for one padded batch (BatchEncoding of tensors)"""
+        import torch
+
+        model = self.classifier.model
+        slot = getattr(self.classifier, "slot", contextlib.nullcontext)  # scheduler slot (registry / emotion model)
+        with slot(), torch.inference_mode():
+            logits = model(**encoded.to(model.device)).logits
+        probs = torch.softmax(logits.float(), dim=-1)[:, self.label_ids].sum(dim=-1)
+        return probs.cpu().numpy().astype(np.float32)
+
+    def score_ids(self, input_ids, batch_size=None):
+        """Fear signal for pre-tokenized segments, padded per length-sorted batch"""
+        scores = np.zeros(len(input_ids), dtype=np.float32)
+        for batch in make_batches([len(ids) for ids in input_ids], resolve_batch_size(self.classifier, batch_size)):
+            encoded = self.tokenizer.pad({"input_ids": [input_ids[i] for i in batch]}, return_tensors="pt")
+            scores[batch] = self.score_encoded(encoded)
+        return scores
+
+    def score(self, texts, batch_size=None):
+        """Fear signal with this component's own tokenization"""
+        if self.vocab_key is None:
+            batch_size = resolve_batch_size(self.classifier, batch_size)
+            return batched_predict(self.classifier, list(texts), batch_size=batch_size)
+        input_ids = self.tokenizer(list(texts), truncation=True, max_length=MAX_TOKENS)["input_ids"]
+        return self.score_ids(input_ids, batch_size=batch_size)
+
+
+class LexicalComponent:
+    """Fear-cue density (lexical.py); cheaper than a cache lookup, so it is never cached"""
+
+    name = "lexical"
+    cache = None
+    vocab_key = None
+
+    def score(self, texts, batch_size=None):
+        texts = list(texts)
+        scores = lexical_scores(texts)
+        scores[is_filler(texts)] = 0.0
+        return scores
+
+
+@functools.lru_cache(maxsize=None)
+def load_emotion_pipeline(model_name=EMOTION_MODEL_NAME, revision=EMOTION_MODEL_REVISION):
+    """Emotion classifier, loaded once per process.
+
+    Wrapped like a registry classifier, so its forward passes take InferenceScheduler
+    slots (see ModelComponent.score_encoded) next to the fear model's.
+    """
+    from transformers import AutoTokenizer, pipeline
+
+    from backend.fear_monger_processor.registry import SharedClassifier
+
+    return SharedClassifier(pipeline(
+        "text-classification",
+        model=model_name,
+        revision=revision,
+        tokenizer=AutoTokenizer.from_pretrained(model_name, revision=revision),
+        truncation=True,
+        max_length=MAX_TOKENS,
+        top_k=1,
+    ))
+
+
+def _zero_shot_component(classifier):
+    # NLI pairs are built by the zero-shot classifier itself, so it never shares the segment tokenization
+    from backend.fear_monger_processor.zero_shot import load_zero_shot
+
+    zero_shot = load_zero_shot()
+    return ModelComponent("zero_shot", zero_shot, (), cache=cache_for(zero_shot))
+
+
+# name -> factory(fear_classifier); add an entry here to make a new signal available
+COMPONENT_FACTORIES = {
+    "fear_classifier": lambda classifier: ModelComponent(
+        "fear_classifier", classifier, (FEAR_LABEL,), cache=cache_for(classifier)
+    ),
+    "emotion": lambda classifier: ModelComponent(
+        "emotion", load_emotion_pipeline(), EMOTION_FEAR_LABELS,
+        cache=get_score_cache(EMOTION_MODEL_NAME, resolve_revision(EMOTION_MODEL_NAME, EMOTION_MODEL_REVISION)),
+    ),
+    "lexical": lambda classifier: LexicalComponent(),
+    "zero_shot": _zero_shot_component,
+}
+
+
+def build_components(classifier, names=ENSEMBLE_COMPONENTS):
+    """Instantiate the enabled components, in the given order"""
+    unknown = set(names) - set(COMPONENT_FACTORIES)
+    if unknown:
+        raise ValueError(f"Unknown ensemble components: {sorted(unknown)} (expected {list(COMPONENT_FACTORIES)})")
+    return [COMPONENT_FACTORIES[name](classifier) for name in names]
+
+
+# ======================================================
+# RUNNER
+# ======================================================
+class EnsembleRunner:
+    """Scores segments with every component and combines them into a composite fear score"""
+
+    def __init__(self, components, weights=ENSEMBLE_WEIGHTS, workers=ENSEMBLE_WORKERS):
+        if not components:
+            raise ValueError("An ensemble needs at least one component")
+        self.components = list(components)
+        raw = [weights.get(component.name, 1.0) for component in self.components]
+        self.weights = {component.name: w / sum(raw) for component, w in zip(self.components, raw)}
+        self.workers = workers
+        self.timings = {}  # seconds per component in the last score() call
+
+    def score(self, paragraphs, batch_size=None, use_cache=CACHE_ENABLED):
+        """Per-component fear signals plus "composite", as float32 arrays in paragraph order.
+
+        `batch_size` defaults to each component's tuned value (see inference.resolve_batch_size).
+        """
+        unique, inverse = dedupe(list(paragraphs))
+
+        results, pending = {}, {}
+        for component in self.components:
+            results[component.name] = np.zeros(len(unique), dtype=np.float32)
+            hits = component.cache.get_many(unique) if use_cache and component.cache is not None else {}
+            if hits:
+                results[component.name][list(hits)] = list(hits.values())
+            pending[component.name] = [j for j in range(len(unique)) if j not in hits]
+
+        # One tokenization per shared vocabulary, covering every segment any member still needs
+        encodings = {}
+        for component in self.components:
+            key = component.vocab_key
+            if key is None or key in encodings:
+                continue
+            needed = sorted(set().union(*(pending[c.name] for c in self.components if c.vocab_key == key)))
+            ids = component.tokenizer([unique[j] for j in needed], truncation=True,
+                                      max_length=MAX_TOKENS)["input_ids"] if needed else []
+            encodings[key] = dict(zip(needed, ids))
+
+        def run(component):
+            todo = pending[component.name]
+            if not todo:
+                return 0.0
+            start = time.perf_counter()
+            if component.vocab_key is None:
+                scores = component.score([unique[j] for j in todo], batch_size=batch_size)
+            else:
+                shared = encodings[component.vocab_key]
+                scores = component.score_ids([shared[j] for j in todo], batch_size=batch_size)
+            results[component.name][todo] = scores
+            if use_cache and component.cache is not None:
+                component.cache.put_many([unique[j] for j in todo], scores)
+            return time.perf_counter() - start
+
+        # Each component runs in a copy of the caller's context, so its inference priority carries over
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, run, component) for component in self.components]
+            seconds = [future.result() for future in futures]
+        self.timings = {component.name: round(s, 4) for component, s in zip(self.components, seconds)}
+
+        composite = sum(self.weights[name] * scores for name, scores in results.items())
+        results["composite"] = np.asarray(composite, dtype=np.float32)
+        return {name: scores[inverse] for name, scores in results.items()}
+
+
+def score_ensemble(classifier, paragraphs, components=ENSEMBLE_COMPONENTS, **score_kwargs):
+    """One-off ensemble scoring; keep an EnsembleRunner around to reuse its components"""
+    return EnsembleRunner(build_components(classifier, components)).score(paragraphs, **score_kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the reference paragraphs with the NLP ensemble.")
+    parser.add_argument("--components", nargs="+", default=list(ENSEMBLE_COMPONENTS),
+                        choices=list(COMPONENT_FACTORIES))
+    parser.add_argument("--no-cache", action="store_true", help="Score everything with the models")
+    args = parser.parse_args()
+
+    from fearsense.core import load_model
+
+    runner = EnsembleRunner(build_components(load_model(), args.components))
+    scores = runner.score(REFERENCE_PARAGRAPHS, use_cache=not args.no_cache)
+    rows = [
+        {"paragraph": para[:60], **{name: round(float(s[i]), 4) for name, s in scores.items()}}
+        for i, para in enumerate(REFERENCE_PARAGRAPHS)
+    ]
+    print(json.dumps({"weights": runner.weights, "seconds": runner.timings, "scores": rows}, indent=2))
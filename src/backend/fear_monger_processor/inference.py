@@ -1,21 +1,288 @@
-import streamlit as st
-import time
+import numpy as np
 
-def run_inference(classifier, paragraphs): # Cache the data results (reuse predictions for same inputs)
-    """Run classifier on paragraphs with progress bar"""
+from backend.fear_monger_processor.cache import cache_for, normalize_paragraph
+from backend.fear_monger_processor.config import (
+    BATCH_SIZE, FEAR_LABEL, MAX_TOKENS, CACHE_ENABLED, WINDOW_AGGREGATE, WINDOW_OVERLAP,
+)
+from backend.fear_monger_processor.st_compat import progress_bar
+from backend.fear_monger_processor.tokens import make_batches, token_windows
 
-    results = [] # List to store all predictions
-    progress = st.progress(0) # Initialize progress bar in Streamlit
 
-    # Loop through each paragraph in the text lis
-    for i, para in enumerate(paragraphs): 
-        prediction = classifier(para)  # Run the model on one paragraph
-        results.append(prediction) # Store model's output (list of label/score dicts)
+def token_lengths(classifier, paragraphs):
+    """Token count per paragraph (falls back to character count if the classifier has no tokenizer)"""
+    tokenizer = getattr(classifier, "tokenizer", None)
+    if tokenizer is None:
+        return [len(para) for para in paragraphs]
 
-        # Update progress bar to show % completed
-        progress.progress((i + 1) / len(paragraphs))
+    # One fast-tokenizer call for the whole list, no tensors or padding needed here
+    encoded = tokenizer(list(paragraphs), truncation=True, max_length=MAX_TOKENS)
+    return [len(ids) for ids in encoded["input_ids"]]
 
-        time.sleep(0.05) # Small delay so the bar visibly updates smoothly
 
-    progress.empty() # Clear progress bar after completion
-    return results # Return all paragraph predictions
+def resolve_batch_size(classifier, batch_size=None):
+    """Explicit batch size, else the one auto-tuned for this host (see autotune.py), else BATCH_SIZE"""
+    return batch_size or getattr(classifier, "tuned_batch_size", None) or BATCH_SIZE
+
+
+def softmax(logits):
+    """Row-wise softmax over a (batch, labels) logits array"""
+    logits = logits - logits.max(axis=-1, keepdims=True)  # numerically stable
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def fear_label_index(config):
+    """Column of the fear label in the model's logits"""
+    label2id = {label.lower(): int(i) for label, i in config.label2id.items()}
+    return label2id[FEAR_LABEL.lower()]
+
+
+def predict_proba(classifier, texts):
+    """Fear-class probability for every text in one batch, as a float32 array.
+
+    Reads the logits directly (softmax over the whole batch), so the score is
+    the real fear probability even when fear is not the top label, and no
+    per-row prediction dicts are built or parsed.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+
+    # ONNX engine and the inference-server client compute this themselves
+    if hasattr(classifier, "predict_proba"):
+        return np.asarray(classifier.predict_proba(texts), dtype=np.float32)
+
+    # Hugging Face pipeline: run its model directly, bypassing the postprocess step
+    import torch
+
+    encoded = classifier.tokenizer(
+        texts, padding=True, truncation=True, max_length=MAX_TOKENS, return_tensors="pt"
+    ).to(classifier.device)  # padded to the longest member of this batch only
+    with torch.inference_mode():
+        logits = classifier.model(**encoded).logits
+    probs = torch.softmax(logits.float(), dim=-1)[:, fear_label_index(classifier.model.config)]
+    return probs.cpu().numpy().astype(np.float32)
+
+
+def predict_proba_ids(classifier, input_ids, attention_mask):
+    """Fear-class probability for one pre-tokenized batch (padded int arrays, see token_store.py).
+
+    Works for the PyTorch pipeline and the ONNX engine; the inference-server
+    client and the zero-shot scorer only accept text.
+    """
+    import contextlib
+
+    slot = getattr(classifier, "slot", contextlib.nullcontext)  # registry scheduler, if shared
+    if hasattr(classifier, "session"):  # ONNX engine
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask,
+                 "token_type_ids": np.zeros_like(input_ids)}
+        with slot():
+            logits = classifier.session.run(["logits"], {name: feeds[name].astype(np.int64)
+                                                         for name in classifier.input_names})[0]
+        return softmax(logits)[:, classifier.fear_index].astype(np.float32)
+    if not hasattr(classifier, "model"):
+        raise TypeError(f"{type(classifier).__name__} cannot score token ids; use predict_proba with text")
+
+    import torch
+
+    model = classifier.model
+    with slot(), torch.inference_mode():
+        logits = model(input_ids=torch.from_numpy(input_ids).to(model.device),
+                       attention_mask=torch.from_numpy(attention_mask).to(model.device)).logits
+    probs = torch.softmax(logits.float(), dim=-1)[:, fear_label_index(model.config)]
+    return probs.cpu().numpy().astype(np.float32)
+
+
+def dedupe(paragraphs):
+    """Collapse paragraphs that are identical after normalization (see cache.normalize_paragraph).
+
+    Returns (unique_paragraphs, inverse) with paragraphs[i] equivalent to unique_paragraphs[inverse[i]].
+    """
+    first_seen = {}  # normalized text -> position in unique (hash lookup)
+    unique = []
+    inverse = np.empty(len(paragraphs), dtype=np.intp)
+    for i, para in enumerate(paragraphs):
+        j = first_seen.setdefault(normalize_paragraph(para), len(unique))
+        if j == len(unique):
+            unique.append(para)
+        inverse[i] = j
+    return unique, inverse
+
+
+def dedup_stats(total, unique):
+    """Dedup counters for one job"""
+    return {
+        "segments": total,
+        "unique": unique,
+        "duplicates": total - unique,
+        "dedup_ratio": round((total - unique) / total, 4) if total else 0.0,
+    }
+
+
+def iter_predict(classifier, paragraphs, batch_size=BATCH_SIZE, progress_callback=None, cache=None, stats=None,
+                 tokens=None):
+    """Score paragraphs in length-sorted batches, yielding `(indices, scores)` as each batch completes.
+
+    `indices` are positions in `paragraphs` and `scores` their float32 fear
+    probabilities. Every paragraph is yielded exactly once. Cached paragraphs
+    come first as a single chunk, and fresh scores are written back to the
+    `ScoreCache`. Duplicate paragraphs (after normalization) are scored once
+    and yielded under every index where they occur.
+    `progress_callback(done_batches, total_batches)` is called after each batch.
+    If a `stats` dict is given, it is filled with dedup / cache / model counts
+    once the generator is exhausted.
+    `tokens` is an optional pre-tokenized source aligned with `paragraphs`
+    (e.g. token_store.StoreTokens): `tokens.lengths(positions)` and
+    `tokens.batch(positions) -> (input_ids, attention_mask)`. With it, the
+    model reads the stored ids and the tokenizer is never called; the texts
+    are still used for dedup and the score cache.
+    """
+    if not paragraphs:
+        if stats is not None:
+            stats.update(dedup_stats(0, 0), cache_hits=0, model_scored=0)
+        return
+
+    unique, inverse = dedupe(paragraphs)
+    # occurrences[j] = every original index of unique paragraph j
+    order = np.argsort(inverse, kind="stable")
+    occurrences = np.split(order, np.cumsum(np.bincount(inverse, minlength=len(unique)))[:-1])
+
+    def expand(unique_indices, scores):
+        counts = [len(occurrences[j]) for j in unique_indices]
+        return np.concatenate([occurrences[j] for j in unique_indices]), np.repeat(scores, counts)
+
+    # Whatever the cache already knows is available immediately; only the misses hit the model
+    hits = cache.get_many(unique) if cache is not None else {}
+    if hits:
+        yield expand(list(hits), np.fromiter(hits.values(), dtype=np.float32, count=len(hits)))
+    pending = [j for j in range(len(unique)) if j not in hits]
+
+    if tokens is None:
+        lengths = token_lengths(classifier, [unique[j] for j in pending])
+    else:
+        first = [occurrences[j][0] for j in range(len(unique))]  # where each unique paragraph sits in `tokens`
+        lengths = list(tokens.lengths([first[j] for j in pending]))
+    batches = [[pending[k] for k in batch] for batch in make_batches(lengths, batch_size)]
+
+    for done, batch in enumerate(batches, start=1):
+        batch_texts = [unique[j] for j in batch]
+        if tokens is None:
+            scores = predict_proba(classifier, batch_texts)
+        else:
+            scores = predict_proba_ids(classifier, *tokens.batch([first[j] for j in batch]))
+
+        if cache is not None:
+            cache.put_many(batch_texts, scores)
+
+        if progress_callback is not None:
+            progress_callback(done, len(batches))
+
+        yield expand(batch, scores)
+
+    if stats is not None:
+        stats.update(dedup_stats(len(paragraphs), len(unique)), cache_hits=len(hits), model_scored=len(pending))
+
+
+def batched_predict(classifier, paragraphs, batch_size=BATCH_SIZE, progress_callback=None, cache=None, stats=None,
+                    tokens=None):
+    """Score paragraphs in length-sorted batches (see iter_predict).
+
+    Returns a float32 array with one fear probability per paragraph, in the original order.
+    """
+    results = np.zeros(len(paragraphs), dtype=np.float32)
+    for indices, scores in iter_predict(classifier, paragraphs, batch_size=batch_size,
+                                        progress_callback=progress_callback, cache=cache, stats=stats,
+                                        tokens=tokens):
+        results[indices] = scores  # scatter back to the original positions
+    return results
+
+
+def run_inference(classifier, paragraphs, batch_size=None, show_progress=True, use_cache=CACHE_ENABLED,
+                  stats=None, tokens=None):
+    """Score paragraphs in batches, with an optional per-batch progress bar.
+
+    Returns a float32 array of fear probabilities in paragraph order.
+    Paragraphs already scored by any earlier run (in any process) are served
+    from the on-disk score cache. `batch_size` defaults to the host's tuned value.
+    `tokens`: pre-tokenized ids for `paragraphs` (see iter_predict).
+    """
+
+    progress = progress_bar() if show_progress else None  # Streamlit progress bar (no-op when headless)
+
+    def update_progress(done, total):
+        progress.progress(done / total)  # Update progress bar once per batch
+
+    results = batched_predict(
+        classifier,
+        paragraphs,
+        batch_size=resolve_batch_size(classifier, batch_size),
+        progress_callback=update_progress if progress is not None else None,
+        cache=cache_for(classifier) if use_cache else None,
+        stats=stats,
+        tokens=tokens,
+    )
+
+    if progress is not None:
+        progress.empty()  # Clear progress bar after completion
+    return results  # Fear probability per paragraph (float32 array, original order)
+
+
+def iter_inference(classifier, paragraphs, batch_size=None, use_cache=CACHE_ENABLED, stats=None, tokens=None):
+    """Streaming run_inference: yields `(indices, scores)` per completed batch so callers can render early.
+
+    Time to first result is one batch (or zero, for cached paragraphs) instead of the whole transcript.
+    """
+    yield from iter_predict(
+        classifier,
+        paragraphs,
+        batch_size=resolve_batch_size(classifier, batch_size),
+        cache=cache_for(classifier) if use_cache else None,
+        stats=stats,
+        tokens=tokens,
+    )
+
+
+def aggregate_windows(scores, token_counts, how=WINDOW_AGGREGATE):
+    """Combine window scores into one segment score: "max", "mean" or length-"weighted" mean"""
+    if how == "max":
+        return max(scores)
+    if how == "mean":
+        return sum(scores) / len(scores)
+    if how == "weighted":
+        return sum(s * n for s, n in zip(scores, token_counts)) / max(sum(token_counts), 1)
+    raise ValueError(f"Unknown window aggregation: {how!r} (expected 'max', 'mean' or 'weighted')")
+
+
+def run_windowed_inference(classifier, paragraphs, aggregate=WINDOW_AGGREGATE, overlap=WINDOW_OVERLAP,
+                           batch_size=None, show_progress=True, use_cache=CACHE_ENABLED):
+    """Score paragraphs of any length without silent truncation.
+
+    Paragraphs longer than the model window are split into overlapping token
+    windows; all windows of all paragraphs go through the model together and
+    are aggregated back per paragraph.
+
+    Returns (segment_scores, windows) where windows[i] is a list of
+    {"text", "tokens", "score"} dicts for paragraph i, in reading order.
+    """
+    from backend.fear_monger_processor.model import tokenizer_for
+
+    tokenizer = tokenizer_for(classifier)  # a local tokenizer even when the model runs in the server
+    window_texts, window_tokens, owners = [], [], []
+    for i, para in enumerate(paragraphs):
+        texts, counts = token_windows(para, tokenizer, overlap=overlap)
+        window_texts.extend(texts)
+        window_tokens.extend(counts)
+        owners.extend([i] * len(texts))
+
+    scores = run_inference(classifier, window_texts, batch_size=batch_size,
+                           show_progress=show_progress, use_cache=use_cache)
+
+    windows = [[] for _ in paragraphs]
+    for owner, text, n_tokens, score in zip(owners, window_texts, window_tokens, scores.tolist()):
+        windows[owner].append({"text": text, "tokens": n_tokens, "score": score})
+
+    segment_scores = np.array([
+        aggregate_windows([w["score"] for w in segment], [w["tokens"] for w in segment], how=aggregate)
+        for segment in windows
+    ], dtype=np.float32)
+    return segment_scores, windows
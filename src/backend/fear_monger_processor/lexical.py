@@ -0,0 +1,162 @@
+"""lexical.py - Cheap lexical fear-cue scorer and a two-stage cascade in front of the transformer
+
+Stage 1 scores every segment with one compiled multi-pattern regex over a
+curated fear lexicon. Filler ("(Laughter)", greetings) is scored 0. Segments at
+or below CASCADE_LOW (by default: no fear cue at all) and at or above
+CASCADE_HIGH (saturated with cues) keep their lexical score. Stage 2 sends only
+the uncertain band in between to the model. The lexicon cannot prove a segment
+calm, so cascade_report counts the fear segments the low band misses; set
+CASCADE_LOW below 0 to send cue-free segments to the model as well.
+
+Usage (skip rate + agreement with full scoring on a TED sample):
+    cd src && python -m backend.fear_monger_processor.lexical [--limit 20] [--low 0.0] [--high 1.0]
+"""
+import argparse
+import json
+import re
+
+import numpy as np
+
+from backend.fear_monger_processor.config import (
+    CASCADE_HIGH, CASCADE_LOW, DATA_DIR, DEFAULT_FEAR_THRESHOLD, LEXICAL_MIN_WORDS, LEXICAL_SATURATION,
+)
+
+# Curated fear cues, grouped by weight. Stems end in \w* so one entry covers its inflections.
+FEAR_LEXICON = {
+    2.0: [
+        r"catastroph\w*", r"apocalyp\w*", r"annihilat\w*", r"extinction", r"doom\w*", r"massacre\w*",
+        r"wipe[sd]? out", r"too late", r"no ?one (?:is|will be) safe", r"nobody (?:is|will be) safe",
+        r"end of the world", r"lose everything", r"nothing (?:anyone|we|you) can do",
+    ],
+    1.0: [
+        r"cris[ie]s", r"disaster\w*", r"collaps\w*", r"threat\w*", r"danger\w*", r"deadly", r"terrif\w*",
+        r"terror\w*", r"panic\w*", r"destr(?:oy|uct)\w*", r"kill\w*", r"poison\w*", r"epidemic\w*",
+        r"pandemic\w*", r"invasion\w*", r"invad\w*", r"attack\w*", r"chao(?:s|tic)", r"devastat\w*",
+        r"starv\w*", r"toxic", r"emergenc(?:y|ies)", r"warn\w*", r"victim\w*",
+    ],
+    0.5: [
+        r"fear\w*", r"afraid", r"scar(?:y|ed|ier|iest)", r"worr(?:y|ied|ies|ying)", r"risk\w*",
+        r"alarm\w*", r"urgent\w*", r"act now", r"hiding", r"cover[- ]?up", r"won'?t tell you",
+        r"don'?t want you to know",
+    ],
+}
+
+_TIER_WEIGHTS = {f"w{i}": weight for i, weight in enumerate(FEAR_LEXICON)}
+FEAR_CUE_PATTERN = re.compile(
+    "|".join(
+        rf"(?P<w{i}>\b(?:{'|'.join(terms)})\b)" for i, terms in enumerate(FEAR_LEXICON.values())
+    ),
+    re.IGNORECASE,
+)
+
+# Segments that carry no content the model could flag: stage directions and pleasantries
+FILLER_PATTERN = re.compile(
+    r"\W*(?:(?:\((?:laughter|applause|music|cheers?|cheering|video|audio|sighs?|silence)[^)]*\)"
+    r"|thank you(?: (?:so|very) much)?(?: (?:everyone|all))?|thanks(?: everyone)?"
+    r"|hello(?: everyone)?|hi(?: everyone)?|good (?:morning|afternoon|evening)(?: everyone)?)\W*)+",
+    re.IGNORECASE,
+)
+
+_SEPARATOR = "\n\0\n"  # never part of a cue, so matches cannot span two segments
+
+
+def lexical_scores(paragraphs, saturation=LEXICAL_SATURATION, min_words=LEXICAL_MIN_WORDS):
+    """Fear-cue density per segment in [0, 1] as a float32 array.
+
+    All segments are matched in a single regex pass over their concatenation;
+    matches are mapped back to segments with one searchsorted call.
+    """
+    paragraphs = list(paragraphs)
+    if not paragraphs:
+        return np.zeros(0, dtype=np.float32)
+
+    starts = np.cumsum([0] + [len(p) + len(_SEPARATOR) for p in paragraphs[:-1]])
+    positions, weights = [], []
+    for match in FEAR_CUE_PATTERN.finditer(_SEPARATOR.join(paragraphs)):
+        positions.append(match.start())
+        weights.append(_TIER_WEIGHTS[match.lastgroup])
+
+    owners = np.searchsorted(starts, positions, side="right") - 1
+    cue_weight = np.bincount(owners, weights=weights, minlength=len(paragraphs))
+    words = np.array([len(p.split()) for p in paragraphs], dtype=np.float64)
+
+    # Weighted cues per 100 words; short segments count as `min_words` words, so with the defaults
+    # saturating takes a weight of at least 4 (e.g. two 2.0 cues or four 1.0 cues), never a single cue
+    density = cue_weight * 100 / np.maximum(words, min_words)
+    return np.clip(density / saturation, 0.0, 1.0).astype(np.float32)
+
+
+def is_filler(paragraphs):
+    """Boolean mask of segments that are only stage directions / greetings, e.g. "(Laughter)" """
+    return np.array([FILLER_PATTERN.fullmatch(p) is not None for p in paragraphs], dtype=bool)
+
+
+def cascade_route(paragraphs, low=CASCADE_LOW, high=CASCADE_HIGH):
+    """Stage 1: returns (lexical_scores, needs_model) where needs_model marks the uncertain band"""
+    lexical = lexical_scores(paragraphs)
+    filler = is_filler(paragraphs)
+    lexical[filler] = 0.0
+    needs_model = ~filler & (lexical > low) & (lexical < high)
+    return lexical, needs_model
+
+
+def cascade_inference(classifier, paragraphs, low=CASCADE_LOW, high=CASCADE_HIGH, **inference_kwargs):
+    """Two-stage scoring: lexical scores for confident segments, the model for the rest.
+
+    Returns (scores, needs_model): a float32 score array in paragraph order and
+    the mask of segments that went through the model.
+    """
+    from backend.fear_monger_processor.inference import run_inference
+
+    paragraphs = list(paragraphs)
+    scores, needs_model = cascade_route(paragraphs, low=low, high=high)
+    routed = np.flatnonzero(needs_model)
+    if len(routed):
+        scores[routed] = run_inference(classifier, [paragraphs[i] for i in routed], **inference_kwargs)
+    return scores, needs_model
+
+
+def cascade_report(classifier, paragraphs, low=CASCADE_LOW, high=CASCADE_HIGH,
+                   threshold=DEFAULT_FEAR_THRESHOLD, **inference_kwargs):
+    """Score `paragraphs` fully and through the cascade; report skip rate and agreement"""
+    from backend.fear_monger_processor.inference import run_inference
+
+    paragraphs = list(paragraphs)
+    if not paragraphs:
+        return {"segments": 0, "band": [low, high], "skipped": 0, "skip_rate": 0.0}
+
+    full = run_inference(classifier, paragraphs, **inference_kwargs)
+    lexical, needs_model = cascade_route(paragraphs, low=low, high=high)
+    cascade = np.where(needs_model, full, lexical)  # routed segments would get exactly the full score
+
+    skipped = ~needs_model
+    diff = np.abs(cascade - full)
+    return {
+        "segments": len(paragraphs),
+        "band": [low, high],
+        "skipped": int(skipped.sum()),
+        "skip_rate": round(float(skipped.mean()), 4),
+        "label_agreement": round(float(np.mean((cascade > threshold) == (full > threshold))), 4),
+        "missed_fear_segments": int(np.sum(skipped & (full > threshold) & (cascade <= threshold))),
+        "max_abs_diff": round(float(diff.max()), 4),
+        "mean_abs_diff": round(float(diff.mean()), 4),
+        "threshold": threshold,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the lexical cascade against full model scoring.")
+    parser.add_argument("--limit", type=int, default=20, help="Number of TED talks to sample")
+    parser.add_argument("--low", type=float, default=CASCADE_LOW)
+    parser.add_argument("--high", type=float, default=CASCADE_HIGH)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from backend.fear_monger_processor.model import load_classifier
+    from backend.fear_monger_processor.utils import segment_text
+
+    transcripts = pd.read_csv(DATA_DIR / "ted_talks_transcripts.csv").head(args.limit)
+    paragraphs = [para for text in transcripts["transcript"].dropna() for para in segment_text(text)]
+    report = cascade_report(load_classifier(), paragraphs, low=args.low, high=args.high,
+                            show_progress=False)
+    print(json.dumps(report, indent=2))
@@ -1,21 +1,34 @@
-from transformers import pipeline, AutoTokenizer
-import streamlit as st
-from backend.fear_monger_processor.config import MODEL_NAME
+import functools
 
-@st.cache_resource
-def load_classifier():  # Cache the model as a persistent resource (loaded once per session)
+from backend.fear_monger_processor.config import MODEL_NAME, MODEL_REVISION, MAX_TOKENS, ENGINE, AUTOTUNE_ENABLED, PREPARED_DIR, PRECISION
+
+
+def build_pipeline(prepared=None):
+    """Build the full-precision PyTorch pipeline (uncached; see load_classifier).
+
+    Uses the memory-mapped artifact from prepare_model.py when it exists
+    (`prepared=None`), or forces either source with True / False.
+    """
+    from backend.fear_monger_processor.prepare_model import is_prepared, load_prepared_pipeline
+
+    if prepared or (prepared is None and is_prepared(PREPARED_DIR)):
+        return load_prepared_pipeline(PREPARED_DIR)
+
+    # Imported here so importing this module stays cheap (transformers pulls in torch)
+    from transformers import pipeline, AutoTokenizer
 
     # Load the tokenizer for the specified Hugging Face model
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, revision=MODEL_REVISION)
 
     # Create a text classification pipeline
     # Handles tokenization, model inference, and output formatting automatically
     return pipeline(
         "text-classification", # Task type
-        model=MODEL_NAME, # Model name 
+        model=MODEL_NAME, # Model name
+        revision=MODEL_REVISION, # Same weights as the tokenizer, ONNX export and prepared artifact
         tokenizer=tokenizer,
         truncation=True, # Ensure long text is truncated to fit model input size
-        max_length=512, # Maximum token length per input
+        max_length=MAX_TOKENS, # Maximum token length per input
         top_k=1 # Return only the top prediction
     )
 
@@ -32,3 +45,74 @@ def load_classifier():  # Cache the model as a persistent resource (loaded once
         #     ]
         # This makes downstream analysis (e.g., correlating with heart rate or time)
         # easier since each paragraph yields exactly one numeric score.
+
+
+def build_classifier(engine=ENGINE, threads=None, autotune=AUTOTUNE_ENABLED, precision=PRECISION):
+    """Build the classifier for the selected engine: "pytorch", "onnx" or "server" (uncached).
+
+    `threads` caps intra-op CPU threads, e.g. when several worker processes share one machine.
+    `precision` ("fp32", "bf16", "int8") applies to the PyTorch engine; see precision.py.
+    With `autotune`, the batch size and (unless `threads` is given) thread count
+    tuned for this host are applied; the first load on a new host runs the sweep.
+    """
+    if autotune and engine != "server":
+        from backend.fear_monger_processor.autotune import apply_interop_threads, calibrate, load_tuning
+
+        tuning = load_tuning(engine, precision=precision)
+        pinned = threads is not None
+        if tuning and not pinned:
+            threads = tuning["threads"]
+        if engine == "pytorch":
+            apply_interop_threads(1)  # must precede any parallel work
+
+        classifier = build_classifier(engine, threads=threads, autotune=False, precision=precision)
+        if tuning is None and not pinned:
+            tuning = calibrate(classifier, engine=engine, precision=precision)
+            if engine == "onnx":  # session threads are fixed at creation
+                classifier = build_classifier(engine, threads=tuning["threads"], autotune=False)
+        if tuning:
+            classifier.tuned_batch_size = tuning["batch_size"]  # picked up by run_inference
+        return classifier
+
+    if engine == "onnx":
+        # onnxruntime is optional, so only import it when the engine is selected
+        from backend.fear_monger_processor.onnx_engine import load_onnx_classifier
+        return load_onnx_classifier(intra_op_threads=threads or 0)
+    if engine == "server":
+        # Thin HTTP client; the warm model lives in the shared local inference server
+        from backend.fear_monger_processor.client import RemoteClassifier
+        return RemoteClassifier()
+    if engine != "pytorch":
+        raise ValueError(f"Unknown inference engine: {engine!r} (expected 'pytorch', 'onnx' or 'server')")
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    from backend.fear_monger_processor.precision import apply_precision
+    return apply_precision(build_pipeline(), precision)
+
+
+def load_classifier(engine=ENGINE):  # One shared model per process (see registry.py), not one per session
+    # Both engines share the same call signature, so callers never need to know which one they got
+    from backend.fear_monger_processor.registry import get_registry
+    return get_registry().get(engine)
+
+
+@functools.lru_cache(maxsize=None)
+def load_tokenizer():
+    """The fear model's tokenizer alone, for engines without a local one (e.g. the server client)"""
+    from transformers import AutoTokenizer
+
+    from backend.fear_monger_processor.prepare_model import is_prepared
+
+    if is_prepared(PREPARED_DIR):
+        return AutoTokenizer.from_pretrained(PREPARED_DIR)
+    return AutoTokenizer.from_pretrained(MODEL_NAME, revision=MODEL_REVISION)
+
+
+def tokenizer_for(classifier=None):
+    """`classifier`'s tokenizer (default: the shared classifier's), else the locally loaded one"""
+    if classifier is None:
+        classifier = load_classifier()
+    return getattr(classifier, "tokenizer", None) or load_tokenizer()
@@ -0,0 +1,232 @@
+"""onnx_engine.py - ONNX Runtime CPU engine (optionally int8-quantized) for the fear classifier
+
+Usage (parity + latency report against the PyTorch pipeline):
+    python -m backend.fear_monger_processor.onnx_engine [--fp32]
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import (
+    BATCH_SIZE, MAX_TOKENS, MODEL_NAME, MODEL_REVISION, ONNX_DIR, ONNX_QUANTIZE,
+)
+from backend.fear_monger_processor.inference import fear_label_index, predict_proba, softmax
+from backend.fear_monger_processor.prepare_model import MANIFEST_FILE, read_manifest
+from backend.fear_monger_processor.reference import REFERENCE_PARAGRAPHS
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+PARITY_TOLERANCE = {False: 1e-3, True: 0.05}  # max |fear prob diff| vs PyTorch, keyed by quantized
+
+
+def is_exported(out_dir=ONNX_DIR, model_name=MODEL_NAME, revision=MODEL_REVISION):
+    """True if `out_dir` holds a graph exported from the commit `revision` currently points to"""
+    expected = {"model": model_name, "revision": resolve_revision(model_name, revision)}
+    return read_manifest(out_dir) == expected and (Path(out_dir) / FP32_FILE).exists()
+
+
+def export_onnx(model_name=MODEL_NAME, out_dir=ONNX_DIR, quantize=ONNX_QUANTIZE, revision=MODEL_REVISION):
+    """Export the Hugging Face model to ONNX once (plus an int8 copy if `quantize`).
+
+    The tokenizer and config are saved next to the graph so the engine can be
+    loaded without touching the Hugging Face cache again. A manifest records the
+    model and commit sha; a graph from another model or an older sha is re-exported.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = out_dir / FP32_FILE
+
+    if not is_exported(out_dir, model_name, revision):
+        for name in (MANIFEST_FILE, INT8_FILE, FP32_FILE):  # the int8 copy is derived from the stale graph
+            (out_dir / name).unlink(missing_ok=True)
+        sha = resolve_revision(model_name, revision)
+        tokenizer = AutoTokenizer.from_pretrained(model_name, revision=sha)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=sha).eval()
+
+        sample = tokenizer(["A short sample.", "A slightly longer sample sentence."], padding=True, return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+
+        tokenizer.save_pretrained(out_dir)
+        model.config.save_pretrained(out_dir)
+        # Written last: its presence marks a complete export
+        (out_dir / MANIFEST_FILE).write_text(json.dumps({"model": model_name, "revision": sha}, indent=2))
+
+    if quantize and not (out_dir / INT8_FILE).exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Dynamic quantization: int8 weights, activations quantized on the fly
+        quantize_dynamic(str(fp32_path), str(out_dir / INT8_FILE), weight_type=QuantType.QInt8)
+
+    return out_dir / (INT8_FILE if quantize else FP32_FILE)
+
+
+class OnnxTextClassifier:
+    """Drop-in replacement for the `text-classification` pipeline backed by onnxruntime.
+
+    Call it like the pipeline: a string returns `[{'label', 'score'}]`, a list
+    returns one such list per input. `top_k=None` returns every label.
+    """
+
+    def __init__(self, model_dir=ONNX_DIR, quantized=ONNX_QUANTIZE, intra_op_threads=0):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_dir = Path(model_dir)
+        manifest = read_manifest(model_dir)
+        if manifest is None:
+            raise ValueError(f"No ONNX export manifest in {model_dir}; run export_onnx first")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        config = AutoConfig.from_pretrained(model_dir)
+        self.id2label = config.id2label
+        self.fear_index = fear_label_index(config)
+        self.batch_size = BATCH_SIZE
+        # The sha the graph was exported from; see cache.cache_for
+        self.cache_revision = f"{manifest['revision']}+onnx{'-int8' if quantized else ''}"
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        model_path = model_dir / (INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def logits(self, texts):
+        """Raw logits for a batch of texts (padded to the longest member)"""
+        encoded = self.tokenizer(
+            list(texts), padding=True, truncation=True, max_length=MAX_TOKENS, return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(["logits"], feeds)[0]
+
+    def predict_proba(self, texts):
+        """Fear-class probability per text as a float32 array (see inference.predict_proba).
+
+        `texts` is one batch and runs as one session pass: the caller (run_inference,
+        autotune, benchmarks) picks the batch size, as with the PyTorch pipeline.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        return softmax(self.logits(texts))[:, self.fear_index].astype(np.float32)
+
+    def __call__(self, inputs, batch_size=None, top_k=1, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        batch_size = batch_size or self.batch_size
+
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            probs = softmax(self.logits(texts[start:start + batch_size]))
+            for row in probs:
+                order = np.argsort(row)[::-1]
+                if top_k is not None:
+                    order = order[:top_k]
+                outputs.append([{"label": self.id2label[int(j)], "score": float(row[j])} for j in order])
+
+        return outputs[0] if single else outputs
+
+
+def load_onnx_classifier(model_dir=ONNX_DIR, quantize=ONNX_QUANTIZE, intra_op_threads=0):
+    """Load the ONNX engine, exporting (and quantizing) the model on first use or when it is stale"""
+    model_dir = Path(model_dir)
+    if not is_exported(model_dir) or not (model_dir / (INT8_FILE if quantize else FP32_FILE)).exists():
+        export_onnx(out_dir=model_dir, quantize=quantize)
+    return OnnxTextClassifier(model_dir, quantized=quantize, intra_op_threads=intra_op_threads)
+
+
+# ======================================================
+# PARITY + LATENCY CHECK
+# ======================================================
+def _fear_probabilities(classifier, paragraphs, batch_size):
+    return np.concatenate([
+        predict_proba(classifier, paragraphs[start:start + batch_size])
+        for start in range(0, len(paragraphs), batch_size)
+    ]).astype(np.float64)
+
+
+def _timings(classifier, paragraphs, batch_size, repeats):
+    # Single-paragraph latency (interactive case) and batched throughput (corpus case)
+    latencies = []
+    for para in paragraphs:
+        start = time.perf_counter()
+        predict_proba(classifier, [para])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _fear_probabilities(classifier, paragraphs, batch_size)
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "latency_ms_p50": round(statistics.median(latencies), 2),
+        "latency_ms_max": round(max(latencies), 2),
+        "throughput_per_s": round(len(paragraphs) / best, 2),
+    }
+
+
+def compare_engines(paragraphs=REFERENCE_PARAGRAPHS, quantize=ONNX_QUANTIZE, batch_size=BATCH_SIZE, repeats=3):
+    """Score `paragraphs` with both engines and report fear-score parity plus latency/throughput"""
+    from backend.fear_monger_processor.model import build_pipeline
+
+    paragraphs = list(paragraphs)
+    torch_classifier = build_pipeline()
+    onnx_classifier = load_onnx_classifier(quantize=quantize)
+
+    # Warm up both engines so one-off initialisation does not skew timings
+    predict_proba(torch_classifier, paragraphs[:2])
+    predict_proba(onnx_classifier, paragraphs[:2])
+
+    torch_scores = _fear_probabilities(torch_classifier, paragraphs, batch_size)
+    onnx_scores = _fear_probabilities(onnx_classifier, paragraphs, batch_size)
+    diff = np.abs(torch_scores - onnx_scores)
+
+    report = {
+        "paragraphs": len(paragraphs),
+        "quantized": quantize,
+        "max_abs_diff": round(float(diff.max()), 5),
+        "mean_abs_diff": round(float(diff.mean()), 5),
+        "label_agreement": round(float(np.mean((torch_scores >= 0.5) == (onnx_scores >= 0.5))), 4),
+        "tolerance": PARITY_TOLERANCE[quantize],
+        "pytorch": _timings(torch_classifier, paragraphs, batch_size, repeats),
+        "onnx": _timings(onnx_classifier, paragraphs, batch_size, repeats),
+    }
+    report["passed"] = report["max_abs_diff"] <= report["tolerance"]
+    report["throughput_speedup"] = round(
+        report["onnx"]["throughput_per_s"] / report["pytorch"]["throughput_per_s"], 2
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the ONNX engine against the PyTorch pipeline.")
+    parser.add_argument("--fp32", action="store_true", help="Check the unquantized ONNX graph instead of int8.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    result = compare_engines(quantize=not args.fp32, batch_size=args.batch_size)
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if result["passed"] else 1)
@@ -0,0 +1,189 @@
+"""pool.py - Multi-process scoring pool for whole corpora
+
+Each worker process loads the classifier once and keeps it for its lifetime.
+CPU cores are split between workers so they do not oversubscribe each other.
+
+Usage (score every TED talk in ted_talks_transcripts.csv):
+    cd src && python -m backend.fear_monger_processor.pool [--workers N] [--limit N]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backend.fear_monger_processor.config import (
+    BATCH_NICENESS, BATCH_SIZE, CACHE_ENABLED, CORPUS_SCORES_PATH, DATA_DIR, ENGINE, MAX_CHARS, MAX_SENTENCES,
+    POOL_THREADS_PER_WORKER,
+)
+
+# Set once per worker process by _init_worker
+_worker_classifier = None
+_worker_options = {}
+
+
+def _init_worker(engine, threads, batch_size, use_cache):
+    """Pin thread pools, then load the classifier once for this worker process"""
+    global _worker_classifier, _worker_options
+
+    # Must happen before torch / onnxruntime spin up their thread pools
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    from backend.fear_monger_processor.model import build_classifier
+    from backend.fear_monger_processor.scheduler import set_priority
+
+    # Corpus scoring is background work: lower CPU priority, and "batch" class on a shared server
+    try:
+        os.nice(BATCH_NICENESS)
+    except (AttributeError, OSError):
+        pass  # not supported on this platform
+    set_priority("batch")
+
+    if engine == "pytorch":
+        import torch
+        torch.set_num_interop_threads(1)  # parallelism comes from the pool, not inter-op
+
+    _worker_classifier = build_classifier(engine, threads=threads)
+    _worker_options = {"batch_size": batch_size, "use_cache": use_cache}
+
+
+def _score_paragraphs(paragraphs):
+    from backend.fear_monger_processor.cache import cache_for
+    from backend.fear_monger_processor.inference import batched_predict
+
+    return batched_predict(
+        _worker_classifier,
+        paragraphs,
+        batch_size=_worker_options["batch_size"],
+        cache=cache_for(_worker_classifier) if _worker_options["use_cache"] else None,
+    )
+
+
+def _segment_transcript(args):
+    text, segmenter, segment_kwargs = args
+    return segmenter(text, **segment_kwargs) if isinstance(text, str) and text.strip() else []
+
+
+def _default_segmenter(text, **kwargs):
+    from backend.fear_monger_processor.utils import segment_text
+    return segment_text(text, **kwargs)
+
+
+class ScoringPool:
+    """Process pool that scores paragraphs or whole transcripts across all cores.
+
+    Results always come back in input order. Use as a context manager:
+
+        with ScoringPool() as pool:
+            results = pool.score_transcripts(texts)
+    """
+
+    def __init__(self, workers=None, engine=ENGINE, batch_size=BATCH_SIZE, use_cache=CACHE_ENABLED,
+                 threads_per_worker=POOL_THREADS_PER_WORKER):
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // threads_per_worker)
+        self.threads_per_worker = max(1, cores // self.workers)
+        self.batch_size = batch_size
+        self.stats = {}  # dedup counters of the last job
+
+        # "spawn" avoids inheriting a half-initialised torch thread pool from the parent
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine, self.threads_per_worker, batch_size, use_cache),
+        )
+
+    def score_paragraphs(self, paragraphs, shard_size=None):
+        """Score one long list of paragraphs, sharded across workers; returns a float32 score array in order.
+
+        Duplicates are removed before sharding, so each distinct paragraph is scored once per job.
+        """
+        from backend.fear_monger_processor.inference import dedup_stats, dedupe
+
+        paragraphs = list(paragraphs)
+        unique, inverse = dedupe(paragraphs)
+        self.stats = dedup_stats(len(paragraphs), len(unique))
+        if not unique:
+            return np.zeros(0, dtype=np.float32)
+
+        # Default: a few shards per worker so slow shards don't leave cores idle
+        shard_size = shard_size or max(self.batch_size, -(-len(unique) // (self.workers * 4)))
+        shards = [unique[i:i + shard_size] for i in range(0, len(unique), shard_size)]
+
+        scores = np.concatenate(list(self._executor.map(_score_paragraphs, shards)))
+        return scores[inverse]
+
+    def score_transcripts(self, texts, segmenter=None, max_chars=MAX_CHARS, max_sentences=MAX_SENTENCES):
+        """Segment and score whole transcripts; returns [(paragraphs, scores)] in order.
+
+        Transcripts are segmented in the workers (one task each), then the
+        paragraphs of all transcripts are scored as one deduplicated job, so
+        boilerplate shared across transcripts (intros, "(Applause)", ...) is scored once.
+
+        `segmenter(text, max_chars=..., max_sentences=...)` must be a module-level
+        function so it can be sent to worker processes; defaults to utils.segment_text.
+        """
+        segmenter = segmenter or _default_segmenter
+        segment_kwargs = {"max_chars": max_chars, "max_sentences": max_sentences}
+        tasks = [(text, segmenter, segment_kwargs) for text in texts]
+        segmented = list(self._executor.map(_segment_transcript, tasks))
+
+        scores = self.score_paragraphs([para for paragraphs in segmented for para in paragraphs])
+        bounds = np.cumsum([len(paragraphs) for paragraphs in segmented])[:-1]
+        return list(zip(segmented, np.split(scores, bounds)))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_ted_corpus(workers=None, limit=None, out_path=CORPUS_SCORES_PATH, engine=ENGINE):
+    """Score every talk in ted_talks_transcripts.csv and write one row per paragraph to `out_path`"""
+    import pandas as pd
+
+    transcripts = pd.read_csv(DATA_DIR / "ted_talks_transcripts.csv")
+    if limit:
+        transcripts = transcripts.head(limit)
+
+    start = time.perf_counter()
+    with ScoringPool(workers=workers, engine=engine) as pool:
+        results = pool.score_transcripts(transcripts["transcript"].tolist())
+        dedup = pool.stats
+    elapsed = time.perf_counter() - start
+
+    rows = [
+        {
+            "url": url,
+            "paragraph_index": i,
+            "Paragraph": para,
+            "Fear Mongering Score": score,
+        }
+        for url, (paragraphs, scores) in zip(transcripts["url"], results)
+        for i, (para, score) in enumerate(zip(paragraphs, scores.tolist()))
+    ]
+    scores_df = pd.DataFrame(rows)
+    scores_df.to_csv(out_path, index=False)
+
+    print(f"Scored {len(transcripts)} talks / {len(scores_df)} paragraphs in {elapsed:.1f}s "
+          f"({len(scores_df) / max(elapsed, 1e-9):.1f} paragraphs/s, "
+          f"{dedup['duplicates']} duplicates skipped = {dedup['dedup_ratio']:.1%}) -> {out_path}")
+    return scores_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the TED transcript corpus on all cores.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: cores // threads per worker)")
+    parser.add_argument("--limit", type=int, default=None, help="Only score the first N talks")
+    parser.add_argument("--engine", default=ENGINE, choices=["pytorch", "onnx"])
+    args = parser.parse_args()
+
+    score_ted_corpus(workers=args.workers, limit=args.limit, engine=args.engine)
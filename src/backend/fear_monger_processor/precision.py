@@ -0,0 +1,132 @@
+"""precision.py - Reduced-precision CPU inference for the PyTorch engine
+
+"fp32"  full precision (default)
+"bf16"  bfloat16 weights and activations; only used on CPUs with native bf16
+        instructions (AVX512-BF16 / AMX on x86, BF16 on Arm), where it runs
+        the matmuls at up to twice the fp32 rate
+"int8"  dynamic int8 quantization of the Linear layers (needs a quantized
+        backend such as fbgemm / x86 / qnnpack)
+
+Unsupported precisions fall back to fp32 with a warning. Both reduced modes
+change the scores slightly, so they get their own score-cache revision.
+
+Usage (accuracy drift + throughput against fp32 on REFERENCE_PARAGRAPHS):
+    cd src && python -m backend.fear_monger_processor.precision [--precisions bf16 int8]
+"""
+import argparse
+import json
+import platform
+import warnings
+
+import numpy as np
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import BATCH_SIZE, PRECISION
+from backend.fear_monger_processor.reference import REFERENCE_PARAGRAPHS
+
+PRECISIONS = ("fp32", "bf16", "int8")
+DRIFT_TOLERANCE = {"fp32": 1e-6, "bf16": 0.05, "int8": 0.05}  # max |fear prob diff| vs fp32
+
+
+def _cpu_flags():
+    """CPU feature flags from /proc/cpuinfo (empty set if unavailable)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("flags", "Features"):
+                    return set(value.split())
+    except OSError:
+        pass
+    return set()
+
+
+def bf16_supported():
+    """True if this CPU has native bf16 arithmetic (otherwise bf16 is emulated and slower than fp32)"""
+    flags = _cpu_flags()
+    if flags:
+        return bool(flags & {"avx512_bf16", "amx_bf16", "bf16"})
+    return platform.system() == "Darwin" and platform.machine() == "arm64"  # Apple M2 and later
+
+
+def int8_supported():
+    """True if PyTorch has a quantized CPU backend for dynamic int8 Linear layers"""
+    import torch
+    return any(engine != "none" for engine in torch.backends.quantized.supported_engines)
+
+
+def resolve_precision(precision=PRECISION):
+    """The precision that will actually run on this host (falls back to fp32)"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision!r} (expected one of {PRECISIONS})")
+    supported = {"fp32": lambda: True, "bf16": bf16_supported, "int8": int8_supported}[precision]()
+    if not supported:
+        warnings.warn(f"{precision} inference is not supported on this CPU; using fp32")
+        return "fp32"
+    return precision
+
+
+def apply_precision(classifier, precision=PRECISION):
+    """Convert a PyTorch pipeline's model in place to `precision` (or its fallback) and return the pipeline"""
+    import torch
+
+    precision = resolve_precision(precision)
+    if precision == "bf16":
+        classifier.model.to(torch.bfloat16)
+    elif precision == "int8":
+        classifier.model = torch.ao.quantization.quantize_dynamic(
+            classifier.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+    classifier.precision = precision
+    if precision != "fp32":
+        base = getattr(classifier, "cache_revision", None) or resolve_revision()  # prepared artifacts carry their sha
+        classifier.cache_revision = f"{base}+{precision}"  # see cache.cache_for
+    return classifier
+
+
+# ======================================================
+# ACCURACY DRIFT REPORT
+# ======================================================
+def drift_report(paragraphs=REFERENCE_PARAGRAPHS, precisions=("bf16", "int8"), batch_size=BATCH_SIZE, repeats=3):
+    """Score `paragraphs` in fp32 and every requested precision; report score drift and throughput"""
+    from backend.fear_monger_processor.model import build_pipeline
+    from backend.fear_monger_processor.onnx_engine import _fear_probabilities, _timings
+
+    paragraphs = list(paragraphs)
+    baseline = apply_precision(build_pipeline(), "fp32")
+    _fear_probabilities(baseline, paragraphs[:2], batch_size)  # warm up
+    reference = _fear_probabilities(baseline, paragraphs, batch_size)
+    report = {"paragraphs": len(paragraphs), "fp32": _timings(baseline, paragraphs, batch_size, repeats)}
+
+    for requested in precisions:
+        # A fresh pipeline per precision: the conversion modifies the model in place
+        classifier = apply_precision(build_pipeline(), requested)
+        _fear_probabilities(classifier, paragraphs[:2], batch_size)
+        scores = _fear_probabilities(classifier, paragraphs, batch_size)
+        diff = np.abs(scores - reference)
+
+        entry = {
+            "requested": requested,
+            "precision": classifier.precision,
+            "max_abs_diff": round(float(diff.max()), 5),
+            "mean_abs_diff": round(float(diff.mean()), 5),
+            "label_agreement": round(float(np.mean((scores >= 0.5) == (reference >= 0.5))), 4),
+            "tolerance": DRIFT_TOLERANCE[classifier.precision],
+            **_timings(classifier, paragraphs, batch_size, repeats),
+        }
+        entry["passed"] = entry["max_abs_diff"] <= entry["tolerance"]
+        entry["throughput_speedup"] = round(entry["throughput_per_s"] / report["fp32"]["throughput_per_s"], 2)
+        report[requested] = entry
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare reduced-precision PyTorch inference against fp32.")
+    parser.add_argument("--precisions", nargs="+", default=["bf16", "int8"], choices=["bf16", "int8"])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    result = drift_report(precisions=args.precisions, batch_size=args.batch_size)
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if all(result[p]["passed"] for p in args.precisions) else 1)
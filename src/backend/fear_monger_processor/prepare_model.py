@@ -0,0 +1,207 @@
+"""prepare_model.py - One-time local model artifact for fast, shared cold starts
+
+`prepare_model()` converts the Hugging Face model once into PREPARED_DIR:
+model.safetensors + config + tokenizer + a manifest. `load_prepared_pipeline()`
+then memory-maps the weights read-only and hands them to the model with
+`load_state_dict(assign=True)`, so nothing is copied. Every process on the
+host maps the same page-cache pages instead of holding its own copy of the weights.
+
+Usage:
+    cd src && python -m backend.fear_monger_processor.prepare_model [--force] [--report]
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import BASE_DIR, MAX_TOKENS, MODEL_NAME, MODEL_REVISION, PREPARED_DIR
+
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "manifest.json"
+
+# safetensors dtype tags -> torch dtype names
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def prepare_model(out_dir=PREPARED_DIR, model_name=MODEL_NAME, revision=MODEL_REVISION, force=False):
+    """Write the safetensors artifact + tokenizer once; returns the directory"""
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    out_dir = Path(out_dir)
+    if is_prepared(out_dir, model_name, revision) and not force:
+        return out_dir
+    sha = resolve_revision(model_name, revision)  # pinned, so the weights match the manifest
+
+    # Built next to the target and swapped in whole: a crash never leaves a half-written
+    # artifact behind a valid manifest, and processes that map the old weights keep their
+    # (unlinked) file instead of seeing it truncated under them
+    tmp = out_dir.with_name(f"{out_dir.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=sha).eval()
+    model.save_pretrained(tmp, safe_serialization=True)
+    AutoTokenizer.from_pretrained(model_name, revision=sha).save_pretrained(tmp)
+    with open(tmp / WEIGHTS_FILE, "rb") as f:
+        os.fsync(f.fileno())
+
+    # Written last: its presence marks a complete artifact
+    (tmp / MANIFEST_FILE).write_text(json.dumps({"model": model_name, "revision": sha}, indent=2))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp.replace(out_dir)
+    return out_dir
+
+
+def read_manifest(model_dir=PREPARED_DIR):
+    """The artifact's manifest ({"model", "revision": commit sha}), or None if there is none"""
+    try:
+        return json.loads((Path(model_dir) / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_prepared(model_dir=PREPARED_DIR, model_name=MODEL_NAME, revision=MODEL_REVISION):
+    """True if `model_dir` holds a complete artifact for the commit `revision` currently points to.
+
+    A branch like "main" is resolved first, so an artifact built before the model
+    moved upstream counts as stale.
+    """
+    expected = {"model": model_name, "revision": resolve_revision(model_name, revision)}
+    return read_manifest(model_dir) == expected and (Path(model_dir) / WEIGHTS_FILE).exists()
+
+
+def mmap_state_dict(path):
+    """Tensors of a .safetensors file as zero-copy, read-only views of one shared mapping.
+
+    Returns (state_dict, mapping); keep `mapping` alive as long as the tensors are used.
+    """
+    import torch
+
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (header_len,) = struct.unpack("<Q", mapping[:8])
+    header = json.loads(mapping[8:8 + header_len])
+    header.pop("__metadata__", None)
+    data_start = 8 + header_len
+
+    state = {}
+    with warnings.catch_warnings():
+        # torch warns that the buffer is not writable; inference never writes weights
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            dtype = getattr(torch, _DTYPES[info["dtype"]])
+            begin, end = info["data_offsets"]
+            if end == begin:
+                state[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            flat = torch.frombuffer(mapping, dtype=dtype, count=(end - begin) // dtype.itemsize,
+                                    offset=data_start + begin)
+            state[name] = flat.view(info["shape"])
+    return state, mapping
+
+
+def load_prepared_model(model_dir=PREPARED_DIR):
+    """Sequence classifier whose weights are memory-mapped from the prepared artifact"""
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+    from transformers.modeling_utils import no_init_weights
+
+    model_dir = Path(model_dir)
+    config = AutoConfig.from_pretrained(model_dir)
+    with no_init_weights():  # skip random init; every weight is replaced below
+        model = AutoModelForSequenceClassification.from_config(config)
+
+    state, mapping = mmap_state_dict(model_dir / WEIGHTS_FILE)
+    missing, unexpected = model.load_state_dict(state, strict=False, assign=True)
+    if unexpected:
+        raise ValueError(f"Prepared artifact does not match the model config: unexpected {unexpected}")
+    if missing:
+        model.tie_weights()  # tied weights are stored once in safetensors
+        # Anything still not backed by the artifact would be uninitialized memory (see no_init_weights)
+        loaded = {tensor.data_ptr() for tensor in state.values()}
+        params = model.state_dict()
+        untied = [key for key in missing if params[key].numel() and params[key].data_ptr() not in loaded]
+        if untied:
+            raise ValueError(f"Prepared artifact does not match the model config: missing {untied}")
+
+    model._weights_mmap = mapping  # the tensors are views into this mapping
+    return model.eval()
+
+
+def load_prepared_pipeline(model_dir=PREPARED_DIR):
+    """text-classification pipeline over the mmap-loaded artifact, configured like model.build_pipeline"""
+    from transformers import AutoTokenizer, pipeline
+
+    classifier = pipeline(
+        "text-classification",
+        model=load_prepared_model(model_dir),
+        tokenizer=AutoTokenizer.from_pretrained(model_dir),
+        truncation=True,
+        max_length=MAX_TOKENS,
+        top_k=1,
+    )
+    # Scores are cached under the sha the weights were built from, not whatever "main" is now
+    classifier.cache_revision = read_manifest(model_dir)["revision"]  # see cache.cache_for
+    return classifier
+
+
+# ======================================================
+# COLD START + MEMORY REPORT
+# ======================================================
+def memory_usage():
+    """Resident memory of this process in MB, split into anonymous (private) and file-backed (shareable)"""
+    usage = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    usage[f"{key.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:  # not Linux: peak RSS only
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["max_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return usage
+
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+from backend.fear_monger_processor.model import build_pipeline
+from backend.fear_monger_processor.inference import predict_proba
+from backend.fear_monger_processor.prepare_model import memory_usage
+classifier = build_pipeline(prepared={prepared})
+predict_proba(classifier, ["Cold start probe."])
+print(json.dumps({{"cold_start_s": round(time.perf_counter() - start, 3), **memory_usage()}}))
+"""
+
+
+def cold_start_report():
+    """Cold start (import + load + first prediction) and RSS in fresh processes, Hub cache vs prepared artifact"""
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    report = {}
+    for label, prepared in (("hub_cache", False), ("prepared_mmap", True)):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(prepared=prepared)],
+                             env=env, capture_output=True, text=True, check=True).stdout
+        report[label] = json.loads(out.strip().splitlines()[-1])
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the local, memory-mappable model artifact.")
+    parser.add_argument("--force", action="store_true", help="Rebuild the artifact even if it exists")
+    parser.add_argument("--report", action="store_true", help="Compare cold start and RSS before/after")
+    args = parser.parse_args()
+
+    print(f"Prepared model at {prepare_model(force=args.force)}")
+    if args.report:
+        print(json.dumps(cold_start_report(), indent=2))
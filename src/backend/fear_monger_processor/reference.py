@@ -0,0 +1,30 @@
+"""reference.py - Small fixed paragraph set for engine parity and accuracy-drift checks"""
+
+REFERENCE_PARAGRAPHS = [
+    # Clearly fear-mongering
+    "If we don't act right now, this virus will wipe out millions and nobody will be safe. "
+    "They are hiding the real numbers from you.",
+    "Your children are in danger every single day they walk into that school. "
+    "The next attack is coming and the government is doing nothing to stop it.",
+    "The economy is about to collapse overnight. Pull your money out of the banks before it's too late, "
+    "because when it crashes you will lose everything.",
+    "These people are flooding into our towns and they will destroy everything you love. "
+    "Lock your doors, because the police can't protect you anymore.",
+    "Scientists warn that the catastrophe is unavoidable. Billions will starve, cities will burn, "
+    "and there is nothing anyone can do.",
+    "One bite of this common food could be silently poisoning you. Doctors won't tell you the truth "
+    "until it's too late.",
+    # Neutral / informative
+    "Thank you so much. It's a pleasure to be here with all of you this morning.",
+    "(Laughter) So I started learning the cello when I was seven, and I was terrible at it.",
+    "The study followed 2,000 participants over ten years and found a modest improvement "
+    "in sleep quality among those who exercised regularly.",
+    "Photosynthesis converts light energy into chemical energy, which plants store as sugar.",
+    "Our team built a small prototype out of cardboard and tested it in the school gym.",
+    "The city council will meet on Tuesday to discuss the new bike lanes on Main Street.",
+    # Mixed / borderline
+    "Climate change is a serious risk, and the data show rising sea levels, "
+    "but there are practical steps communities are already taking to adapt.",
+    "Some experts worry about the new technology, while others argue the concerns are overstated. "
+    "(Applause)",
+]
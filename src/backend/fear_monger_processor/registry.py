@@ -0,0 +1,162 @@
+"""registry.py - Process-wide, reference-counted classifier registry
+
+Every Streamlit session (and both apps) in a process share one classifier per
+engine instead of loading their own copy. Sessions hold a `ModelLease`; the
+reference is released automatically when the session's state is garbage
+collected. Local model calls take a slot from the process-wide InferenceScheduler
+(scheduler.py), so concurrent sessions queue by priority instead of
+oversubscribing the CPU. The "server" engine is not wrapped: the inference
+server schedules those calls itself.
+
+    lease = get_registry().lease()
+    scores = run_inference(lease.classifier, paragraphs)
+"""
+import threading
+import time
+import weakref
+
+from backend.fear_monger_processor.config import ENGINE, REGISTRY_KEEP_WARM
+from backend.fear_monger_processor.scheduler import get_scheduler
+
+
+class SharedClassifier:
+    """A registry-owned classifier whose calls are admitted by an InferenceScheduler.
+
+    Attribute access (tokenizer, model, cache_revision, ...) is forwarded to
+    the wrapped classifier, so it can be passed anywhere a classifier is expected.
+    """
+
+    def __init__(self, classifier, scheduler=None):
+        self._classifier = classifier
+        self.scheduler = scheduler or get_scheduler()
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self._classifier, name)
+
+    def slot(self, priority=None):
+        """Hold one model slot (at the caller's priority) for the duration of the block"""
+        self.calls += 1
+        return self.scheduler.slot(priority)
+
+    def predict_proba(self, texts):
+        from backend.fear_monger_processor.inference import predict_proba
+
+        with self.slot():
+            return predict_proba(self._classifier, texts)
+
+    def __call__(self, *args, **kwargs):
+        with self.slot():
+            return self._classifier(*args, **kwargs)
+
+
+class ModelLease:
+    """One holder's reference to a shared classifier; released on release() or garbage collection"""
+
+    def __init__(self, registry, engine, classifier):
+        self.engine = engine
+        self.classifier = classifier
+        self._finalizer = weakref.finalize(self, registry.release, engine)
+
+    def release(self):
+        self._finalizer()  # runs at most once
+
+
+class ModelRegistry:
+    """Loads each engine's classifier once per process and counts who is using it"""
+
+    def __init__(self, scheduler=None, keep_warm=REGISTRY_KEEP_WARM):
+        self.scheduler = scheduler or get_scheduler()
+        self.keep_warm = keep_warm
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._entries = {}  # engine -> {"classifier", "refs", "pinned", "load_seconds", "loaded_at"}
+
+    def acquire(self, engine=ENGINE):
+        """Shared classifier for `engine` (loaded on first use); pair every call with release()"""
+        with self._lock:
+            entry = self._entries.get(engine)
+            if entry is not None:
+                entry["refs"] += 1
+                return entry["classifier"]
+            load_lock = self._load_locks.setdefault(engine, threading.Lock())
+
+        # Only one thread loads a given engine; others wait here, then reuse its result
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(engine)
+                if entry is not None:
+                    entry["refs"] += 1
+                    return entry["classifier"]
+
+            from backend.fear_monger_processor.model import build_classifier
+
+            start = time.perf_counter()
+            classifier = build_classifier(engine)
+            if engine != "server":
+                # The server admits remote calls with its own scheduler (priority travels with the
+                # request); a second, local limit in front of it would only reorder or stall them
+                classifier = SharedClassifier(classifier, self.scheduler)
+            with self._lock:
+                self._entries[engine] = {
+                    "classifier": classifier,
+                    "refs": 1,
+                    "pinned": False,
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }
+            return classifier
+
+    def release(self, engine=ENGINE):
+        """Drop one reference; the model is unloaded at zero unless keep_warm"""
+        with self._lock:
+            entry = self._entries.get(engine)
+            if entry is None:
+                return
+            entry["refs"] = max(entry["refs"] - 1, 0)
+            if entry["refs"] == 0 and not entry["pinned"] and not self.keep_warm:
+                del self._entries[engine]
+
+    def lease(self, engine=ENGINE):
+        """Acquire a reference that is released automatically when the lease is garbage collected"""
+        return ModelLease(self, engine, self.acquire(engine))
+
+    def get(self, engine=ENGINE):
+        """Shared classifier held for the lifetime of the process (one pinned reference per engine)"""
+        classifier = self.acquire(engine)
+        with self._lock:
+            entry = self._entries[engine]
+            if entry["pinned"]:
+                entry["refs"] -= 1  # already holds its process-lifetime reference
+            entry["pinned"] = True
+        return classifier
+
+    def metrics(self):
+        """Load time and references per engine, scheduler queues and waits, plus this process's memory"""
+        from backend.fear_monger_processor.prepare_model import memory_usage
+
+        with self._lock:
+            engines = {
+                engine: {
+                    "references": entry["refs"],
+                    "load_seconds": entry["load_seconds"],
+                    "loaded_at": entry["loaded_at"],
+                    "calls": getattr(entry["classifier"], "calls", None),  # None: scheduled by the server
+                    "precision": getattr(entry["classifier"], "precision", None),
+                }
+                for engine, entry in self._entries.items()
+            }
+        return {"engines": engines, "scheduler": self.scheduler.metrics(), "memory": memory_usage()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The process-wide ModelRegistry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,139 @@
+"""scheduler.py - Priority-aware admission of model calls
+
+Every model call (one batch of run_inference) takes a slot from an
+InferenceScheduler. There are INFERENCE_CONCURRENCY slots, split between the
+priority classes in PRIORITY_CLASSES (highest first), each class capped by
+SCHEDULER_LIMITS. Each time a slot frees up, waiting interactive calls are
+admitted before batch calls. A long corpus job is therefore preempted at its
+next batch boundary, and while no interactive work is waiting it keeps idle
+slots busy.
+
+The priority of a call comes from the calling context, "interactive" by default:
+
+    with inference_priority("batch"):
+        run_inference(classifier, corpus_paragraphs)
+"""
+import collections
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.fear_monger_processor.config import INFERENCE_CONCURRENCY, PRIORITY_CLASSES, SCHEDULER_LIMITS
+
+_priority = contextvars.ContextVar("inference_priority", default=PRIORITY_CLASSES[0])
+
+
+def _check_priority(priority):
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class: {priority!r} (expected one of {PRIORITY_CLASSES})")
+    return priority
+
+
+def current_priority():
+    """Priority class of model calls made from the current context"""
+    return _priority.get()
+
+
+def set_priority(priority):
+    """Set the priority for the rest of the current context (e.g. a worker process)"""
+    _priority.set(_check_priority(priority))
+
+
+@contextmanager
+def inference_priority(priority):
+    """Run the block's model calls at `priority`"""
+    token = _priority.set(_check_priority(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _percentile_ms(sorted_seconds, pct):
+    if not sorted_seconds:
+        return 0.0
+    index = min(len(sorted_seconds) - 1, round(pct / 100 * (len(sorted_seconds) - 1)))
+    return round(sorted_seconds[index] * 1000, 2)
+
+
+class InferenceScheduler:
+    """Priority classes sharing `max_concurrency` model slots, with per-class limits"""
+
+    def __init__(self, max_concurrency=INFERENCE_CONCURRENCY, limits=SCHEDULER_LIMITS, history=1000):
+        self.max_concurrency = max_concurrency
+        self.limits = {cls: min(limits.get(cls, max_concurrency), max_concurrency) for cls in PRIORITY_CLASSES}
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = {cls: collections.deque() for cls in PRIORITY_CLASSES}  # FIFO per class
+        self._active = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._admitted = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._waits = {cls: collections.deque(maxlen=history) for cls in PRIORITY_CLASSES}  # recent wait times (s)
+
+    def _admissible(self, cls, ticket):
+        if self._waiting[cls][0] != ticket:
+            return False  # FIFO within a class
+        if sum(self._active.values()) >= self.max_concurrency or self._active[cls] >= self.limits[cls]:
+            return False
+        # Yield to any waiter of a higher class that could run right now
+        for higher in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(cls)]:
+            if self._waiting[higher] and self._active[higher] < self.limits[higher]:
+                return False
+        return True
+
+    @contextmanager
+    def slot(self, priority=None):
+        """Hold one model slot for the block, waiting behind higher-priority calls"""
+        cls = _check_priority(priority or current_priority())
+        ticket = next(self._tickets)
+        start = time.perf_counter()
+        with self._cond:
+            self._waiting[cls].append(ticket)
+            try:
+                self._cond.wait_for(lambda: self._admissible(cls, ticket))
+            except BaseException:  # e.g. KeyboardInterrupt: a stale ticket would block its class for good
+                self._waiting[cls].remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._waiting[cls].popleft()
+            self._active[cls] += 1
+            self._admitted[cls] += 1
+            self._waits[cls].append(time.perf_counter() - start)
+            self._cond.notify_all()  # the next waiter may be admissible as well
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[cls] -= 1
+                self._cond.notify_all()
+
+    def metrics(self):
+        """Queue depth, active calls and recent wait-time percentiles per priority class"""
+        with self._cond:
+            classes = {}
+            for cls in PRIORITY_CLASSES:
+                waits = sorted(self._waits[cls])
+                classes[cls] = {
+                    "queue_depth": len(self._waiting[cls]),
+                    "active": self._active[cls],
+                    "limit": self.limits[cls],
+                    "admitted": self._admitted[cls],
+                    "wait_ms_p50": _percentile_ms(waits, 50),
+                    "wait_ms_p95": _percentile_ms(waits, 95),
+                    "wait_ms_max": _percentile_ms(waits, 100),
+                }
+        return {"max_concurrency": self.max_concurrency, "classes": classes}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The process-wide InferenceScheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = InferenceScheduler()
+        return _scheduler
@@ -0,0 +1,52 @@
+"""sentence_store.py - Score each sentence once, derive any paragraph grouping from the stored scores"""
+import numpy as np
+
+from backend.fear_monger_processor.config import MAX_CHARS, MAX_SENTENCES, SENTENCE_AGGREGATE
+from backend.fear_monger_processor.inference import run_inference
+from backend.fear_monger_processor.utils import group_sentences, split_sentences
+
+
+class SentenceScoreStore:
+    """Per-sentence fear scores for one transcript.
+
+    The model runs once over the sentences; after that, every change of
+    max_chars / max_sentences is a vectorized re-aggregation of the stored
+    score vector with no new forward passes.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.sentences = split_sentences(text)
+        self.lengths = np.array([len(s) for s in self.sentences], dtype=np.float32)
+        self.scores = None
+
+    def score(self, classifier, **inference_kwargs):
+        """Score every sentence (only on the first call) and return the score vector"""
+        if self.scores is None:
+            self.scores = run_inference(classifier, self.sentences, **inference_kwargs)
+        return self.scores
+
+    def paragraphs(self, max_chars=MAX_CHARS, max_sentences=MAX_SENTENCES, how=SENTENCE_AGGREGATE):
+        """Group sentences like segment_text and return (paragraphs, paragraph_scores).
+
+        how="mean" weights each sentence by its character length; how="max"
+        takes the most fearful sentence of each paragraph.
+        """
+        if self.scores is None:
+            raise RuntimeError("Call score(classifier) before aggregating sentence scores")
+        if not self.sentences:
+            return [], np.array([], dtype=np.float32)
+
+        ranges = group_sentences(self.sentences, max_chars, max_sentences)
+        starts = np.array([start for start, _ in ranges])
+        paragraphs = [" ".join(self.sentences[start:end]) for start, end in ranges]
+
+        if how == "max":
+            scores = np.maximum.reduceat(self.scores, starts)
+        elif how == "mean":
+            weighted = np.add.reduceat(self.scores * self.lengths, starts)
+            scores = weighted / np.maximum(np.add.reduceat(self.lengths, starts), 1)
+        else:
+            raise ValueError(f"Unknown sentence aggregation: {how!r} (expected 'mean' or 'max')")
+
+        return paragraphs, scores.astype(np.float32)
@@ -0,0 +1,219 @@
+"""server.py - Local inference server with dynamic micro-batching
+
+One warm classifier serves every dashboard session on the machine. Concurrent
+requests are queued per priority class and coalesced into micro-batches: the
+first request in a batch waits at most SERVER_MAX_WAIT_MS for others to join,
+up to SERVER_MAX_BATCH paragraphs per model call. Model calls are admitted by
+an InferenceScheduler (scheduler.py), so "interactive" requests overtake
+"batch" requests (e.g. corpus scoring) at every batch boundary.
+
+Endpoints (JSON):
+    POST /predict   {"paragraphs": [...], "priority": "interactive" | "batch"}  ->  {"scores": [...]}
+    GET  /health    ->  {"status": "ok", ..., "stats": {..., "scheduler": {...}}}
+
+Usage:
+    cd src && python -m backend.fear_monger_processor.server [--port 8765 | --socket /tmp/fear.sock]
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import (
+    CACHE_ENABLED, ENGINE, MODEL_NAME, PRIORITY_CLASSES, SERVER_MAX_BATCH, SERVER_MAX_WAIT_MS,
+)
+from backend.fear_monger_processor.scheduler import InferenceScheduler
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Coalesces concurrent predict requests of the same priority class into shared model calls"""
+
+    def __init__(self, classifier, max_batch=SERVER_MAX_BATCH, max_wait_ms=SERVER_MAX_WAIT_MS, use_cache=CACHE_ENABLED,
+                 scheduler=None):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.use_cache = use_cache
+        self.queues = {cls: asyncio.Queue() for cls in PRIORITY_CLASSES}
+        # One model thread per class; the scheduler decides which batch may run when both are ready
+        self.scheduler = scheduler or InferenceScheduler()
+        self._model_threads = ThreadPoolExecutor(max_workers=len(PRIORITY_CLASSES), thread_name_prefix="fear-model")
+        self.stats = {"requests": 0, "paragraphs": 0, "duplicates": 0, "model_calls": 0, "busy_s": 0.0}
+
+    async def predict(self, paragraphs, priority=PRIORITY_CLASSES[0]):
+        if priority not in self.queues:
+            raise ValueError(f"Unknown priority class: {priority!r} (expected one of {PRIORITY_CLASSES})")
+        future = asyncio.get_running_loop().create_future()
+        await self.queues[priority].put((paragraphs, future))
+        return await future
+
+    async def run(self):
+        """One collector per priority class"""
+        await asyncio.gather(*(self._collect(cls) for cls in PRIORITY_CLASSES))
+
+    async def _collect(self, priority):
+        """Collector loop: gather requests until the batch is full or the deadline passes"""
+        loop = asyncio.get_running_loop()
+        queue = self.queues[priority]
+        while True:
+            pending = [await queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            await self._run_batch(pending, priority)
+
+    def queue_depths(self):
+        return {cls: queue.qsize() for cls, queue in self.queues.items()}
+
+    async def _run_batch(self, pending, priority=PRIORITY_CLASSES[0]):
+        from backend.fear_monger_processor.cache import cache_for
+        from backend.fear_monger_processor.inference import batched_predict
+
+        paragraphs = [para for request, _ in pending for para in request]
+        cache = cache_for(self.classifier) if self.use_cache else None
+
+        job = {}
+
+        def predict():
+            with self.scheduler.slot(priority):
+                start = time.perf_counter()
+                scores = batched_predict(self.classifier, paragraphs, batch_size=self.max_batch, cache=cache, stats=job)
+                job["busy_s"] = time.perf_counter() - start
+                return scores
+
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(self._model_threads, predict)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.stats["requests"] += len(pending)
+        self.stats["paragraphs"] += len(paragraphs)
+        self.stats["duplicates"] += job["duplicates"]  # identical paragraphs across coalesced requests
+        self.stats["model_calls"] += 1
+        self.stats["busy_s"] += job["busy_s"]
+
+        # Hand each request back exactly its own slice of the merged batch
+        offset = 0
+        for request, future in pending:
+            if not future.done():
+                future.set_result(scores[offset:offset + len(request)].tolist())
+            offset += len(request)
+
+
+async def _read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        return None, None, b""
+    method, path, _ = request_line.split(" ", 2)
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, body
+
+
+async def _write_json(writer, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+
+
+def make_handler(batcher, info):
+    async def handle(reader, writer):
+        try:
+            method, path, body = await _read_request(reader)
+            if method == "POST" and path == "/predict":
+                payload = json.loads(body or b"{}")
+                paragraphs = payload.get("paragraphs")
+                if not isinstance(paragraphs, list) or not all(isinstance(p, str) for p in paragraphs):
+                    await _write_json(writer, 400, {"error": "'paragraphs' must be a list of strings"})
+                else:
+                    priority = payload.get("priority", PRIORITY_CLASSES[0])
+                    await _write_json(writer, 200, {"scores": await batcher.predict(paragraphs, priority)})
+            elif method == "GET" and path == "/health":
+                stats = {**batcher.stats, "queue_depth": batcher.queue_depths(),
+                         "scheduler": batcher.scheduler.metrics()}
+                await _write_json(writer, 200, {"status": "ok", **info, "stats": stats})
+            elif method is not None:
+                await _write_json(writer, 404, {"error": f"No route for {method} {path}"})
+        except (ValueError, json.JSONDecodeError) as exc:
+            await _write_json(writer, 400, {"error": str(exc)})
+        except Exception as exc:
+            await _write_json(writer, 500, {"error": str(exc)})
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host="127.0.0.1", port=8765, socket_path=None, engine=ENGINE,
+                max_batch=SERVER_MAX_BATCH, max_wait_ms=SERVER_MAX_WAIT_MS):
+    """Load the classifier once and serve it until cancelled"""
+    from backend.fear_monger_processor.model import build_classifier
+
+    classifier = build_classifier(engine)
+    batcher = MicroBatcher(classifier, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    info = {
+        "model": MODEL_NAME,
+        "engine": engine,
+        "cache_revision": getattr(classifier, "cache_revision", None) or resolve_revision(),
+    }
+
+    handler = make_handler(batcher, info)
+    if socket_path:
+        server = await asyncio.start_unix_server(handler, path=socket_path)
+        print(f"Fear inference server ({engine}) listening on unix://{socket_path}")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"Fear inference server ({engine}) listening on http://{host}:{port}")
+
+    collector = asyncio.create_task(batcher.run())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        collector.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fear classifier to local clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--engine", default="pytorch" if ENGINE == "server" else ENGINE, choices=["pytorch", "onnx"])
+    parser.add_argument("--max-batch", type=int, default=SERVER_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVER_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket, args.engine, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
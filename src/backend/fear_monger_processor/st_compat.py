@@ -0,0 +1,63 @@
+"""st_compat.py - Optional Streamlit hooks so the processor also runs headless
+
+Streamlit is only used when the current process is a Streamlit app (i.e. the
+app already imported it). Batch workers, the CLI and the inference server
+never import Streamlit and get plain in-process caching instead.
+"""
+import functools
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def active_streamlit():
+    """The streamlit module if this process is running a Streamlit app, else None"""
+    return sys.modules.get("streamlit")
+
+
+def _lazy_cache(func, streamlit_decorator):
+    # Decide on first call (not at import) which cache backs the function
+    cached = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal cached
+        if cached is None:
+            st = active_streamlit()
+            cached = getattr(st, streamlit_decorator)(func) if st else functools.lru_cache(maxsize=None)(func)
+        return cached(*args, **kwargs)
+
+    return wrapper
+
+
+def cache_resource(func):
+    """`st.cache_resource` inside Streamlit, an in-process memo cache otherwise"""
+    return _lazy_cache(func, "cache_resource")
+
+
+def cache_data(func):
+    """`st.cache_data` inside Streamlit, an in-process memo cache otherwise"""
+    return _lazy_cache(func, "cache_data")
+
+
+class _NoProgress:
+    def progress(self, value):
+        pass
+
+    def empty(self):
+        pass
+
+
+def progress_bar():
+    """`st.progress(0)` inside Streamlit, a no-op stand-in otherwise"""
+    st = active_streamlit()
+    return st.progress(0) if st else _NoProgress()
+
+
+def show_error(message):
+    """Show an error in the Streamlit UI if there is one, always log it"""
+    logger.error(message)
+    st = active_streamlit()
+    if st:
+        st.error(message)
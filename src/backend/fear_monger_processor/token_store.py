@@ -0,0 +1,269 @@
+"""token_store.py - Pre-tokenized TED corpus in memory-mapped arrays
+
+Every segment of ted_talks_transcripts.csv is tokenized once and written to a
+store directory:
+- ids.int32: all token ids back to back (with special tokens, truncated to MAX_TOKENS);
+- offsets.npy: segment i is ids[offsets[i]:offsets[i + 1]];
+- talk_offsets.npy: talk t owns segments talk_offsets[t]:talk_offsets[t + 1];
+- text.bin + text_offsets.npy: the segment texts (UTF-8), for the score cache and reports;
+- meta.json: tokenizer version, segmentation, source file, counts.
+
+The directory name is a hash of the tokenizer version, the segmentation and the
+source file, so a new tokenizer or an edited CSV gets a new store. score_store()
+feeds the id slices from the memory map to the usual run_inference pipeline: no
+tokenization, and segment lengths (for length-sorted batching) come from the offsets for free. That makes repeated
+experiments cheap: threshold sweeps, or models sharing a tokenizer (precisions, ONNX vs PyTorch).
+
+    store = open_token_store(tokenizer_for(classifier))  # builds it on first use
+    scores = score_store(classifier, store)  # run_inference, fed from the memory map
+
+Usage:
+    cd src && python -m backend.fear_monger_processor.token_store build [--limit N]
+    cd src && python -m backend.fear_monger_processor.token_store score [--limit N] [--out ted_corpus_scores.csv]
+"""
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.fear_monger_processor.config import (
+    BATCH_SIZE, CACHE_ENABLED, CORPUS_SCORES_PATH, DATA_DIR, MAX_CHARS, MAX_SENTENCES, MAX_TOKENS,
+    MODEL_NAME, MODEL_REVISION, TOKEN_STORE_CHUNK, TOKEN_STORE_DIR,
+)
+
+TED_TRANSCRIPTS = DATA_DIR / "ted_talks_transcripts.csv"
+IDS_FILE = "ids.int32"
+TEXT_FILE = "text.bin"
+
+
+def tokenizer_version(tokenizer):
+    """Tokenizers with equal versions produce identical ids (vocabulary, casing, special tokens, class)"""
+    from backend.fear_monger_processor.ensemble import vocabulary_key
+
+    return f"{type(tokenizer).__name__}-{vocabulary_key(tokenizer)[:16]}"
+
+
+def store_key(tokenizer, source=TED_TRANSCRIPTS, max_chars=MAX_CHARS, max_sentences=MAX_SENTENCES, limit=None):
+    """Directory name of the store for this tokenizer, segmentation and source file"""
+    stat = Path(source).stat()
+    payload = json.dumps([tokenizer_version(tokenizer), MAX_TOKENS, max_chars, max_sentences,
+                          str(Path(source).resolve()), stat.st_size, stat.st_mtime_ns, limit])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _memmap(path, dtype):
+    # np.memmap refuses empty files
+    return np.memmap(path, dtype=dtype, mode="r") if path.stat().st_size else np.zeros(0, dtype=dtype)
+
+
+class TokenStore:
+    """Read-only, memory-mapped view of a built store"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.ids = _memmap(self.path / IDS_FILE, np.int32)
+        self.offsets = np.load(self.path / "offsets.npy")
+        self.talk_offsets = np.load(self.path / "talk_offsets.npy")
+        self._text = _memmap(self.path / TEXT_FILE, np.uint8)
+        self.text_offsets = np.load(self.path / "text_offsets.npy")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self):
+        """Token count per segment"""
+        return np.diff(self.offsets)
+
+    @property
+    def talks(self):
+        return len(self.talk_offsets) - 1
+
+    def input_ids(self, i):
+        """Token ids of segment `i`: a view into the memory map, not a copy"""
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def text(self, i):
+        return self._text[self.text_offsets[i]:self.text_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def talk_segments(self, t):
+        """Segment indices of talk `t`"""
+        return np.arange(self.talk_offsets[t], self.talk_offsets[t + 1])
+
+
+def build_token_store(tokenizer, source=TED_TRANSCRIPTS, root=TOKEN_STORE_DIR, max_chars=MAX_CHARS,
+                      max_sentences=MAX_SENTENCES, limit=None, chunk=TOKEN_STORE_CHUNK):
+    """Segment and tokenize every transcript of `source` once; returns the new TokenStore"""
+    import pandas as pd
+
+    from backend.fear_monger_processor.utils import segment_text
+
+    key = store_key(tokenizer, source, max_chars, max_sentences, limit)
+    path = Path(root) / key
+    tmp = Path(root) / f"{key}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    transcripts = pd.read_csv(source)
+    if limit:
+        transcripts = transcripts.head(limit)
+
+    lengths, text_lengths, talk_sizes = [], [], []
+    start = time.perf_counter()
+    with open(tmp / IDS_FILE, "wb") as ids_file, open(tmp / TEXT_FILE, "wb") as text_file:
+        texts = transcripts["transcript"].tolist()
+        for first in range(0, len(texts), chunk):
+            segmented = [
+                segment_text(text, max_chars=max_chars, max_sentences=max_sentences)
+                if isinstance(text, str) and text.strip() else []
+                for text in texts[first:first + chunk]
+            ]
+            paragraphs = [para for segments in segmented for para in segments]
+            talk_sizes.extend(len(segments) for segments in segmented)
+            if not paragraphs:
+                continue
+            # Same tokenization as inference.predict_proba, so stored ids give identical scores
+            encoded = tokenizer(paragraphs, truncation=True, max_length=MAX_TOKENS)["input_ids"]
+            ids_file.write(np.fromiter((t for ids in encoded for t in ids), dtype=np.int32).tobytes())
+            lengths.extend(len(ids) for ids in encoded)
+            for para in paragraphs:
+                data = para.encode("utf-8")
+                text_file.write(data)
+                text_lengths.append(len(data))
+
+    np.save(tmp / "offsets.npy", np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]))
+    np.save(tmp / "talk_offsets.npy", np.concatenate([[0], np.cumsum(talk_sizes, dtype=np.int64)]))
+    np.save(tmp / "text_offsets.npy", np.concatenate([[0], np.cumsum(text_lengths, dtype=np.int64)]))
+    (tmp / "meta.json").write_text(json.dumps({
+        "tokenizer": tokenizer_version(tokenizer),
+        "pad_token_id": tokenizer.pad_token_id,
+        "max_tokens": MAX_TOKENS,
+        "max_chars": max_chars,
+        "max_sentences": max_sentences,
+        "source": str(Path(source).resolve()),
+        "limit": limit,
+        "urls": transcripts["url"].tolist() if "url" in transcripts else None,
+        "talks": len(talk_sizes),
+        "segments": len(lengths),
+        "tokens": int(sum(lengths)),
+        "build_s": round(time.perf_counter() - start, 2),
+    }, indent=2))
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.replace(path)  # readers never see a half-written store
+    return TokenStore(path)
+
+
+def open_token_store(tokenizer, source=TED_TRANSCRIPTS, root=TOKEN_STORE_DIR, max_chars=MAX_CHARS,
+                     max_sentences=MAX_SENTENCES, limit=None, build=True):
+    """The store for this tokenizer / segmentation / source file, built on first use (or None if `build` is off)"""
+    path = Path(root) / store_key(tokenizer, source, max_chars, max_sentences, limit)
+    if (path / "meta.json").exists():
+        return TokenStore(path)
+    if not build:
+        return None
+    return build_token_store(tokenizer, source, root, max_chars, max_sentences, limit)
+
+
+def pad_rows(rows, pad_id):
+    """Right-padded (input_ids, attention_mask) int64 arrays for one batch of id slices"""
+    width = max(len(row) for row in rows)
+    input_ids = np.full((len(rows), width), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+    for r, row in enumerate(rows):
+        input_ids[r, :len(row)] = row
+        attention_mask[r, :len(row)] = 1
+    return input_ids, attention_mask
+
+
+class StoreTokens:
+    """Stored ids of `segments` as the pre-tokenized `tokens` source of inference.iter_predict"""
+
+    def __init__(self, store, segments):
+        self.store = store
+        self.segments = np.asarray(segments, dtype=np.intp)
+
+    def lengths(self, positions):
+        return self.store.lengths[self.segments[positions]]
+
+    def batch(self, positions):
+        rows = [self.store.input_ids(i) for i in self.segments[positions]]
+        return pad_rows(rows, self.store.meta["pad_token_id"])
+
+
+def reads_token_ids(classifier):
+    """True if the classifier runs its model locally and can take token ids (see inference.predict_proba_ids)"""
+    return getattr(classifier, "tokenizer", None) is not None and (
+        hasattr(classifier, "session") or hasattr(classifier, "model"))
+
+
+def score_store(classifier, store, segments=None, batch_size=None, use_cache=CACHE_ENABLED, stats=None):
+    """Fear probability of `segments` (default: all), scored by run_inference from their stored token ids.
+
+    Dedup, the score cache and length-sorted batching are run_inference's; only
+    the tokenizer is skipped. Classifiers without a local model (the
+    inference-server client) are given the stored texts instead.
+    Returns a float32 array in `segments` order.
+    """
+    from backend.fear_monger_processor.inference import run_inference
+
+    segments = np.arange(len(store)) if segments is None else np.asarray(segments, dtype=np.intp)
+    tokens = None
+    if reads_token_ids(classifier):
+        if tokenizer_version(classifier.tokenizer) != store.meta["tokenizer"]:
+            raise ValueError(f"Token store {store.path.name} was built with tokenizer {store.meta['tokenizer']}, "
+                             f"not {tokenizer_version(classifier.tokenizer)}")
+        tokens = StoreTokens(store, segments)
+
+    return run_inference(classifier, [store.text(i) for i in segments], batch_size=batch_size, show_progress=False,
+                         use_cache=use_cache, stats=stats, tokens=tokens)
+
+
+def _tokenizer():
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(MODEL_NAME, revision=MODEL_REVISION)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-tokenize the TED corpus, or score it from the token store.")
+    parser.add_argument("command", choices=["build", "score"])
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N talks")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-cache", action="store_true", help="Score everything with the model")
+    parser.add_argument("--out", default=str(CORPUS_SCORES_PATH), help="Where `score` writes per-paragraph scores")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        built = build_token_store(_tokenizer(), limit=args.limit)
+        print(json.dumps({"path": str(built.path), **{k: v for k, v in built.meta.items() if k != "urls"}},
+                         indent=2))
+    else:
+        import pandas as pd
+
+        from backend.fear_monger_processor.model import load_classifier, tokenizer_for
+
+        classifier = load_classifier()
+        store = open_token_store(tokenizer_for(classifier), limit=args.limit)
+        job = {}
+        start = time.perf_counter()
+        corpus_scores = score_store(classifier, store, batch_size=args.batch_size, use_cache=not args.no_cache,
+                                    stats=job)
+        elapsed = time.perf_counter() - start
+
+        urls = store.meta["urls"] or [None] * store.talks
+        scores_df = pd.DataFrame([
+            {"url": urls[t], "paragraph_index": n, "Paragraph": store.text(i),
+             "Fear Mongering Score": float(corpus_scores[i])}
+            for t in range(store.talks)
+            for n, i in enumerate(store.talk_segments(t))
+        ])
+        scores_df.to_csv(args.out, index=False)
+        print(f"Scored {store.talks} talks / {len(store)} segments from {store.path.name} in {elapsed:.1f}s "
+              f"({job['model_scored']} model-scored, {job['cache_hits']} cached, "
+              f"{job['duplicates']} duplicates) -> {args.out}")
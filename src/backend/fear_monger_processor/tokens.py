@@ -0,0 +1,120 @@
+"""tokens.py - Token-budget helpers shared by segmentation and batched inference"""
+from backend.fear_monger_processor.config import BATCH_SIZE, MAX_TOKENS, WINDOW_OVERLAP
+
+
+def make_batches(lengths, batch_size=BATCH_SIZE):
+    """Group item indices into length-sorted buckets of at most `batch_size` items.
+
+    Items of similar length end up in the same bucket, so dynamic padding
+    (pad to the longest item in the batch) wastes very few tokens.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def count_tokens(tokenizer, texts):
+    """Token count per text, without special tokens and without truncation"""
+    if not texts:
+        return []
+    encoded = tokenizer(list(texts), add_special_tokens=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def pack_by_tokens(sentences, tokenizer, max_tokens=MAX_TOKENS, max_sentences=float("inf")):
+    """Greedily pack sentences into paragraphs of at most `max_tokens` model tokens.
+
+    The budget includes the special tokens the model adds ([CLS]/[SEP]), so a
+    packed paragraph is never truncated unless a single sentence is itself
+    longer than the budget (it then becomes a paragraph of its own).
+    """
+    budget = max_tokens - tokenizer.num_special_tokens_to_add()
+    counts = count_tokens(tokenizer, sentences)
+
+    paragraphs, current = [], []
+    current_tokens = 0
+
+    for sentence, n_tokens in zip(sentences, counts):
+        if current and (current_tokens + n_tokens > budget or len(current) >= max_sentences):
+            paragraphs.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += n_tokens
+
+    if current:
+        paragraphs.append(" ".join(current))
+
+    return paragraphs
+
+
+def token_windows(text, tokenizer, max_length=MAX_TOKENS, overlap=WINDOW_OVERLAP):
+    """Split text into overlapping windows that each fit in `max_length` model tokens.
+
+    Windows are exact substrings of `text`, cut between words (located via the
+    fast tokenizer's offset mapping) so that re-tokenizing a window gives the
+    same pieces. Each window is re-counted, and shortened if it still does not
+    fit; only a single word longer than the budget is cut inside the word.
+    Returns (window_texts, window_token_counts); text that already fits comes
+    back as a single window.
+    """
+    budget = max_length - tokenizer.num_special_tokens_to_add()
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    n = len(offsets)
+
+    if n <= budget:
+        return [text], [n]
+
+    def word_start(i):  # token i starts a new word (or is the end of the text)
+        return i in (0, n) or offsets[i][0] > offsets[i - 1][1]
+
+    def last_word_start(i, floor):  # nearest word start in (floor, i], else i itself
+        j = i
+        while j > floor + 1 and not word_start(j):
+            j -= 1
+        return j if word_start(j) else i
+
+    windows, counts = [], []
+    start = 0
+    while True:
+        end = last_word_start(min(start + budget, n), start)
+        window = text[offsets[start][0]:offsets[end - 1][1]]
+        (count,) = count_tokens(tokenizer, [window])
+        while count > budget and end > start + 1:  # re-tokenized into more pieces: drop a token at a time
+            end -= 1
+            window = text[offsets[start][0]:offsets[end - 1][1]]
+            (count,) = count_tokens(tokenizer, [window])
+        windows.append(window)
+        counts.append(count)
+        if end == n:
+            break
+        start = last_word_start(max(end - overlap, start + 1), start)
+
+    return windows, counts
+
+
+def token_report(paragraphs, tokenizer, batch_size=BATCH_SIZE, max_length=MAX_TOKENS):
+    """How well a segmentation uses the model's context window.
+
+    Simulates the length-sorted batching of the inference engine and reports
+    tokens spent on padding and tokens lost to truncation.
+    """
+    specials = tokenizer.num_special_tokens_to_add()
+    lengths = [n + specials for n in count_tokens(tokenizer, paragraphs)]
+    effective = [min(n, max_length) for n in lengths]
+
+    padded = 0
+    for batch in make_batches(effective, batch_size):
+        longest = max(effective[i] for i in batch)
+        padded += sum(longest - effective[i] for i in batch)
+
+    real = sum(effective)
+    truncated = [n - max_length for n in lengths if n > max_length]
+
+    return {
+        "segments": len(paragraphs),
+        "tokens": real,
+        "padding_tokens": padded,
+        "padding_waste": padded / (real + padded) if real else 0.0,
+        "truncated_segments": len(truncated),
+        "truncated_tokens": sum(truncated),
+        "context_fill": real / (len(paragraphs) * max_length) if paragraphs else 0.0,
+    }
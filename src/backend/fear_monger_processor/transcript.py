@@ -1,7 +1,6 @@
-from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
-import streamlit as st
 import time
+from backend.fear_monger_processor.st_compat import cache_data, progress_bar, show_error
 
 def get_video_id(url_or_id):
     if len(url_or_id) == 11:
@@ -17,13 +16,15 @@ def get_video_id(url_or_id):
     return None
 
 
-@st.cache_data
+@cache_data
 def fetch_transcript(video_id):
     """
     Fetch transcript text from a YouTube video ID with progress updates
     in the same style as run_inference().
     """
-    progress = st.progress(0)
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    progress = progress_bar()
 
     try:
         progress.progress(10)  # Step 1: Starting
@@ -53,5 +54,5 @@ def fetch_transcript(video_id):
 
     except Exception as e:
         progress.empty()
-        st.error(f"Error fetching transcript: {e}")
+        show_error(f"Error fetching transcript: {e}")
         return None
@@ -0,0 +1,241 @@
+"""triage.py - Sampling-based fast triage of large transcript corpora
+
+Each talk is segmented as usual, but only a stratified random sample of its
+segments is scored. The strata are contiguous position blocks, so the
+opening, middle and closing of a talk are all represented. From the sample we
+estimate, each with a confidence interval:
+- the mean fear score;
+- the "peak" fear (TRIAGE_PEAK_QUANTILE of the segment scores);
+- the share of segments above the fear threshold.
+
+A talk is "flagged" or "clear" once that share's interval lies entirely above
+or below TRIAGE_FLAG_FRACTION. Talks still "uncertain" get more samples in
+the next round. Each round scores the new samples of all talks in one
+run_inference call.
+
+Usage (screen the TED corpus loaded by ted_talks_app.data_loader.load_transcripts):
+    cd src && python -m backend.fear_monger_processor.triage [--limit N] [--out ted_triage.csv]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from backend.fear_monger_processor.config import (
+    DEFAULT_FEAR_THRESHOLD, MAX_CHARS, MAX_SENTENCES, TRIAGE_CONFIDENCE_Z, TRIAGE_FLAG_FRACTION,
+    TRIAGE_INITIAL_SAMPLES, TRIAGE_MAX_ROUNDS, TRIAGE_PEAK_QUANTILE, TRIAGE_SCORES_PATH, TRIAGE_STEP_SAMPLES,
+    TRIAGE_STRATA,
+)
+
+
+def allocate(sizes, n):
+    """Proportional allocation of `n` samples over strata of `sizes` (largest remainder)"""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    n = min(n, int(sizes.sum()))
+    quotas = sizes * n / max(sizes.sum(), 1)
+    counts = np.floor(quotas).astype(np.int64)
+    for h in np.argsort(counts - quotas)[:n - counts.sum()]:  # largest fractional parts first
+        counts[h] += 1
+    return counts
+
+
+def stratified_estimate(values, strata_sizes, strata_samples, z=TRIAGE_CONFIDENCE_Z, min_variance=0.0):
+    """Stratified mean of `values` (per-stratum arrays) with a normal confidence interval.
+
+    Uses the finite population correction, so a fully scored talk has a zero-width interval.
+    Strata with a single sample borrow the pooled sample variance, and no stratum's
+    variance is taken below `min_variance`. Unsampled strata are left out of the weights.
+    """
+    total = sum(size for size, n in zip(strata_sizes, strata_samples) if n)
+    pooled_var = np.var(np.concatenate(values), ddof=1) if sum(strata_samples) > 1 else 0.25
+    mean, variance = 0.0, 0.0
+    for sample, size, n in zip(values, strata_sizes, strata_samples):
+        if n == 0:
+            continue
+        weight = size / total
+        var_h = max(np.var(sample, ddof=1) if n > 1 else pooled_var, min_variance)
+        mean += weight * float(np.mean(sample))
+        variance += weight ** 2 * var_h / n * (1 - n / size)
+    half = z * math.sqrt(max(variance, 0.0))
+    return mean, max(mean - half, 0.0), min(mean + half, 1.0)
+
+
+def quantile_interval(sample, q=TRIAGE_PEAK_QUANTILE, z=TRIAGE_CONFIDENCE_Z):
+    """q-quantile of `sample` with a distribution-free interval from its order statistics"""
+    ordered = np.sort(np.asarray(sample, dtype=np.float64))
+    n = len(ordered)
+    half = z * math.sqrt(n * q * (1 - q))
+    low = int(np.clip(math.floor(n * q - half), 0, n - 1))
+    high = int(np.clip(math.ceil(n * q + half), 0, n - 1))
+    return float(np.quantile(ordered, q)), float(ordered[low]), float(ordered[high])
+
+
+class TalkSample:
+    """Sampling state for one transcript: strata, the segments drawn so far and their scores"""
+
+    def __init__(self, segments, strata=TRIAGE_STRATA, rng=None):
+        rng = rng or np.random.default_rng()
+        self.segments = segments
+        # Contiguous position blocks, each in its own random draw order
+        self.strata = [rng.permutation(block) for block in np.array_split(np.arange(len(segments)), strata)
+                       if len(block)]
+        self.taken = np.zeros(len(self.strata), dtype=np.int64)
+        self.scores = [[] for _ in self.strata]
+        self.rounds = 0
+        self.decision = "uncertain"
+
+    @property
+    def sampled(self):
+        return int(self.taken.sum())
+
+    def draw(self, k):
+        """Indices of `k` more segments (fewer only once the talk runs out), keeping the sample stratified"""
+        sizes = np.array([len(block) for block in self.strata], dtype=np.int64)
+        k = min(k, int((sizes - self.taken).sum()))
+        # Strata below their proportional share of the enlarged sample split the k new samples;
+        # strata already past theirs (allocation is not monotone in n) just get nothing this time
+        new = np.maximum(allocate(sizes, self.sampled + k) - self.taken, 0)
+        new = allocate(new, k)
+        drawn = []
+        for h, block in enumerate(self.strata):
+            drawn.append(block[self.taken[h]:self.taken[h] + new[h]])
+            self.taken[h] += new[h]
+        return drawn  # one index array per stratum
+
+    def add(self, drawn, scores):
+        """Record the scores of the segments returned by the last draw()"""
+        offset = 0
+        for h, indices in enumerate(drawn):
+            self.scores[h].extend(scores[offset:offset + len(indices)])
+            offset += len(indices)
+        self.rounds += 1
+
+    def estimate(self, threshold=DEFAULT_FEAR_THRESHOLD, flag_fraction=TRIAGE_FLAG_FRACTION,
+                 peak_quantile=TRIAGE_PEAK_QUANTILE, z=TRIAGE_CONFIDENCE_Z):
+        """Mean / peak / share-above-threshold estimates with intervals; updates `decision`"""
+        sizes = [len(block) for block in self.strata]
+        values = [np.asarray(s, dtype=np.float64) for s in self.scores]
+        mean, mean_low, mean_high = stratified_estimate(values, sizes, self.taken, z)
+        above = [(v >= threshold).astype(np.float64) for v in values]
+        # Agresti-Coull style floor: a sample with no (or only) hits must not give a zero-width interval
+        hits, n = sum(a.sum() for a in above), self.sampled
+        adjusted = (hits + 2) / (n + 4)
+        share, share_low, share_high = stratified_estimate(
+            above, sizes, self.taken, z, min_variance=adjusted * (1 - adjusted)
+        )
+        peak, peak_low, peak_high = quantile_interval(np.concatenate(values), peak_quantile, z)
+
+        if share_low >= flag_fraction:
+            self.decision = "flagged"
+        elif share_high < flag_fraction:
+            self.decision = "clear"
+        else:
+            self.decision = "uncertain"
+
+        return {
+            "segments": len(self.segments),
+            "sampled": self.sampled,
+            "rounds": self.rounds,
+            "mean_fear": round(mean, 4),
+            "mean_ci_low": round(mean_low, 4),
+            "mean_ci_high": round(mean_high, 4),
+            "peak_fear": round(peak, 4),
+            "peak_ci_low": round(peak_low, 4),
+            "peak_ci_high": round(peak_high, 4),
+            "fear_share": round(share, 4),
+            "fear_share_ci_low": round(share_low, 4),
+            "fear_share_ci_high": round(share_high, 4),
+            "decision": self.decision,
+        }
+
+
+def triage_corpus(transcripts, classifier=None, threshold=DEFAULT_FEAR_THRESHOLD,
+                  initial_samples=TRIAGE_INITIAL_SAMPLES, step_samples=TRIAGE_STEP_SAMPLES,
+                  max_rounds=TRIAGE_MAX_ROUNDS, flag_fraction=TRIAGE_FLAG_FRACTION,
+                  max_chars=MAX_CHARS, max_sentences=MAX_SENTENCES, seed=0, **inference_kwargs):
+    """Estimate fear per talk from stratified samples; returns a DataFrame ranked by estimated mean fear.
+
+    `transcripts` is a DataFrame with a "transcript" column, e.g. from load_transcripts().
+    Other columns (url, title, ...) are carried over.
+    """
+    import pandas as pd
+
+    from backend.fear_monger_processor.inference import run_inference
+    from backend.fear_monger_processor.scheduler import inference_priority
+    from backend.fear_monger_processor.utils import segment_text
+
+    if classifier is None:
+        from backend.fear_monger_processor.model import load_classifier
+        classifier = load_classifier()
+    inference_kwargs.setdefault("show_progress", False)
+
+    rng = np.random.default_rng(seed)
+    transcripts = transcripts.dropna(subset=["transcript"]).reset_index(drop=True)
+    talks = [TalkSample(segment_text(text, max_chars=max_chars, max_sentences=max_sentences), rng=rng)
+             for text in transcripts["transcript"]]
+    talks_with_segments = [talk for talk in talks if talk.segments]
+
+    estimates = {}
+    active, k = talks_with_segments, initial_samples
+    for _ in range(max_rounds):
+        draws = [talk.draw(k) for talk in active]
+        texts = [talk.segments[i] for talk, drawn in zip(active, draws) for indices in drawn for i in indices]
+        if not texts:
+            break
+        with inference_priority("batch"):  # corpus screening yields to interactive sessions
+            scores = run_inference(classifier, texts, **inference_kwargs).tolist()
+
+        offset = 0
+        for talk, drawn in zip(active, draws):
+            n = sum(len(indices) for indices in drawn)
+            talk.add(drawn, scores[offset:offset + n])
+            offset += n
+            estimates[id(talk)] = talk.estimate(threshold, flag_fraction)
+
+        # Only talks near the decision boundary (and not yet fully scored) get another round
+        active = [t for t in active if t.decision == "uncertain" and t.sampled < len(t.segments)]
+        if not active:
+            break
+        k = step_samples
+
+    rows = [estimates.get(id(talk), {"segments": 0, "sampled": 0, "decision": "empty"}) for talk in talks]
+    result = pd.concat([transcripts.drop(columns=["transcript"]), pd.DataFrame(rows)], axis=1)
+    return result.sort_values("mean_fear", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def triage_summary(result):
+    """Corpus-level counts: talks per decision and the share of segments actually scored"""
+    total = int(result["segments"].sum())
+    return {
+        "talks": len(result),
+        "decisions": result["decision"].value_counts().to_dict(),
+        "segments": total,
+        "segments_scored": int(result["sampled"].sum()),
+        "scored_fraction": round(result["sampled"].sum() / total, 4) if total else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen the TED corpus by sampling segments per talk.")
+    parser.add_argument("--limit", type=int, default=None, help="Only triage the first N talks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_FEAR_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(TRIAGE_SCORES_PATH), help="Where to write the ranked CSV")
+    args = parser.parse_args()
+
+    from backend.ted_talks_app.data_loader import load_transcripts
+
+    corpus = load_transcripts()
+    if args.limit:
+        corpus = corpus.head(args.limit)
+
+    start = time.perf_counter()
+    triaged = triage_corpus(corpus, threshold=args.threshold, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    triaged.to_csv(args.out, index=False)
+    summary = triage_summary(triaged)
+    print(f"Triaged {summary['talks']} talks in {elapsed:.1f}s: scored {summary['segments_scored']} of "
+          f"{summary['segments']} segments ({summary['scored_fraction']:.1%}), "
+          f"decisions {summary['decisions']} -> {args.out}")
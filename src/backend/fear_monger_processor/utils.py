@@ -2,48 +2,64 @@
 import re
 import time
 import datetime
+import numpy as np
 import pandas as pd
-import streamlit as st
-import plotly.graph_objects as go
-from transformers import pipeline, AutoTokenizer
 from backend.fear_monger_processor.config import DEFAULT_FEAR_THRESHOLD, MODEL_NAME, MAX_CHARS, FIXED_DURATION
-from youtube_transcript_api import YouTubeTranscriptApi
-from urllib.parse import urlparse, parse_qs
-from nltk.tokenize import sent_tokenize
+from backend.fear_monger_processor.st_compat import active_streamlit
+from backend.fear_monger_processor.tokens import pack_by_tokens
+
+# Streamlit, Plotly and NLTK are imported inside the functions that need them,
+# so segmentation and scoring can run headless with a fast cold start.
 
 
 # ======================================================
 # CORE FUNCTIONS
 # ======================================================
-def segment_text(text, max_chars=MAX_CHARS, max_sentences=5):
-    """Split text into paragraphs based on sentence boundaries and limits."""
+def split_sentences(text):
+    """Split text into stripped, non-empty sentences (NLTK Punkt)."""
+    from nltk.tokenize import sent_tokenize
 
     # sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = sent_tokenize(text)
-    paragraphs, current = [], []
-    current_len, sentence_count = 0, 0
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
-        space = 1 if current else 0
-        if (current_len + len(sentence) + space > max_chars) or (sentence_count >= max_sentences):
-            if current:
-                paragraphs.append(" ".join(current).strip())
-            current = [sentence]
+    return [s.strip() for s in sent_tokenize(text) if s.strip()]
+
+
+def group_sentences(sentences, max_chars=MAX_CHARS, max_sentences=5):
+    """Group consecutive sentences into paragraphs; returns (start, end) sentence index ranges."""
+    ranges = []
+    start, current_len, sentence_count = 0, 0, 0
+
+    for i, sentence in enumerate(sentences):
+        space = 1 if sentence_count else 0
+        if sentence_count and ((current_len + len(sentence) + space > max_chars) or (sentence_count >= max_sentences)):
+            ranges.append((start, i))
+            start = i
             current_len = len(sentence)
             sentence_count = 1
         else:
-            current.append(sentence)
             current_len += len(sentence) + space
             sentence_count += 1
 
-    if current:
-        paragraphs.append(" ".join(current).strip())
+    if sentence_count:
+        ranges.append((start, len(sentences)))
 
-    return paragraphs
+    return ranges
+
+
+def segment_text(text, max_chars=MAX_CHARS, max_sentences=5, max_tokens=None, tokenizer=None):
+    """Split text into paragraphs based on sentence boundaries and limits.
+
+    If `max_tokens` is set, sentences are packed by real tokenizer token counts
+    (the cached classifier's tokenizer unless one is given) and `max_chars` is ignored.
+    """
+    sentences = split_sentences(text)
+
+    if max_tokens is not None:
+        if tokenizer is None:
+            from backend.fear_monger_processor.model import tokenizer_for
+            tokenizer = tokenizer_for()
+        return pack_by_tokens(sentences, tokenizer, max_tokens=max_tokens, max_sentences=max_sentences)
+
+    return [" ".join(sentences[start:end]) for start, end in group_sentences(sentences, max_chars, max_sentences)]
 
 
 # def assign_timestamps(paragraphs, total_duration_sec):
@@ -87,47 +103,32 @@ def smooth_scores(scores, window=3):
     return pd.Series(scores).rolling(window=window, min_periods=1, center=True).mean().tolist()
 
 
-def extract_fear_score(prediction):
-    """Extract Fear_Mongering score from nested prediction list."""
-    # Flatten if nested
-    if isinstance(prediction, list) and len(prediction) == 1 and isinstance(prediction[0], list):
-        prediction = prediction[0]
-
-    if isinstance(prediction, list):
-        for label_score in prediction:
-            if label_score.get("label") == "Fear_Mongering":
-                return round(label_score.get("score", 0.0), 4)
-    elif isinstance(prediction, dict):
-        if prediction.get("label") == "Fear_Mongering":
-            return round(prediction.get("score", 0.0), 4)
-    return 0.0
-
-
-import pandas as pd
-import streamlit as st
-
 DEFAULT_FEAR_THRESHOLD = 0.5  # keep same as before
 
 def create_analysis_df(paragraphs, timestamps, predictions, smoothing_window=3, video_duration_seconds=None):
-    """Create analysis dataframe with smoothing and optional Streamlit state storage."""
-    fear_scores = [extract_fear_score(pred) for pred in predictions]
+    """Create analysis dataframe with smoothing and optional Streamlit state storage.
+
+    `predictions` is the fear-probability array returned by run_inference.
+    """
+    fear_scores = np.asarray(predictions, dtype=np.float32)
     fear_scores_smoothed = smooth_scores(fear_scores, window=smoothing_window)
 
     df = pd.DataFrame({
         "Timestamp": timestamps["timestamp_str"],
         "Paragraph": paragraphs,
         "Fear Mongering Score": fear_scores_smoothed,
-        "Prediction": [
-            "Fear Mongering" if score > DEFAULT_FEAR_THRESHOLD else "Not Fear Mongering"
-            for score in fear_scores_smoothed
-        ]
+        "Prediction": np.where(
+            np.asarray(fear_scores_smoothed) > DEFAULT_FEAR_THRESHOLD, "Fear Mongering", "Not Fear Mongering"
+        ),
     })
 
     # Store for downstream Fitbit correlation (if Streamlit session is active)
+    st = active_streamlit()
     try:
-        st.session_state["fear_results_df"] = df
-        if video_duration_seconds:
-            st.session_state["video_duration_seconds"] = video_duration_seconds
+        if st is not None:
+            st.session_state["fear_results_df"] = df
+            if video_duration_seconds:
+                st.session_state["video_duration_seconds"] = video_duration_seconds
     except Exception:
         # no Streamlit context (e.g., running in backend mode)
         pass
@@ -136,8 +137,33 @@ def create_analysis_df(paragraphs, timestamps, predictions, smoothing_window=3,
 
 
 
+def expand_window_timeline(seconds, windows, total_duration=None):
+    """Spread per-window scores over each segment's time span for a finer-grained timeline.
+
+    Returns (window_seconds, window_scores, window_texts) ready for create_plotly_chart.
+    """
+    seconds = list(seconds)
+    if total_duration is None:
+        step = seconds[1] - seconds[0] if len(seconds) > 1 else FIXED_DURATION
+        total_duration = seconds[-1] + step if seconds else 0
+
+    window_seconds, window_scores, window_texts = [], [], []
+    for i, segment in enumerate(windows):
+        start = seconds[i]
+        end = seconds[i + 1] if i + 1 < len(seconds) else total_duration
+        span = (end - start) / max(len(segment), 1)
+        for j, window in enumerate(segment):
+            window_seconds.append(start + j * span)
+            window_scores.append(window["score"])
+            window_texts.append(window["text"])
+
+    return window_seconds, window_scores, window_texts
+
+
 def create_plotly_chart(seconds, scores, paragraphs, chart_type="Line Chart", max_hover_length=100):
     """Create interactive Plotly chart with hover tooltips based on selected type."""
+    import plotly.graph_objects as go
+
     start_time = datetime.datetime(2025, 1, 1, 0, 0, 0)
     time_axis = [start_time + datetime.timedelta(seconds=s) for s in seconds]
 
@@ -283,6 +309,8 @@ def create_plotly_chart(seconds, scores, paragraphs, chart_type="Line Chart", ma
 
 def display_results_table(analysis_df, threshold):
     """Display styled results table with optional highlighting"""
+    import streamlit as st
+
     def highlight_scores(row):
         score = row["Fear Mongering Score"]
         
@@ -0,0 +1,136 @@
+"""zero_shot.py - Zero-shot NLI fear detector with hypothesis batching
+
+A segment's score is how strongly an NLI model says it entails the fear
+hypotheses (FEAR_HYPOTHESES, combined by NLI_AGGREGATE). That takes one forward
+pass per (segment, hypothesis) pair. To keep the cost down:
+- hypotheses are tokenized once, and each segment is tokenized once;
+- pairs are assembled from the token ids and run in large, length-sorted padded batches;
+- scores are cached per (segment hash, hypothesis set) through the usual score cache.
+
+`ZeroShotClassifier` has the same `predict_proba` interface as the other engines,
+so it works with run_inference / batched_predict and as an ensemble component:
+
+    scores = run_inference(load_zero_shot(), paragraphs, show_progress=False)
+
+Usage (scores + pair throughput on the reference paragraphs):
+    cd src && python -m backend.fear_monger_processor.zero_shot [--no-cache]
+"""
+import argparse
+import functools
+import hashlib
+import json
+import time
+
+import numpy as np
+
+from backend.fear_monger_processor.cache import resolve_revision
+from backend.fear_monger_processor.config import (
+    FEAR_HYPOTHESES, MAX_TOKENS, NLI_AGGREGATE, NLI_MODEL_NAME, NLI_MODEL_REVISION, NLI_PAIR_BATCH_SIZE,
+)
+from backend.fear_monger_processor.reference import REFERENCE_PARAGRAPHS
+from backend.fear_monger_processor.scheduler import get_scheduler
+from backend.fear_monger_processor.tokens import make_batches
+
+
+class ZeroShotClassifier:
+    """NLI model scoring segments against a fixed set of fear hypotheses"""
+
+    def __init__(self, model_name=NLI_MODEL_NAME, revision=NLI_MODEL_REVISION, hypotheses=FEAR_HYPOTHESES,
+                 aggregate=NLI_AGGREGATE, pair_batch_size=NLI_PAIR_BATCH_SIZE, scheduler=None):
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        if aggregate not in ("max", "mean"):
+            raise ValueError(f"Unknown hypothesis aggregation: {aggregate!r} (expected 'max' or 'mean')")
+        if not hypotheses:
+            raise ValueError("Zero-shot scoring needs at least one hypothesis")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+        self.nli_model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision).eval()
+        self.hypotheses = tuple(hypotheses)
+        self.aggregate = aggregate
+        self.pair_batch_size = pair_batch_size
+        self.scheduler = scheduler or get_scheduler()
+
+        label2id = {label.lower(): int(i) for label, i in self.nli_model.config.label2id.items()}
+        self.nli_columns = [label2id["contradiction"], label2id["entailment"]]
+
+        # Hypotheses are tokenized once here; calls only tokenize their premises
+        self.hypothesis_ids = self.tokenizer(list(self.hypotheses), add_special_tokens=False)["input_ids"]
+        self.pair_overhead = self.tokenizer.num_special_tokens_to_add(pair=True)
+        self.uses_token_types = "token_type_ids" in self.tokenizer.model_input_names
+
+        # Enough segments per run_inference batch to fill one pair batch
+        self.tuned_batch_size = max(1, pair_batch_size // len(self.hypotheses))
+        # One score-cache namespace per model + hypothesis set + aggregation (see cache.cache_for)
+        digest = hashlib.sha256(json.dumps([self.hypotheses, aggregate]).encode("utf-8")).hexdigest()[:16]
+        self.cache_revision = f"{model_name}@{resolve_revision(model_name, revision)}+nli-{digest}"
+
+    def slot(self, priority=None):
+        """Hold one model slot (at the caller's priority) for one pair batch, as registry classifiers do"""
+        return self.scheduler.slot(priority)
+
+    def pairs(self, texts):
+        """Encoded (premise, hypothesis) pairs, premise-major; premises are truncated to fit the window"""
+        premises = self.tokenizer(list(texts), add_special_tokens=False, truncation=True,
+                                  max_length=MAX_TOKENS)["input_ids"]
+        pairs = []
+        for premise in premises:
+            for hypothesis in self.hypothesis_ids:
+                head = premise[:MAX_TOKENS - self.pair_overhead - len(hypothesis)]
+                pair = {"input_ids": self.tokenizer.build_inputs_with_special_tokens(head, hypothesis)}
+                if self.uses_token_types:
+                    pair["token_type_ids"] = self.tokenizer.create_token_type_ids_from_sequences(head, hypothesis)
+                pairs.append(pair)
+        return pairs
+
+    def entailment(self, texts):
+        """Entailment probability per (segment, hypothesis), shape (len(texts), len(hypotheses))"""
+        import torch
+
+        texts = list(texts)
+        pairs = self.pairs(texts)
+        probs = np.zeros(len(pairs), dtype=np.float32)
+        for batch in make_batches([len(pair["input_ids"]) for pair in pairs], self.pair_batch_size):
+            encoded = self.tokenizer.pad([pairs[i] for i in batch], return_tensors="pt")
+            with self.slot(), torch.inference_mode():
+                logits = self.nli_model(**encoded).logits
+            # Entailment vs contradiction per pair, as in the transformers multi-label zero-shot pipeline
+            probs[batch] = torch.softmax(logits[:, self.nli_columns].float(), dim=-1)[:, 1].numpy()
+        return probs.reshape(len(texts), len(self.hypotheses))
+
+    def predict_proba(self, texts):
+        """Fear score per segment: max (or mean) entailment over the hypotheses"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        per_hypothesis = self.entailment(texts)
+        scores = per_hypothesis.max(axis=1) if self.aggregate == "max" else per_hypothesis.mean(axis=1)
+        return scores.astype(np.float32)
+
+
+@functools.lru_cache(maxsize=None)
+def load_zero_shot(hypotheses=FEAR_HYPOTHESES, aggregate=NLI_AGGREGATE):
+    """ZeroShotClassifier, loaded once per process per hypothesis set"""
+    return ZeroShotClassifier(hypotheses=hypotheses, aggregate=aggregate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zero-shot NLI fear scores for the reference paragraphs.")
+    parser.add_argument("--no-cache", action="store_true", help="Score everything with the model")
+    args = parser.parse_args()
+
+    from backend.fear_monger_processor.inference import run_inference
+
+    classifier = load_zero_shot()
+    start = time.perf_counter()
+    scores = run_inference(classifier, REFERENCE_PARAGRAPHS, show_progress=False, use_cache=not args.no_cache)
+    seconds = time.perf_counter() - start
+
+    n_pairs = len(REFERENCE_PARAGRAPHS) * len(classifier.hypotheses)
+    print(json.dumps({
+        "hypotheses": classifier.hypotheses,
+        "seconds": round(seconds, 3),
+        "pairs_per_s": round(n_pairs / max(seconds, 1e-9), 2),
+        "scores": [{"paragraph": para[:60], "score": round(float(s), 4)}
+                   for para, s in zip(REFERENCE_PARAGRAPHS, scores)],
+    }, indent=2))
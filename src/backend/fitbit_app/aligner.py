@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 import pytz
 from datetime import timedelta
 
@@ -32,33 +31,22 @@ def time_to_seconds(time_str):
     except:
         return None
 
-def align_fear_and_heart(fear_df, heart_df, start_time, end_time):
+def fear_score_column(df):
+    """Name of the fear score column in `df`; raises ValueError if there is none"""
+    for col in ['fear_score', 'Fear Mongering Score', 'score', 'Score']:
+        if col in df.columns:
+            return col
+    raise ValueError(f"Could not find fear score column. Available: {list(df.columns)}")
+
+
+def align_fear_and_heart_data(fear_df, heart_df, start_time, end_time):
     """
-    Aligns fear model outputs with Fitbit heart rate data within a playback window.
-    
-    This function converts model-generated fear timestamps to real-world datetime
-    values scaled to the playback window. Heart rate readings are trimmed to the
-    same window. Both series are normalized to a 0 → 1 relative timeline, and then
-    merged for comparison.
-    
-    The resulting Plotly chart has dual axes: fear score on the left, heart rate on the right.
-    
-    Args:
-        fear_df (pd.DataFrame): Contains fear model outputs. Must have either:
-            - 'Timestamp' column (HH:MM:SS style) or
-            - 'datetime' column.
-            Must contain a fear score column (detected automatically among
-            ['fear_score', 'Fear Mongering Score', 'score', 'Score']).
-        heart_df (pd.DataFrame): Contains heart rate readings with a 'datetime' column
-            and a 'value' column (heart rate in bpm).
-        start_time (pd.Timestamp): Playback window start.
-        end_time (pd.Timestamp): Playback window end.
-    
+    Same alignment as align_fear_and_heart, without building a chart (Plotly is never imported).
+
     Returns:
-        fig (go.Figure): Interactive Plotly chart comparing fear and heart rate.
-        merged (pd.DataFrame): Merged DataFrame of normalized fear scores and heart rates
-            with 'relative' timeline between 0 and 1.
-    
+        merged (pd.DataFrame): Normalized fear scores and heart rates on a 0 → 1 'relative' timeline.
+        fear_score_col (str): Name of the fear score column that was detected.
+
     Raises:
         ValueError: If required columns are missing or no data in the playback window.
     """
@@ -131,14 +119,7 @@ def align_fear_and_heart(fear_df, heart_df, start_time, end_time):
     fear_df["relative"] = np.linspace(0, 1, len(fear_df))
     
     # Detect fear score column
-    fear_score_col = None
-    for col in ['fear_score', 'Fear Mongering Score', 'score', 'Score']:
-        if col in fear_df.columns:
-            fear_score_col = col
-            break
-    
-    if fear_score_col is None:
-        raise ValueError(f"Could not find fear score column. Available: {list(fear_df.columns)}")
+    fear_score_col = fear_score_column(fear_df)
     
     print(f"Using fear score column: '{fear_score_col}'")
     
@@ -154,7 +135,50 @@ def align_fear_and_heart(fear_df, heart_df, start_time, end_time):
     
     print(f"✓ Merged {len(merged)} data points")
     print("=" * 50)
+
+    return merged, fear_score_col
+
+
+def align_fear_and_heart(fear_df, heart_df, start_time, end_time):
+    """
+    Aligns fear model outputs with Fitbit heart rate data within a playback window.
+    
+    This function converts model-generated fear timestamps to real-world datetime
+    values scaled to the playback window. Heart rate readings are trimmed to the
+    same window. Both series are normalized to a 0 → 1 relative timeline, and then
+    merged for comparison.
+    
+    The resulting Plotly chart has dual axes: fear score on the left, heart rate on the right.
+    
+    Args:
+        fear_df (pd.DataFrame): Contains fear model outputs. Must have either:
+            - 'Timestamp' column (HH:MM:SS style) or
+            - 'datetime' column.
+            Must contain a fear score column (detected automatically among
+            ['fear_score', 'Fear Mongering Score', 'score', 'Score']).
+        heart_df (pd.DataFrame): Contains heart rate readings with a 'datetime' column
+            and a 'value' column (heart rate in bpm).
+        start_time (pd.Timestamp): Playback window start.
+        end_time (pd.Timestamp): Playback window end.
     
+    Returns:
+        fig (go.Figure): Interactive Plotly chart comparing fear and heart rate.
+        merged (pd.DataFrame): Merged DataFrame of normalized fear scores and heart rates
+            with 'relative' timeline between 0 and 1.
+    
+    Raises:
+        ValueError: If required columns are missing or no data in the playback window.
+    """
+    merged, fear_score_col = align_fear_and_heart_data(fear_df, heart_df, start_time, end_time)
+    return alignment_chart(merged, fear_score_col), merged
+
+
+def alignment_chart(merged, fear_score_col=None):
+    """Plotly dual-axis chart of aligned data (see align_fear_and_heart_data): fear left, heart rate right"""
+    import plotly.graph_objects as go
+
+    fear_score_col = fear_score_col or fear_score_column(merged)
+
     # -----------------------
     # Create Plotly dual-axis chart
     # -----------------------
@@ -191,4 +215,4 @@ def align_fear_and_heart(fear_df, heart_df, start_time, end_time):
         hovermode='x unified'
     )
     
-    return fig, merged
\ No newline at end of file
+    return fig
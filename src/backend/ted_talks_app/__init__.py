@@ -1,5 +1,5 @@
 from .utils import segment_text, smooth_scores, assign_timestamps
-from .analysis import create_analysis_df, run_inference, extract_fear_score
+from .analysis import create_analysis_df, run_inference
 from .charts import create_matplotlib_chart, create_plotly_chart
 from .data_loader import load_transcripts
 from .models import load_classifier
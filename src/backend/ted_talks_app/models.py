@@ -1,23 +1,14 @@
-"""models.py - Model loading"""
+"""models.py - Model loading (Streamlit adapter over the shared model registry)"""
 import streamlit as st
-from transformers import pipeline, AutoTokenizer
-from backend.ted_talks_app.config import MODEL_NAME
+from backend.fear_monger_processor.registry import get_registry
 
 
-@st.cache_resource
 def load_classifier():
-    from transformers import pipeline, AutoTokenizer
-    from config import MODEL_NAME
-
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    return pipeline(
-        "text-classification",
-        model=MODEL_NAME,
-        tokenizer=tokenizer,
-        truncation=True,
-        max_length=512,  # bigger context window
-        top_k=1
-    )
+    # Same Falconsai pipeline (and engine selection) as every other entry point, shared by all sessions;
+    # the session's lease is released when Streamlit drops its session state
+    if "model_lease" not in st.session_state:
+        st.session_state.model_lease = get_registry().lease()
+    return st.session_state.model_lease.classifier
 
 # if __name__ == "__main__":
 #     _classifier = load_classifier()
@@ -2,18 +2,28 @@
 import re
 import datetime
 import pandas as pd
+from backend.fear_monger_processor.tokens import pack_by_tokens
 from .config import MAX_CHARS
 
 
-def segment_text(text, max_chars=MAX_CHARS, max_sentences=5):
+def segment_text(text, max_chars=MAX_CHARS, max_sentences=5, max_tokens=None, tokenizer=None):
     """
     Splits text into paragraphs by:
     - Sentence boundaries
     - Max characters per paragraph
     - Max sentences per paragraph
+    - Or, if max_tokens is set, max model tokens per paragraph (instead of characters)
     """
     sentences = re.split(r'(?<=[.!?])\s+', text)
 
+    if max_tokens is not None:
+        if tokenizer is None:
+            from backend.fear_monger_processor.model import tokenizer_for
+            from .models import load_classifier
+            tokenizer = tokenizer_for(load_classifier())
+        sentences = [s.strip() for s in sentences if s.strip()]
+        return pack_by_tokens(sentences, tokenizer, max_tokens=max_tokens, max_sentences=max_sentences)
+
     paragraphs = []
     current = []
     current_len = 0
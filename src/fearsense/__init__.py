@@ -0,0 +1,4 @@
+"""fearsense - Streamlit-free fear-mongering analysis API"""
+from .core import load_model, segment, score, score_within_budget, iter_score, analyze, align
+
+__all__ = ["load_model", "segment", "score", "score_within_budget", "iter_score", "analyze", "align"]
@@ -0,0 +1,89 @@
+"""fearsense.core - Headless API: segment, score, align
+
+Nothing here imports Streamlit, and transformers / torch / plotly / pandas are
+only imported when a function that needs them is first called, so batch
+workers and CLIs start fast. The Streamlit apps segment, score and align
+through these functions and only add the UI around them (progress bars,
+st.cache_*, widgets, charts).
+
+    from fearsense import core
+    paragraphs = core.segment(text)
+    scores = core.score(paragraphs)
+"""
+import functools
+
+from backend.fear_monger_processor.config import (
+    CACHE_ENABLED, ENGINE, MAX_CHARS, MAX_SENTENCES,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(engine=ENGINE, threads=None):
+    """Load the fear classifier once per process (per engine / thread setting)"""
+    if threads is None:  # the default setting shares the registry's model with the apps
+        from backend.fear_monger_processor.registry import get_registry
+        return get_registry().get(engine)
+    from backend.fear_monger_processor.model import build_classifier
+    return build_classifier(engine, threads=threads)
+
+
+def segment(text, max_chars=MAX_CHARS, max_sentences=MAX_SENTENCES, max_tokens=None, tokenizer=None):
+    """Split text into paragraphs (by characters/sentences, or by model tokens if `max_tokens` is set)"""
+    from backend.fear_monger_processor.utils import segment_text
+
+    if max_tokens is not None and tokenizer is None:
+        from backend.fear_monger_processor.model import tokenizer_for
+        tokenizer = tokenizer_for(load_model())
+    return segment_text(text, max_chars=max_chars, max_sentences=max_sentences,
+                        max_tokens=max_tokens, tokenizer=tokenizer)
+
+
+def score(paragraphs, classifier=None, batch_size=None, use_cache=CACHE_ENABLED, progress_callback=None):
+    """Fear-mongering probability per paragraph as a float32 array, in input order"""
+    from backend.fear_monger_processor.cache import cache_for
+    from backend.fear_monger_processor.inference import batched_predict, resolve_batch_size
+
+    if classifier is None:
+        classifier = load_model()
+    return batched_predict(
+        classifier,
+        list(paragraphs),
+        batch_size=resolve_batch_size(classifier, batch_size),
+        progress_callback=progress_callback,
+        cache=cache_for(classifier) if use_cache else None,
+    )
+
+
+def score_within_budget(paragraphs, budget_s, classifier=None, **budget_kwargs):
+    """score() that answers within about `budget_s` seconds; returns (scores, info), see budget.py"""
+    from backend.fear_monger_processor.budget import score_within_budget as budgeted
+
+    if classifier is None:
+        classifier = load_model()
+    return budgeted(classifier, list(paragraphs), budget_s, show_progress=False, **budget_kwargs)
+
+
+def iter_score(paragraphs, classifier=None, batch_size=None, use_cache=CACHE_ENABLED, stats=None):
+    """Like score(), but yields `(indices, scores)` as each batch completes (`stats`: see iter_predict)"""
+    from backend.fear_monger_processor.inference import iter_inference
+
+    if classifier is None:
+        classifier = load_model()
+    yield from iter_inference(classifier, list(paragraphs), batch_size=batch_size, use_cache=use_cache, stats=stats)
+
+
+def analyze(text, classifier=None, smoothing_window=3, **segment_kwargs):
+    """Segment + score + timestamps in one call; returns the same DataFrame the apps display"""
+    from backend.fear_monger_processor.utils import assign_timestamps, create_analysis_df
+
+    paragraphs = segment(text, **segment_kwargs)
+    scores = score(paragraphs, classifier=classifier)
+    return create_analysis_df(paragraphs, assign_timestamps(paragraphs), scores, smoothing_window=smoothing_window)
+
+
+def align(fear_df, heart_df, start_time, end_time):
+    """Align fear scores with heart-rate readings on a 0 → 1 timeline; returns the merged DataFrame"""
+    from backend.fitbit_app.aligner import align_fear_and_heart_data
+
+    merged, _ = align_fear_and_heart_data(fear_df, heart_df, start_time, end_time)
+    return merged
@@ -17,6 +17,7 @@ Key Features:
 # IMPORTS
 # ======================================================
 from datetime import datetime, timedelta        # Handling dates & times
+import numpy as np                             # Score arrays
 import pandas as pd                            # Data manipulation
 from pathlib import Path                        # File system paths
 import matplotlib.pyplot as plt                # Plotting (not heavily used)
@@ -26,16 +27,25 @@ import nltk                                    # NLP for text segmentation
 import plotly.express as px                     # Interactive charts
 
 # === MODEL LOADING ===
-from backend.fear_monger_processor.model import load_classifier       # Load fear model
-from backend.fear_monger_processor.inference import run_inference    # Run inference on text
+from fearsense import core  # Headless segment / score / align
+from backend.fear_monger_processor.registry import get_registry       # Shared fear model (one per process)
+from backend.fear_monger_processor.model import tokenizer_for  # Local tokenizer, also for the server engine
+from backend.fear_monger_processor.inference import run_windowed_inference    # Score long segments in token windows
 from backend.fear_monger_processor.transcript import get_video_id, fetch_transcript  # TED/YouTube transcripts
-from backend.fear_monger_processor.utils import segment_text, assign_timestamps, create_analysis_df, create_plotly_chart, display_results_table  # Utils for text, chart, dataframe
+from backend.fear_monger_processor.utils import assign_timestamps, create_analysis_df, create_plotly_chart, display_results_table, expand_window_timeline  # Utils for text, chart, dataframe
 
 # === CONFIG & UTILITIES ===
-from frontend.correlation_engine.config import MAX_CHARS, DEFAULT_FEAR_THRESHOLD, DEFAULT_SMOOTHING_WINDOW, DEFAULT_CHART_TYPE
+from backend.fear_monger_processor.tokens import token_report  # Padding / truncation accounting
+from backend.fear_monger_processor.sentence_store import SentenceScoreStore  # Score sentences once, regroup freely
+from backend.fear_monger_processor.lexical import cascade_inference  # Lexical pre-filter before the model
+from backend.fear_monger_processor.adaptive import adaptive_score  # Coarse-to-fine variable-resolution scoring
+from backend.fear_monger_processor.ensemble import COMPONENT_FACTORIES, EnsembleRunner, build_components  # Multi-signal scoring
+from backend.fear_monger_processor.budget import cancel_background, score_within_budget  # Approximate scores when a transcript is too long
+from backend.fear_monger_processor.config import CASCADE_ENABLED, ENSEMBLE_COMPONENTS
+from frontend.correlation_engine.config import MAX_CHARS, SEGMENT_MAX_TOKENS, DEFAULT_FEAR_THRESHOLD, DEFAULT_SMOOTHING_WINDOW, DEFAULT_CHART_TYPE
 from backend.fitbit_app.fitbit_utils import get_fitbit_heart_data, plot_fitbit_heart
 from backend.fitbit_app.fitbit_client import fetch_fitbit_data
-from backend.fitbit_app.aligner import align_fear_and_heart # Align fear vs heart rate
+from backend.fitbit_app.aligner import alignment_chart  # Fear vs heart rate chart
 from backend.fitbit_app.playback_window import estimate_playback_window
 from backend.fitbit_app.config import TOKEN_FILE
 from backend.ted_talks_app.data_loader import load_transcripts  # Load TED transcripts
@@ -76,14 +86,14 @@ def main():
         nltk.download("punkt")
 
     # === Load Classifier Model ===
-    # Use session_state to cache the model - only load once per session
-    if "classifier" not in st.session_state:
+    # Every session leases the same process-wide model; the lease is released with the session state
+    if "model_lease" not in st.session_state:
 
-        # Only load once — stored in session_state for efficiency
+        # Only the first session in the process actually loads the model
         with st.spinner("Loading fear detection model..."):
-            st.session_state.classifier = load_classifier()
+            st.session_state.model_lease = get_registry().lease()
 
-    classifier = st.session_state.classifier
+    classifier = st.session_state.model_lease.classifier
 
   
     # ======================================================
@@ -97,10 +107,10 @@ def main():
     # Allow users to control how text is chunked for analysis
     with st.sidebar.expander("Select Fear Threshold ", expanded=False):
 
-        # Segment text by Characters, Sentences, or Both
+        # Segment text by Characters, Sentences, Both, or model Tokens
         segment_mode = st.radio(
             "Segment text by:",
-            ["Characters", "Sentences", "Both"],
+            ["Characters", "Sentences", "Both", "Tokens"],
             index=2,  # Default to "Both"
             help="Choose how to split the text into paragraphs for analysis."
         )
@@ -108,6 +118,7 @@ def main():
         # Default values
         max_chars = MAX_CHARS
         max_sentences = 5
+        max_tokens = None
 
         # Conditional UI: show character slider if relevant
         if segment_mode in ("Characters", "Both"):
@@ -131,6 +142,96 @@ def main():
                 help="Split the text once this many sentences are reached."
             )
 
+        # Conditional UI: pack sentences by real tokenizer counts up to a token budget
+        if segment_mode == "Tokens":
+            max_tokens = st.slider(
+                "Maximum Tokens per Segment",
+                min_value=64,
+                max_value=SEGMENT_MAX_TOKENS,
+                value=SEGMENT_MAX_TOKENS,
+                step=16,
+                help="Pack sentences until the model's token budget is reached (no silent truncation)."
+            )
+
+        # Score every sentence once; slider changes then only re-aggregate stored scores
+        use_sentence_store = st.checkbox(
+            "Score sentences once (instant re-segmentation)",
+            value=False,
+            disabled=segment_mode == "Tokens",
+            help="Runs the model once per sentence. Paragraph scores are then derived from sentence "
+                 "scores, so changing the segmentation sliders needs no new model runs."
+        )
+        sentence_aggregate = "mean"
+
+        # Score big segments first; only uncertain or sharply changing regions are split and re-scored
+        use_adaptive = st.checkbox(
+            "Adaptive resolution (coarse-to-fine)",
+            value=False,
+            disabled=segment_mode == "Tokens" or use_sentence_store,
+            help="Calm stretches keep one coarse score; detail is added only near the threshold "
+                 "or where the score jumps, at a fraction of the model runs."
+        )
+        if use_sentence_store and segment_mode != "Tokens":
+            sentence_aggregate = st.selectbox(
+                "Combine sentence scores by",
+                ["mean", "max"],
+                index=0,
+                help="'mean' weights sentences by length; 'max' uses the most fearful sentence."
+            )
+
+        # Long segments (e.g. "Sentences" mode) can exceed the model's 512-token window;
+        # sliding windows score the whole segment instead of silently dropping the tail
+        use_windows = st.checkbox(
+            "Sliding-window scoring for long segments",
+            value=False,
+            help="Split segments longer than the model window into overlapping windows and combine their scores."
+        )
+        window_aggregate = "max"
+        if use_windows:
+            window_aggregate = st.selectbox(
+                "Combine window scores by",
+                ["max", "mean", "weighted"],
+                index=0,
+                help="'weighted' averages windows by their token length."
+            )
+
+        # Cheap lexical stage first: filler and cue-dense segments never reach the model
+        use_cascade = st.checkbox(
+            "Lexical pre-filter (skip obvious segments)",
+            value=CASCADE_ENABLED,
+            disabled=use_windows,
+            help="Filler ('(Laughter)', greetings, ...) scores 0 and segments dense with fear cues keep their "
+                 "lexical score; all other segments are sent to the model."
+        )
+
+        # Extra signals (emotion model, lexical cues) combined with the classifier into one composite score
+        use_ensemble = st.checkbox(
+            "Ensemble scoring (multiple signals)",
+            value=False,
+            disabled=use_windows or use_cascade,
+            help="Combine the fear classifier with an emotion model and lexical cues. Each signal gets its "
+                 "own column; disabling signals trades accuracy for speed."
+        )
+        ensemble_components = list(ENSEMBLE_COMPONENTS)
+        if use_ensemble:
+            ensemble_components = st.multiselect(
+                "Ensemble signals",
+                list(COMPONENT_FACTORIES),
+                default=list(ENSEMBLE_COMPONENTS),
+            ) or ["fear_classifier"]
+
+        # Very long transcripts: answer within the budget with approximate scores, refine in the background
+        latency_budget = st.slider(
+            "Latency budget (seconds, 0 = off)",
+            min_value=0,
+            max_value=60,
+            value=0,
+            step=1,
+            disabled=use_windows or use_cascade or use_ensemble,
+            help="If scoring every segment would take longer, a sample is scored (or lexical cues are used) and "
+                 "the result is marked approximate. Full scoring continues in the background."
+        )
+
         # ======================================================
         # Fear Threshold Settings
         # ======================================================
@@ -176,6 +277,19 @@ def main():
             help="Limit number of characters shown in chart hover text."
         )
 
+    # ======================================================
+    # SIDEBAR: Model Metrics
+    # ======================================================
+    with st.sidebar.expander("Model Metrics", expanded=False):
+        metrics = get_registry().metrics()
+        for engine, engine_metrics in metrics["engines"].items():
+            st.caption(f"Engine: {engine}")
+            st.json(engine_metrics)
+        st.caption("Scheduler queues and wait times per priority class")
+        st.json(metrics["scheduler"])
+        st.caption("Process memory (MB)")
+        st.json(metrics["memory"])
+
     # ======================================================
     # SIDEBAR: TED Talks Database
     # ======================================================
@@ -332,11 +446,39 @@ def main():
     # Split transcript into analyzable chunks based on user settings
     text_to_analyze = transcript_text or quick_text
 
-    paragraphs = segment_text(
-        text_to_analyze,
-        max_chars=max_chars if segment_mode in ("Characters", "Both") else float('inf'),
-        max_sentences=max_sentences if segment_mode in ("Sentences", "Both") else float('inf')
-    )
+    predictions = None
+    adaptive_timestamps = None
+    if use_adaptive and not use_sentence_store and segment_mode != "Tokens" and text_to_analyze:
+        paragraphs, adaptive_timestamps, predictions, adaptive_stats = adaptive_score(
+            classifier,
+            text_to_analyze,
+            threshold=threshold,
+            fine_chars=max_chars if segment_mode in ("Characters", "Both") else float('inf'),
+            max_sentences=max_sentences if segment_mode in ("Sentences", "Both") else float('inf'),
+        )
+        st.caption(f"Adaptive resolution: {adaptive_stats['segments_scored']} model runs instead of "
+                   f"{adaptive_stats['fine_segments']} ({adaptive_stats['segments']} timeline segments)")
+    elif use_sentence_store and segment_mode != "Tokens" and text_to_analyze:
+        # One store per transcript, kept across reruns; replaced when the text changes
+        store = st.session_state.get("sentence_store")
+        if store is None or store.text != text_to_analyze:
+            store = SentenceScoreStore(text_to_analyze)
+            st.session_state["sentence_store"] = store
+
+        store.score(classifier)  # no-op after the first run for this transcript
+        paragraphs, predictions = store.paragraphs(
+            max_chars=max_chars if segment_mode in ("Characters", "Both") else float('inf'),
+            max_sentences=max_sentences if segment_mode in ("Sentences", "Both") else float('inf'),
+            how=sentence_aggregate
+        )
+    else:
+        paragraphs = core.segment(
+            text_to_analyze,
+            max_chars=max_chars if segment_mode in ("Characters", "Both") else float('inf'),
+            max_sentences=max_sentences if segment_mode in ("Sentences", "Both") else float('inf'),
+            max_tokens=max_tokens,
+            tokenizer=tokenizer_for(classifier) if max_tokens is not None else None
+        )
 
     # Create fake timestamps based on text length (for visualization)
     if not paragraphs:
@@ -344,14 +486,90 @@ def main():
         return
 
     fake_duration = max(len(text_to_analyze) // 10, 10)
-    timestamps = assign_timestamps(paragraphs)
+    # Adaptive regions have variable length, so they are placed by character position instead
+    timestamps = adaptive_timestamps if adaptive_timestamps is not None else assign_timestamps(paragraphs)
 
 
     # ========================
     # RUN ML INFERENCE
     # ========================
     # Core model execution: classify each paragraph for fear-mongering
-    predictions = run_inference(classifier, paragraphs)
+    # (skipped when paragraph scores were already derived from stored sentence scores)
+    windows = None
+    component_scores = {}
+    if predictions is None:
+        if use_windows:
+            predictions, windows = run_windowed_inference(classifier, paragraphs, aggregate=window_aggregate)
+        elif use_ensemble and not use_cascade:
+            with st.spinner("Scoring with the ensemble..."):
+                ensemble_runner = EnsembleRunner(build_components(classifier, ensemble_components))
+                component_scores = ensemble_runner.score(paragraphs)
+            predictions = component_scores.pop("composite")
+            st.caption("Ensemble time per signal: " + ", ".join(
+                f"{name} {seconds:.2f}s" for name, seconds in ensemble_runner.timings.items()))
+        elif use_cascade:
+            predictions, routed = cascade_inference(classifier, paragraphs)
+            st.caption(f"Lexical pre-filter: model ran on {int(routed.sum())} of {len(paragraphs)} segments")
+        elif latency_budget:
+            # One background job per transcript: reruns show its result once done instead of starting another
+            full_fidelity = st.session_state.get("full_fidelity")
+            if full_fidelity is None or full_fidelity["paragraphs"] != paragraphs:
+                if full_fidelity is not None:  # a new transcript: the old job would only delay this one
+                    cancel_background(full_fidelity["info"]["background"])
+                predictions, budget_info = score_within_budget(classifier, paragraphs, latency_budget)
+                full_fidelity = None
+                if budget_info["approximate"]:
+                    full_fidelity = {"paragraphs": paragraphs, "scores": predictions, "info": budget_info}
+                st.session_state["full_fidelity"] = full_fidelity
+
+            background = full_fidelity["info"]["background"] if full_fidelity is not None else None
+            if background is not None and background.done() and background.exception() is None:
+                predictions = background.result()
+                st.session_state["full_fidelity"] = None
+                st.success("Full-fidelity scores have replaced the approximate ones.")
+            elif background is not None and background.done():
+                # Kept in the session state, so reruns keep the approximate scores instead of retrying
+                predictions = full_fidelity["scores"]
+                st.warning(f"Full-fidelity scoring failed ({background.exception()}); "
+                           "showing the approximate scores.")
+            elif full_fidelity is not None:
+                predictions, budget_info = full_fidelity["scores"], full_fidelity["info"]
+                st.warning(f"Approximate scores ({budget_info['mode']}): scoring every segment was estimated at "
+                           f"{budget_info['estimated_s']:.0f}s, over the {latency_budget}s budget. "
+                           f"{budget_info['model_scored']} segments went through the model. "
+                           "Full scoring continues in the background.")
+                st.button("Load full-fidelity scores", help="Reruns the analysis; exact scores are shown once ready.")
+        else:
+            # Stream batches as they finish: the chart and table fill in progressively
+            job_stats = {}
+            predictions = np.full(len(paragraphs), np.nan, dtype=np.float32)
+            all_seconds = timestamps["seconds"].to_numpy()
+            live_progress, live_chart, live_table = st.progress(0), st.empty(), st.empty()
+
+            for indices, batch_scores in core.iter_score(paragraphs, classifier=classifier, stats=job_stats):
+                predictions[indices] = batch_scores
+                done = np.flatnonzero(~np.isnan(predictions))  # scored so far, in timeline order
+                done_paragraphs = [paragraphs[i] for i in done]
+
+                live_progress.progress(len(done) / len(paragraphs), text=f"Scored {len(done)} of {len(paragraphs)} segments")
+                live_chart.plotly_chart(
+                    create_plotly_chart(all_seconds[done], predictions[done], done_paragraphs,
+                                        chart_type=chart_type, max_hover_length=max_hover_length),
+                    use_container_width=True,
+                )
+                live_table.dataframe(pd.DataFrame({
+                    "Timestamp": timestamps["timestamp_str"].to_numpy()[done],
+                    "Paragraph": done_paragraphs,
+                    "Fear Mongering Score": predictions[done],
+                }), use_container_width=True)
+
+            # The full (smoothed) results below replace the live preview
+            live_progress.empty()
+            live_chart.empty()
+            live_table.empty()
+            if job_stats["duplicates"]:
+                st.caption(f"{job_stats['duplicates']} repeated segments scored once "
+                           f"({job_stats['dedup_ratio']:.0%} of the transcript)")
 
     st.markdown("---")
 
@@ -361,7 +579,22 @@ def main():
     # ======================================================
     st.subheader("View Transcript Segments")
 
-    st.write(f"Text split into {len(paragraphs)} segments (max {max_chars} chars each)")
+    if max_tokens is not None:
+        st.write(f"Text split into {len(paragraphs)} segments (max {max_tokens} tokens each)")
+    else:
+        st.write(f"Text split into {len(paragraphs)} segments (max {max_chars} chars each)")
+
+    # How much of the model's context window the segmentation actually uses
+    tokenizer = tokenizer_for(classifier)  # the classifier's own, else the locally loaded one
+    with st.expander("Token Budget Report"):
+        report = token_report(paragraphs, tokenizer)
+        tok_col1, tok_col2, tok_col3 = st.columns(3)
+        tok_col1.metric("Context Fill", f"{report['context_fill'] * 100:.0f}%",
+                        delta=f"{report['tokens']} tokens")
+        tok_col2.metric("Padding Waste", f"{report['padding_waste'] * 100:.1f}%",
+                        delta=f"{report['padding_tokens']} pad tokens", delta_color="inverse")
+        tok_col3.metric("Truncated", f"{report['truncated_segments']} segments",
+                        delta=f"{report['truncated_tokens']} tokens lost", delta_color="inverse")
 
     # Show all segments in expandable section
     with st.expander("View All Segments"):
@@ -385,6 +618,9 @@ def main():
         smoothing_window=smoothing_window,
         video_duration_seconds=fake_duration,
     )
+    # Unsmoothed per-signal columns next to the composite score
+    for name, component in component_scores.items():
+        analysis_df[f"{name.replace('_', ' ').title()} Score"] = component
 
     # Store results in session state for downstream correlation with Fitbit
     st.session_state["fear_results_df"] = analysis_df
@@ -530,6 +766,15 @@ def main():
     fig = create_plotly_chart(seconds, scores, paragraphs, chart_type=chart_type, max_hover_length=max_hover_length)
     st.plotly_chart(fig, use_container_width=True)
 
+    # Finer timeline from the individual windows of over-length segments
+    if windows and any(len(segment) > 1 for segment in windows):
+        with st.expander("Window-Level Timeline"):
+            window_seconds, window_scores, window_texts = expand_window_timeline(seconds, windows)
+            st.caption(f"{len(window_scores)} windows across {len(paragraphs)} segments")
+            fig_windows = create_plotly_chart(window_seconds, window_scores, window_texts,
+                                              chart_type=chart_type, max_hover_length=max_hover_length)
+            st.plotly_chart(fig_windows, use_container_width=True)
+
 
     # =======================
     # DETAILED TABLE ANALYSIS
@@ -702,7 +947,8 @@ def main():
             # Align & Visualize
             # ======================================================
             # Time-align fear scores with heart rate data
-            fig, merged_df = align_fear_and_heart(fear_df, heart_df, start_dt, end_dt)
+            merged_df = core.align(fear_df, heart_df, start_dt, end_dt)
+            fig = alignment_chart(merged_df)
 
             st.subheader("Fear vs Heart Rate Chart")
             st.plotly_chart(fig, use_container_width=True)
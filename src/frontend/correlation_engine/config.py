@@ -10,6 +10,7 @@ DEFAULT_FEAR_THRESHOLD = 0.6
 
 # Text processing
 MAX_CHARS = 350
+SEGMENT_MAX_TOKENS = 512  # model context window; used by the "Tokens" segment mode
 
 MAX_SENTENCES = 5
 
@@ -0,0 +1,33 @@
+"""Shared test fixtures"""
+import pytest
+
+
+class FakeClassifier:
+    """Scores each text with `score` (default: its length / 100); records every batch it is given.
+
+    Extra keyword arguments become attributes (a `tokenizer`, an `engine`, ...).
+    With `fail=True` every call raises, as a crashed model would.
+    """
+
+    def __init__(self, score=None, fail=False, **attributes):
+        self.score = score or (lambda text: len(text) / 100)
+        self.fail = fail
+        self.batches = []
+        self.__dict__.update(attributes)
+
+    @property
+    def seen(self):
+        """Every text scored so far, in call order"""
+        return [text for batch in self.batches for text in batch]
+
+    def predict_proba(self, texts):
+        if self.fail:
+            raise RuntimeError("model crashed")
+        self.batches.append(list(texts))
+        return [self.score(text) for text in texts]
+
+
+@pytest.fixture
+def fake_classifier():
+    """Factory for FakeClassifier: `fake_classifier(score=None, fail=False, **attributes)`"""
+    return FakeClassifier
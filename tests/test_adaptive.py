@@ -0,0 +1,66 @@
+"""Coarse-to-fine adaptive scoring of adaptive.py, with a fake classifier"""
+import math
+import re
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pandas")
+
+from backend.fear_monger_processor import adaptive  # noqa: E402
+from backend.fear_monger_processor.adaptive import adaptive_score, needs_refinement, resolution_levels  # noqa: E402
+
+CALM = [f"Calm sentence number {i:02d}." for i in range(48)]  # 25 characters each
+
+
+def danger(text):
+    return 0.95 if "Danger" in text else 0.05
+
+
+@pytest.fixture(autouse=True)
+def regex_sentences(monkeypatch):
+    # Same contract as split_sentences without the NLTK Punkt data download
+    monkeypatch.setattr(adaptive, "split_sentences",
+                        lambda text: [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()])
+
+
+def score(text, classifier):
+    return adaptive_score(classifier, text, coarse_chars=400, fine_chars=100, max_sentences=4, use_cache=False)
+
+
+def test_levels_halve_down_to_the_fine_size():
+    assert resolution_levels(400, 100, 4) == [(400, 16), (200, 8), (100, 4)]
+    assert resolution_levels(50, 100, 4) == [(100, 4)]  # coarse below fine: one level
+    levels = resolution_levels(1400, math.inf, 5)  # "Sentences" mode: coarsen by sentence count
+    assert levels[-1] == (math.inf, 5) and [s for _, s in levels] == sorted((s for _, s in levels), reverse=True)
+
+
+def test_refinement_marks_the_threshold_band_and_both_sides_of_a_jump():
+    mask = needs_refinement([0.05, 0.05, 0.6, 0.05, 0.9, 0.9], threshold=0.6, margin=0.1, jump=0.3)
+    assert mask.tolist() == [False, True, True, True, True, False]
+
+
+def test_calm_transcript_keeps_its_coarse_segments(fake_classifier):
+    classifier = fake_classifier(score=danger)
+    paragraphs, timestamps, scores, stats = score(" ".join(CALM), classifier)
+
+    assert stats["segments"] == stats["segments_scored"] == len(classifier.seen)
+    assert set(timestamps["level"]) == {0}
+    assert stats["segments_scored"] < stats["fine_segments"]
+    assert " ".join(paragraphs) == " ".join(CALM)
+    np.testing.assert_allclose(scores, 0.05)
+
+
+def test_alarming_region_is_refined_down_to_the_fine_size(fake_classifier):
+    sentences = CALM[:30] + ["Danger is everywhere."] + CALM[30:]
+    classifier = fake_classifier(score=danger)
+    paragraphs, timestamps, scores, stats = score(" ".join(sentences), classifier)
+
+    assert " ".join(paragraphs) == " ".join(sentences)  # regions cover the transcript in order
+    alarming = [i for i, para in enumerate(paragraphs) if "Danger" in para]
+    assert len(alarming) == 1 and scores[alarming[0]] == pytest.approx(0.95)
+    assert timestamps["level"].iloc[alarming[0]] == stats["levels"] - 1
+    assert len(paragraphs[alarming[0]]) <= 100
+    assert 0 in set(timestamps["level"])  # calm stretches away from the jump stay coarse
+    assert stats["segments_scored"] == len(classifier.seen)
+    assert timestamps["seconds"].is_monotonic_increasing
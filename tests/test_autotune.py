@@ -0,0 +1,55 @@
+"""Tuning lookup after calibrate(), including reduced-precision fallbacks"""
+from types import SimpleNamespace
+
+import pytest
+
+from backend.fear_monger_processor import autotune
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+ROWS = [
+    {"threads": 2, "batch_size": 16, "items_per_s": 40.0},
+    {"threads": 4, "batch_size": 32, "items_per_s": 55.0},
+]
+
+
+@pytest.fixture(autouse=True)
+def pinned_revision(monkeypatch):
+    monkeypatch.setattr(autotune, "resolve_revision", lambda model_name, revision: SHA)
+
+
+def calibrate(monkeypatch, path, requested, resolved):
+    monkeypatch.setattr(autotune, "sweep", lambda *args, **kwargs: ROWS)
+    monkeypatch.setattr(autotune, "_set_threads", lambda engine, classifier, threads: classifier)
+    classifier = SimpleNamespace(precision=resolved)
+    return autotune.calibrate(classifier, engine="pytorch", path=path, precision=requested)
+
+
+def test_fallback_is_found_under_the_requested_precision(monkeypatch, tmp_path):
+    path = tmp_path / "tuning.json"
+    tuning = calibrate(monkeypatch, path, requested="bf16", resolved="fp32")
+    assert tuning["batch_size"] == 32 and tuning["threads"] == 4
+
+    # build_classifier looks up the requested precision; the next cold start must not sweep again
+    assert autotune.load_tuning("pytorch", path=path, precision="bf16") == tuning
+    assert autotune.load_tuning("pytorch", path=path, precision="fp32") == tuning
+    assert autotune.load_tuning("pytorch", path=path, precision="int8") is None
+
+
+def test_supported_precision_is_stored_once(monkeypatch, tmp_path):
+    path = tmp_path / "tuning.json"
+    tuning = calibrate(monkeypatch, path, requested="int8", resolved="int8")
+    assert autotune.load_tuning("pytorch", path=path, precision="int8") == tuning
+    assert autotune.load_tuning("pytorch", path=path, precision="fp32") is None
+
+
+def test_host_key_separates_pytorch_precisions_only():
+    assert autotune.host_key("pytorch", "bf16") != autotune.host_key("pytorch", "fp32")
+    assert autotune.host_key("onnx", "bf16") == autotune.host_key("onnx", "fp32")
+
+
+def test_host_key_follows_the_model_commit(monkeypatch):
+    key = autotune.host_key("pytorch", "fp32")
+    assert key.endswith(f"@{SHA}")
+
+    monkeypatch.setattr(autotune, "resolve_revision", lambda model_name, revision: "f" * 40)
+    assert autotune.host_key("pytorch", "fp32") != key  # "main" moved upstream: tune again
@@ -0,0 +1,52 @@
+"""Synthetic transcripts and the regression check of the offline benchmark suite"""
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from run_benchmarks import compare, summarize  # noqa: E402
+from synthetic import (  # noqa: E402
+    BOILERPLATE, STAGE_DIRECTIONS, VOCABULARY, generate_corpus, generate_transcript,
+)
+
+
+def sentences(text):
+    return re.split(r"(?<=[.!?])\s+", text)
+
+
+def test_transcripts_are_reproducible_per_seed():
+    assert generate_transcript(50, seed=3) == generate_transcript(50, seed=3)
+    assert generate_transcript(50, seed=3) != generate_transcript(50, seed=4)
+
+
+def test_sentence_shapes_set_sentence_length():
+    short = [s for s in sentences(generate_transcript(200, shape="short", seed=1))
+             if s not in STAGE_DIRECTIONS and s not in BOILERPLATE]
+    long = [s for s in sentences(generate_transcript(200, shape="long", seed=1))
+            if s not in STAGE_DIRECTIONS and s not in BOILERPLATE]
+    assert max(len(s.split()) for s in short) < min(len(s.split()) for s in long)
+
+
+def test_corpus_covers_every_shape_and_only_known_words():
+    corpus = generate_corpus("small")
+    assert sorted(corpus) == ["small/long", "small/medium", "small/mixed", "small/short"]
+    vocabulary = set(VOCABULARY)
+    for text in corpus.values():
+        assert {w.strip(".,!?()").lower() for w in text.split()} <= vocabulary  # the tiny tokenizer needs no [UNK]
+
+
+def test_summary_percentiles_and_throughput():
+    stats = summarize([10.0, 20.0, 30.0, 40.0, 50.0], items=100)
+    assert stats["runs"] == 5 and stats["min_ms"] == 10.0 and stats["p50_ms"] == 30.0
+    assert stats["items_per_s"] == pytest.approx(100 / 0.03, rel=1e-3)
+
+
+def test_only_slowdowns_beyond_the_tolerance_are_regressions():
+    baseline = {"results": {"fast": {"p50_ms": 10.0}, "slow": {"p50_ms": 10.0}, "gone": {"p50_ms": 5.0}}}
+    results = {"fast": {"p50_ms": 11.0}, "slow": {"p50_ms": 13.0}, "new": {"p50_ms": 99.0}}
+    assert compare(results, baseline, tolerance=0.2) == {
+        "slow": {"before_p50_ms": 10.0, "after_p50_ms": 13.0, "change": 0.3},
+    }
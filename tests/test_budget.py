@@ -0,0 +1,60 @@
+"""Sample positions used by budget.score_within_budget when it degrades to sampling, and its background job"""
+import threading
+
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor import budget
+from backend.fear_monger_processor.budget import (
+    BackgroundJob, ThroughputMeter, cancel_background, sample_positions, score_within_budget,
+)
+
+
+@pytest.mark.parametrize("n, k", [(0, 0), (0, 3), (5, 5), (5, 9)])
+def test_budget_covering_everything_takes_every_position(n, k):
+    assert sample_positions(n, k).tolist() == list(range(n))
+
+
+def test_zero_budget_takes_nothing():
+    assert sample_positions(10, 0).tolist() == []
+    assert sample_positions(10, -1).tolist() == []
+
+
+def test_budget_of_one_takes_the_first_position():
+    assert sample_positions(10, 1).tolist() == [0]
+
+
+@pytest.mark.parametrize("n", [2, 3, 7, 10, 101, 1000])
+def test_positions_are_sorted_unique_in_range_and_span_the_timeline(n):
+    for k in range(2, n):
+        positions = sample_positions(n, k)
+        assert positions.dtype.kind == "i"
+        assert len(positions) == k
+        assert np.all(np.diff(positions) > 0)
+        assert positions[0] == 0 and positions[-1] == n - 1
+
+
+def test_degraded_call_hands_back_a_job_with_the_exact_scores(fake_classifier):
+    paragraphs = ["Fear is coming.", "Calm down.", "A much longer paragraph here."]
+    meter = ThroughputMeter(seed=1e-3)  # far too slow for any budget
+    # No tokenizer, so costs are counted in characters
+    scores, info = score_within_budget(fake_classifier(), paragraphs, budget_s=0.01, meter=meter,
+                                       use_cache=False, show_progress=False)
+    assert info["approximate"] and info["mode"] == "lexical" and len(scores) == 3
+
+    job = info["background"]
+    assert isinstance(job, BackgroundJob)
+    np.testing.assert_allclose(job.result(timeout=5), [len(p) / 100 for p in paragraphs])
+    assert job.done() and job.exception() is None
+
+
+def test_cancel_drops_a_queued_job_and_sets_its_stop_event():
+    release = threading.Event()  # keeps the single background worker busy, so the next job stays queued
+    blocker = BackgroundJob(budget._background.submit(release.wait, 5), threading.Event())
+    queued = BackgroundJob(budget._background.submit(lambda: 1.0), threading.Event())
+
+    cancel_background(queued)
+    assert queued.stop.is_set() and queued.future.cancelled()
+    release.set()
+    blocker.result(timeout=5)
+    cancel_background(None)  # no job: nothing to do
@@ -0,0 +1,66 @@
+"""ScoreCache against a temporary SQLite file: keys, LRU eviction and counters"""
+import time
+
+import pytest
+
+from backend.fear_monger_processor.cache import ScoreCache, normalize_paragraph, resolve_revision
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ScoreCache(path=tmp_path / "scores.sqlite", model_name="test/model", revision=SHA, max_entries=3)
+
+
+def test_normalization_shares_one_entry():
+    assert normalize_paragraph("  Fear is\n\n coming.\t") == "Fear is coming."
+    assert normalize_paragraph("Ｆear") == "Fear"  # NFKC: full-width letters
+
+
+def test_key_depends_on_text_model_and_revision(tmp_path, cache):
+    other_revision = ScoreCache(path=tmp_path / "scores.sqlite", model_name="test/model", revision="f" * 40)
+    other_model = ScoreCache(path=tmp_path / "scores.sqlite", model_name="test/other", revision=SHA)
+
+    assert cache.key("Fear is coming.") == cache.key(" Fear   is coming.\n")
+    assert cache.key("Fear is coming.") != cache.key("Fear is gone.")
+    assert cache.key("Fear is coming.") != other_revision.key("Fear is coming.")
+    assert cache.key("Fear is coming.") != other_model.key("Fear is coming.")
+
+
+def test_hits_and_misses_are_counted(cache):
+    cache.put_many(["a", "b"], [0.25, 0.75])
+    hits = cache.get_many(["a", "c", " b ", "a"])
+
+    assert hits == {0: 0.25, 2: 0.75, 3: 0.25}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(0.75)
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.put_many(["a", "b", "c"], [0.1, 0.2, 0.3])
+    time.sleep(0.001)
+    assert cache.get_many(["a"]) == {0: pytest.approx(0.1)}  # "a" is now the most recent
+    time.sleep(0.001)
+    cache.put_many(["d"], [0.4])
+
+    assert cache.stats()["entries"] == 3
+    assert set(cache.get_many(["a", "b", "c", "d"])) == {0, 2, 3}  # "b" was the oldest
+
+
+def test_entries_persist_across_instances(tmp_path, cache):
+    cache.put_many(["a"], [0.5])
+    reopened = ScoreCache(path=tmp_path / "scores.sqlite", model_name="test/model", revision=SHA)
+    assert reopened.get_many(["a"]) == {0: 0.5}
+
+
+def test_clear_resets_entries_and_counters(cache):
+    cache.put_many(["a"], [0.5])
+    cache.get_many(["a", "b"])
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0, "max_entries": 3}
+
+
+def test_commit_sha_is_kept_as_is():
+    assert resolve_revision("test/model", SHA) == SHA
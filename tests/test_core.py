@@ -0,0 +1,53 @@
+"""fearsense.core stays headless: no heavy imports at import time, scores through any classifier"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+HEAVY = ["streamlit", "transformers", "torch", "plotly", "matplotlib", "onnxruntime", "nltk"]
+
+
+@pytest.mark.parametrize("module", ["fearsense.core", "backend.fear_monger_processor.inference",
+                                    "backend.fear_monger_processor.model"])
+def test_import_pulls_in_no_heavy_dependency(module):
+    probe = f"import json, sys; import {module}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    out = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True).stdout
+    assert json.loads(out) == []
+
+
+def test_score_and_iter_score_keep_input_order(fake_classifier):
+    from fearsense import core
+
+    paragraphs = ["ccc", "a", "bb", "a"]
+    scores = core.score(paragraphs, classifier=fake_classifier(), use_cache=False)
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, [0.03, 0.01, 0.02, 0.01])
+
+    streamed = np.zeros(len(paragraphs), dtype=np.float32)
+    for indices, batch_scores in core.iter_score(paragraphs, classifier=fake_classifier(), batch_size=1,
+                                                 use_cache=False):
+        streamed[indices] = batch_scores
+    np.testing.assert_allclose(streamed, scores)
+
+
+def test_headless_fallbacks_without_streamlit(monkeypatch):
+    from backend.fear_monger_processor import st_compat
+
+    monkeypatch.delitem(sys.modules, "streamlit", raising=False)
+    calls = []
+
+    @st_compat.cache_data
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == square(3) == 9 and calls == [3]  # memoized in-process
+    bar = st_compat.progress_bar()
+    bar.progress(0.5)
+    bar.empty()
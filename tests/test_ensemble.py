@@ -0,0 +1,146 @@
+"""EnsembleRunner: shared tokenization, caching, weights and priority; scheduler slots of the emotion model"""
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor import ensemble
+from backend.fear_monger_processor.ensemble import EnsembleRunner, LexicalComponent
+from backend.fear_monger_processor.scheduler import (
+    InferenceScheduler, current_priority, inference_priority,
+)
+
+PARAGRAPHS = ["Fear is coming.", "Calm down.", "Fear is coming.", "A much longer paragraph here."]
+
+
+class CountingTokenizer:
+    """One id per character; records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation=False, max_length=None):
+        self.calls.append(list(texts))
+        return {"input_ids": [[ord(c) for c in text] for text in texts]}
+
+
+class IdsComponent:
+    """Model component that scores token ids: their count / 100, times `factor`"""
+
+    cache = None
+
+    def __init__(self, name, tokenizer, vocab_key="shared", factor=1.0):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.vocab_key = vocab_key
+        self.factor = factor
+        self.priorities = []
+
+    def score_ids(self, input_ids, batch_size=None):
+        self.priorities.append(current_priority())
+        return np.array([len(ids) / 100 * self.factor for ids in input_ids], dtype=np.float32)
+
+
+class DictCache:
+    def __init__(self, scores):
+        self.scores = dict(scores)
+
+    def get_many(self, paragraphs):
+        return {i: self.scores[p] for i, p in enumerate(paragraphs) if p in self.scores}
+
+    def put_many(self, paragraphs, scores):
+        self.scores.update(zip(paragraphs, scores))
+
+
+def lengths(factor=1.0):
+    return np.array([len(p) / 100 * factor for p in PARAGRAPHS], dtype=np.float32)
+
+
+def test_components_with_one_vocabulary_share_one_tokenization():
+    tokenizer = CountingTokenizer()
+    fear, emotion = IdsComponent("fear", tokenizer), IdsComponent("emotion", tokenizer, factor=0.5)
+    scores = EnsembleRunner([fear, emotion], weights={"fear": 1.0, "emotion": 1.0}).score(PARAGRAPHS, use_cache=False)
+
+    assert len(tokenizer.calls) == 1 and sorted(tokenizer.calls[0]) == sorted(set(PARAGRAPHS))  # deduplicated
+    np.testing.assert_allclose(scores["fear"], lengths())
+    np.testing.assert_allclose(scores["emotion"], lengths(0.5))
+
+
+def test_composite_is_the_renormalized_weighted_mean():
+    fear = IdsComponent("fear", CountingTokenizer())
+    runner = EnsembleRunner([fear, LexicalComponent()], weights={"fear": 0.6, "lexical": 0.2, "unused": 0.2})
+    assert runner.weights == pytest.approx({"fear": 0.75, "lexical": 0.25})
+
+    scores = runner.score(PARAGRAPHS, use_cache=False)
+    np.testing.assert_allclose(scores["composite"], 0.75 * scores["fear"] + 0.25 * scores["lexical"], rtol=1e-6)
+
+
+def test_cached_segments_are_neither_tokenized_nor_scored():
+    tokenizer = CountingTokenizer()
+    fear = IdsComponent("fear", tokenizer)
+    fear.cache = DictCache({"Calm down.": 0.9})
+    scores = EnsembleRunner([fear]).score(PARAGRAPHS)
+
+    assert "Calm down." not in tokenizer.calls[0]
+    assert scores["fear"][1] == pytest.approx(0.9)
+    assert fear.cache.scores["A much longer paragraph here."] == pytest.approx(0.29)  # written back
+
+
+def test_components_run_at_the_callers_priority():
+    fear = IdsComponent("fear", CountingTokenizer())
+    with inference_priority("batch"):
+        EnsembleRunner([fear], workers=2).score(PARAGRAPHS, use_cache=False)
+    assert fear.priorities == ["batch"]
+
+
+def test_an_ensemble_needs_a_component():
+    with pytest.raises(ValueError):
+        EnsembleRunner([])
+
+
+def test_emotion_batches_take_a_scheduler_slot(monkeypatch):
+    torch = pytest.importorskip("torch")
+
+    class EmotionModel(torch.nn.Module):
+        config = types.SimpleNamespace(label2id={"joy": 0, "fear": 1})
+        device = torch.device("cpu")
+
+        def forward(self, input_ids, attention_mask=None):
+            return types.SimpleNamespace(logits=torch.zeros(len(input_ids), 2))
+
+    class EmotionTokenizer(CountingTokenizer):
+        all_special_ids = [0]
+
+        def get_vocab(self):
+            return {"[PAD]": 0}
+
+        def pad(self, encoded, return_tensors=None):
+            width = max(len(ids) for ids in encoded["input_ids"])
+            rows = [ids + [0] * (width - len(ids)) for ids in encoded["input_ids"]]
+            return Encoded(input_ids=torch.tensor(rows))
+
+    class Encoded(dict):
+        def to(self, device):
+            return self
+
+    def pipeline(task, tokenizer, **kwargs):
+        return types.SimpleNamespace(model=EmotionModel(), tokenizer=tokenizer)
+
+    fake_transformers = types.SimpleNamespace(
+        pipeline=pipeline, AutoTokenizer=types.SimpleNamespace(from_pretrained=lambda *a, **k: EmotionTokenizer()),
+    )
+    monkeypatch.setitem(sys.modules, "transformers", fake_transformers)
+    ensemble.load_emotion_pipeline.cache_clear()
+    try:
+        emotion = ensemble.load_emotion_pipeline()
+    finally:
+        ensemble.load_emotion_pipeline.cache_clear()
+    emotion.scheduler = scheduler = InferenceScheduler(max_concurrency=1)
+
+    component = ensemble.ModelComponent("emotion", emotion, ("fear",))
+    with inference_priority("batch"):
+        scores = component.score_ids([[5, 6, 7], [8]], batch_size=1)
+
+    np.testing.assert_allclose(scores, 0.5)
+    assert emotion.calls == 2 and scheduler.metrics()["classes"]["batch"]["admitted"] == 2
@@ -0,0 +1,148 @@
+"""Dedup, streaming and scatter order of batched inference and sliding-window scoring, with fake classifiers"""
+import re
+
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor.config import MAX_TOKENS
+from backend.fear_monger_processor.inference import (
+    aggregate_windows, batched_predict, dedupe, iter_predict, run_windowed_inference,
+)
+
+
+def expected(paragraphs):
+    return np.array([len(" ".join(p.split())) / 100 for p in paragraphs], dtype=np.float32)
+
+
+PARAGRAPHS = ["Fear is coming.", "", "Calm down.", "Fear  is coming.", "", "A much longer paragraph here.",
+              "Calm down."]
+
+
+def test_dedupe_maps_every_paragraph_to_its_unique_copy():
+    unique, inverse = dedupe(PARAGRAPHS)
+    assert unique == ["Fear is coming.", "", "Calm down.", "A much longer paragraph here."]
+    assert [unique[j] for j in inverse] == ["Fear is coming.", "", "Calm down.", "Fear is coming.", "",
+                                            "A much longer paragraph here.", "Calm down."]
+
+
+def test_scores_come_back_in_input_order_with_duplicates_and_empty_strings(fake_classifier):
+    classifier = fake_classifier()
+    stats = {}
+    scores = batched_predict(classifier, PARAGRAPHS, batch_size=2, stats=stats)
+
+    np.testing.assert_allclose(scores, expected(PARAGRAPHS))
+    scored = classifier.seen
+    assert sorted(scored) == sorted(set(scored)) and len(scored) == 4  # each unique paragraph once
+    assert stats == {"segments": 7, "unique": 4, "duplicates": 3, "dedup_ratio": round(3 / 7, 4),
+                     "cache_hits": 0, "model_scored": 4}
+
+
+def test_every_index_is_yielded_exactly_once(fake_classifier):
+    chunks = list(iter_predict(fake_classifier(), PARAGRAPHS, batch_size=3))
+    indices = np.concatenate([indices for indices, _ in chunks])
+    assert sorted(indices.tolist()) == list(range(len(PARAGRAPHS)))
+    for indices, scores in chunks:
+        np.testing.assert_allclose(scores, expected([PARAGRAPHS[i] for i in indices]))
+
+
+def test_batches_are_yielded_as_they_complete(fake_classifier):
+    classifier = fake_classifier()
+    progress, stats = [], {}
+    chunks = iter_predict(classifier, PARAGRAPHS, batch_size=1, progress_callback=lambda *p: progress.append(p),
+                          stats=stats)
+
+    indices, scores = next(chunks)
+    assert len(classifier.batches) == 1 and progress == [(1, 4)]  # nothing else scored yet
+    assert stats == {}  # filled once the generator is exhausted
+    np.testing.assert_allclose(scores, expected([PARAGRAPHS[i] for i in indices]))
+
+    rest = list(chunks)
+    assert len(rest) == 3 and progress[-1] == (4, 4)
+    assert stats["model_scored"] == 4
+
+
+def test_cached_paragraphs_come_first_as_one_chunk(fake_classifier):
+    class DictCache:
+        def get_many(self, paragraphs):
+            return {i: 0.5 for i, p in enumerate(paragraphs) if p in ("Calm down.", "")}
+
+        def put_many(self, paragraphs, scores):
+            pass
+
+    first_indices, first_scores = next(iter_predict(fake_classifier(), PARAGRAPHS, batch_size=2, cache=DictCache()))
+    assert sorted(first_indices.tolist()) == [1, 2, 4, 6]  # every occurrence of both cached paragraphs
+    np.testing.assert_allclose(first_scores, 0.5)
+
+
+def test_cached_paragraphs_are_not_rescored(fake_classifier):
+    class DictCache:
+        def __init__(self):
+            self.scores = {"Calm down.": 0.5}
+
+        def get_many(self, paragraphs):
+            return {i: self.scores[p] for i, p in enumerate(paragraphs) if p in self.scores}
+
+        def put_many(self, paragraphs, scores):
+            self.scores.update(zip(paragraphs, scores))
+
+    classifier = fake_classifier()
+    scores = batched_predict(classifier, PARAGRAPHS, batch_size=2, cache=DictCache())
+    assert scores[2] == scores[6] == 0.5
+    assert "Calm down." not in classifier.seen
+
+
+def test_no_paragraphs(fake_classifier):
+    stats = {}
+    assert batched_predict(fake_classifier(), [], stats=stats).shape == (0,)
+    assert stats["segments"] == 0 and stats["model_scored"] == 0
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word, plus two special tokens"""
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False, truncation=False,
+                 max_length=None):
+        single = isinstance(texts, str)
+        spans = [[m.span() for m in re.finditer(r"\S+", text)] for text in ([texts] if single else texts)]
+        ids = [list(range(len(row) + (2 if add_special_tokens else 0))) for row in spans]
+        if truncation and max_length:
+            ids = [row[:max_length] for row in ids]
+        encoded = {"input_ids": ids[0] if single else ids}
+        if return_offsets_mapping:
+            encoded["offset_mapping"] = spans[0] if single else spans
+        return encoded
+
+
+def alarm(text):
+    return 0.9 if "danger" in text else 0.1
+
+
+def test_aggregate_windows():
+    assert aggregate_windows([0.2, 0.8], [10, 30], how="max") == 0.8
+    assert aggregate_windows([0.2, 0.8], [10, 30], how="mean") == pytest.approx(0.5)
+    assert aggregate_windows([0.2, 0.8], [10, 30], how="weighted") == pytest.approx((2 + 24) / 40)
+    with pytest.raises(ValueError):
+        aggregate_windows([0.2], [10], how="median")
+
+
+def test_windowed_inference_scores_every_window_and_aggregates_per_paragraph(fake_classifier):
+    words = ["calm"] * 1000
+    words[980] = "danger"  # windows cover words 0-509, 446-955 and 892-999
+    paragraphs = ["A short calm paragraph.", " ".join(words)]
+    classifier = fake_classifier(score=alarm, tokenizer=WordTokenizer())
+
+    scores, windows = run_windowed_inference(classifier, paragraphs, aggregate="max", overlap=64,
+                                             show_progress=False, use_cache=False)
+
+    assert len(windows[0]) == 1 and windows[0][0]["text"] == paragraphs[0]
+    assert len(windows[1]) == 3
+    assert all(window["tokens"] <= MAX_TOKENS - 2 and window["text"] in paragraphs[1] for window in windows[1])
+    assert [window["score"] for window in windows[1]] == pytest.approx([0.1, 0.1, 0.9])
+    np.testing.assert_allclose(scores, [0.1, 0.9])
+
+    mean_scores, _ = run_windowed_inference(classifier, paragraphs, aggregate="mean", overlap=64,
+                                            show_progress=False, use_cache=False)
+    np.testing.assert_allclose(mean_scores, [0.1, (0.1 + 0.1 + 0.9) / 3], rtol=1e-6)
@@ -0,0 +1,34 @@
+"""Confidence bands of the lexical cascade, with a fake classifier behind it"""
+import numpy as np
+
+from backend.fear_monger_processor.lexical import cascade_inference, cascade_route, lexical_scores
+
+CALM = "We planted tomatoes in the garden and they grew well this summer."
+UNCERTAIN = "There is some risk in everything we do, so we plan ahead."
+SATURATED = "Catastrophe, doom, extinction and annihilation: it is too late, the end of the world."
+FILLER = "(Laughter)"
+PARAGRAPHS = [CALM, UNCERTAIN, SATURATED, FILLER]
+
+
+def test_lexical_scores_order_the_segments():
+    calm, uncertain, saturated, _ = lexical_scores(PARAGRAPHS)
+    assert calm == 0.0 and 0.0 < uncertain < 1.0 and saturated == 1.0
+
+
+def test_only_the_uncertain_band_needs_the_model():
+    scores, needs_model = cascade_route(PARAGRAPHS, low=0.0, high=1.0)
+    assert needs_model.tolist() == [False, True, False, False]
+    assert scores[0] == 0.0 and scores[2] == 1.0 and scores[3] == 0.0
+
+
+def test_negative_low_sends_cue_free_segments_to_the_model():
+    _, needs_model = cascade_route(PARAGRAPHS, low=-1.0, high=1.0)
+    assert needs_model.tolist() == [True, True, False, False]  # filler still skips
+
+
+def test_cascade_scores_routed_segments_with_the_model(fake_classifier):
+    classifier = fake_classifier(score=lambda text: 0.5)
+    scores, needs_model = cascade_inference(classifier, PARAGRAPHS, low=0.0, high=1.0, show_progress=False,
+                                            use_cache=False)
+    assert classifier.seen == [UNCERTAIN]
+    np.testing.assert_allclose(scores, [0.0, 0.5, 1.0, 0.0])
@@ -0,0 +1,31 @@
+"""Staleness check of the ONNX export: model name and commit sha come from its manifest"""
+import json
+
+import pytest
+
+from backend.fear_monger_processor import onnx_engine
+from backend.fear_monger_processor.onnx_engine import FP32_FILE, MANIFEST_FILE, is_exported
+
+OLD_SHA = "0123456789abcdef0123456789abcdef01234567"
+NEW_SHA = "f" * 40
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    (tmp_path / FP32_FILE).write_bytes(b"")
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps({"model": "test/model", "revision": OLD_SHA}))
+    return tmp_path
+
+
+def test_graph_from_an_older_sha_is_stale(export_dir, monkeypatch):
+    monkeypatch.setattr(onnx_engine, "resolve_revision", lambda model_name, revision: OLD_SHA)
+    assert is_exported(export_dir, "test/model", "main")
+
+    monkeypatch.setattr(onnx_engine, "resolve_revision", lambda model_name, revision: NEW_SHA)
+    assert not is_exported(export_dir, "test/model", "main")
+
+
+def test_graph_of_another_model_or_without_manifest_is_stale(export_dir):
+    assert not is_exported(export_dir, "test/other", OLD_SHA)
+    (export_dir / MANIFEST_FILE).unlink()
+    assert not is_exported(export_dir, "test/model", OLD_SHA)  # exported before manifests existed
@@ -0,0 +1,91 @@
+"""ScoringPool sharding, dedup scatter and transcript collection, with threads standing in for the workers"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor import pool
+from backend.fear_monger_processor.pool import ScoringPool
+
+INTRO = "Thank you so much."
+APPLAUSE = "(Applause)"
+segmenter_calls = []
+
+
+def bar_segmenter(text, max_chars, max_sentences):
+    """One paragraph per "|"-separated part; records its keyword arguments"""
+    segmenter_calls.append((max_chars, max_sentences))
+    return [part.strip() for part in text.split("|")]
+
+
+def slow_first_shard(text):
+    if text.startswith("slow"):
+        time.sleep(0.05)  # the first shard finishes last
+    return len(text) / 100
+
+
+def expected(paragraphs):
+    return np.array([len(" ".join(p.split())) / 100 for p in paragraphs], dtype=np.float32)
+
+
+@pytest.fixture
+def make_pool(monkeypatch, fake_classifier):
+    # Same map / ordering contract as the spawned worker processes, without loading a model per worker
+    monkeypatch.setattr(pool, "ProcessPoolExecutor",
+                        lambda max_workers, mp_context, initializer, initargs: ThreadPoolExecutor(max_workers))
+    pools = []
+
+    def make(score=None, batch_size=2):
+        classifier = fake_classifier(score=score)
+        monkeypatch.setattr(pool, "_worker_classifier", classifier)
+        monkeypatch.setattr(pool, "_worker_options", {"batch_size": batch_size, "use_cache": False})
+        pools.append(ScoringPool(workers=3, batch_size=batch_size))
+        return pools[-1], classifier
+
+    yield make
+    for scoring_pool in pools:
+        scoring_pool.close()
+
+
+def test_duplicates_are_scored_once_and_scattered_back_across_uneven_shards(make_pool):
+    scoring_pool, classifier = make_pool()
+    paragraphs = ["a", "bb", "a", "ccc", "dddd", "bb", "eeeee", "a "]  # 5 unique: shards of 2, 2 and 1
+
+    scores = scoring_pool.score_paragraphs(paragraphs, shard_size=2)
+
+    np.testing.assert_allclose(scores, expected(paragraphs))
+    assert scores.dtype == np.float32 and len(scores) == len(paragraphs)
+    assert sorted(classifier.seen) == ["a", "bb", "ccc", "dddd", "eeeee"]
+    assert scoring_pool.stats == {"segments": 8, "unique": 5, "duplicates": 3, "dedup_ratio": 0.375}
+
+
+def test_shards_are_collected_in_input_order(make_pool):
+    scoring_pool, _ = make_pool(score=slow_first_shard, batch_size=1)
+    paragraphs = ["slow one", "slow two", "x", "yy", "zzz", "x", "slow one"]
+
+    scores = scoring_pool.score_paragraphs(paragraphs, shard_size=2)
+    np.testing.assert_allclose(scores, expected(paragraphs))
+
+
+def test_no_paragraphs(make_pool):
+    scoring_pool, classifier = make_pool()
+    assert scoring_pool.score_paragraphs([]).shape == (0,)
+    assert classifier.batches == [] and scoring_pool.stats["segments"] == 0
+
+
+def test_transcripts_use_the_segmenter_and_share_boilerplate(make_pool):
+    scoring_pool, classifier = make_pool()
+    segmenter_calls.clear()
+    texts = [f"{INTRO} | Fear is coming. | {APPLAUSE}", "   ", float("nan"), f"{INTRO} | Calm down. | {APPLAUSE}"]
+
+    results = scoring_pool.score_transcripts(texts, segmenter=bar_segmenter, max_chars=123, max_sentences=4)
+
+    assert [paragraphs for paragraphs, _ in results] == [
+        [INTRO, "Fear is coming.", APPLAUSE], [], [], [INTRO, "Calm down.", APPLAUSE],
+    ]
+    for paragraphs, scores in results:
+        np.testing.assert_allclose(scores, expected(paragraphs))
+    assert segmenter_calls == [(123, 4), (123, 4)]  # blank and missing transcripts are not segmented
+    assert sorted(classifier.seen) == sorted([INTRO, APPLAUSE, "Fear is coming.", "Calm down."])
+    assert scoring_pool.stats["duplicates"] == 2
@@ -0,0 +1,90 @@
+"""Precision fallback to fp32 and the drift report, with a fake pipeline"""
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor import model, onnx_engine, precision
+from backend.fear_monger_processor.precision import apply_precision, drift_report, resolve_precision
+
+PARAGRAPHS = ["Fear is coming.", "Calm down.", "Panic in the streets.", "Nothing to see."]
+REFERENCE = np.array([0.9, 0.1, 0.8, 0.2])
+
+
+class FakeModel:
+    def __init__(self):
+        self.dtype = "float32"
+
+    def to(self, dtype):
+        self.dtype = dtype
+        return self
+
+
+class FakePipeline:
+    def __init__(self):
+        self.model = FakeModel()
+        self.cache_revision = "test/model@sha"
+
+
+def test_bf16_falls_back_to_fp32_without_native_support(monkeypatch):
+    monkeypatch.setattr(precision, "_cpu_flags", lambda: {"fpu", "sse2", "avx2"})
+    assert not precision.bf16_supported()
+    with pytest.warns(UserWarning, match="bf16"):
+        assert resolve_precision("bf16") == "fp32"
+
+    monkeypatch.setattr(precision, "_cpu_flags", lambda: {"avx2", "avx512_bf16"})
+    assert resolve_precision("bf16") == "bf16"
+
+
+def test_int8_falls_back_to_fp32_without_a_quantized_backend(monkeypatch):
+    monkeypatch.setattr(precision, "int8_supported", lambda: False)
+    with pytest.warns(UserWarning, match="int8"):
+        assert resolve_precision("int8") == "fp32"
+
+
+def test_unknown_precision_is_rejected():
+    with pytest.raises(ValueError, match="fp16"):
+        resolve_precision("fp16")
+
+
+def test_fallback_keeps_the_model_and_its_cache_revision(monkeypatch):
+    pytest.importorskip("torch")
+    monkeypatch.setattr(precision, "bf16_supported", lambda: False)
+    with pytest.warns(UserWarning):
+        classifier = apply_precision(FakePipeline(), "bf16")
+    assert classifier.precision == "fp32"
+    assert classifier.model.dtype == "float32"
+    assert classifier.cache_revision == "test/model@sha"
+
+
+def test_drift_report_has_an_entry_per_requested_precision(monkeypatch):
+    pytest.importorskip("torch")
+    monkeypatch.setattr(precision, "bf16_supported", lambda: True)
+    monkeypatch.setattr(precision, "int8_supported", lambda: False)
+    monkeypatch.setattr(model, "build_pipeline", FakePipeline)
+
+    def fear_probabilities(classifier, paragraphs, batch_size):
+        shift = 0.01 if classifier.precision == "bf16" else 0.0
+        return REFERENCE[:len(paragraphs)] + shift
+
+    def timings(classifier, paragraphs, batch_size, repeats):
+        rate = 200.0 if classifier.precision == "bf16" else 100.0
+        return {"latency_ms_p50": 1.0, "latency_ms_max": 2.0, "throughput_per_s": rate}
+
+    monkeypatch.setattr(onnx_engine, "_fear_probabilities", fear_probabilities)
+    monkeypatch.setattr(onnx_engine, "_timings", timings)
+
+    with pytest.warns(UserWarning, match="int8"):
+        report = drift_report(PARAGRAPHS, precisions=("bf16", "int8"), batch_size=2, repeats=1)
+
+    assert report["paragraphs"] == len(PARAGRAPHS)
+    assert report["fp32"]["throughput_per_s"] == 100.0
+
+    bf16 = report["bf16"]
+    assert bf16["requested"] == "bf16" and bf16["precision"] == "bf16"
+    assert bf16["max_abs_diff"] == pytest.approx(0.01)
+    assert bf16["label_agreement"] == 1.0
+    assert bf16["passed"] and bf16["throughput_speedup"] == 2.0
+
+    int8 = report["int8"]  # fell back: scored in fp32, held to the fp32 tolerance
+    assert int8["requested"] == "int8" and int8["precision"] == "fp32"
+    assert int8["max_abs_diff"] == 0.0 and int8["tolerance"] == precision.DRIFT_TOLERANCE["fp32"]
+    assert int8["passed"] and int8["throughput_speedup"] == 1.0
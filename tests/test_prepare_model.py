@@ -0,0 +1,37 @@
+"""Manifest check of the prepared model artifact: revisions are compared as commit shas"""
+import json
+
+from backend.fear_monger_processor import prepare_model
+from backend.fear_monger_processor.prepare_model import MANIFEST_FILE, WEIGHTS_FILE, is_prepared, read_manifest
+
+OLD_SHA = "0123456789abcdef0123456789abcdef01234567"
+NEW_SHA = "f" * 40
+
+
+def write_artifact(model_dir, revision, model="test/model"):
+    (model_dir / WEIGHTS_FILE).write_bytes(b"")
+    (model_dir / MANIFEST_FILE).write_text(json.dumps({"model": model, "revision": revision}))
+
+
+def test_branch_is_resolved_before_comparing(tmp_path, monkeypatch):
+    write_artifact(tmp_path, OLD_SHA)
+    monkeypatch.setattr(prepare_model, "resolve_revision", lambda model_name, revision: OLD_SHA)
+    assert is_prepared(tmp_path, "test/model", "main")
+
+    monkeypatch.setattr(prepare_model, "resolve_revision", lambda model_name, revision: NEW_SHA)  # main moved
+    assert not is_prepared(tmp_path, "test/model", "main")
+
+
+def test_other_model_or_incomplete_artifact_is_not_prepared(tmp_path):
+    write_artifact(tmp_path, OLD_SHA)
+    assert is_prepared(tmp_path, "test/model", OLD_SHA)
+    assert not is_prepared(tmp_path, "test/other", OLD_SHA)
+
+    (tmp_path / WEIGHTS_FILE).unlink()
+    assert not is_prepared(tmp_path, "test/model", OLD_SHA)
+
+
+def test_missing_or_corrupt_manifest(tmp_path):
+    assert read_manifest(tmp_path) is None
+    (tmp_path / MANIFEST_FILE).write_text("{not json")
+    assert read_manifest(tmp_path) is None
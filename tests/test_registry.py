@@ -0,0 +1,33 @@
+"""Which classifiers the registry puts behind the local scheduler"""
+import pytest
+
+from backend.fear_monger_processor import model
+from backend.fear_monger_processor.registry import ModelRegistry, SharedClassifier
+from backend.fear_monger_processor.scheduler import InferenceScheduler
+
+
+@pytest.fixture
+def registry(monkeypatch, fake_classifier):
+    monkeypatch.setattr(model, "build_classifier", lambda engine: fake_classifier(engine=engine))
+    return ModelRegistry(scheduler=InferenceScheduler(), keep_warm=False)
+
+
+def test_local_engines_are_scheduled_locally(registry):
+    classifier = registry.get("pytorch")
+    assert isinstance(classifier, SharedClassifier)
+    assert classifier.engine == "pytorch"  # attributes are forwarded
+    assert registry.get("pytorch") is classifier
+
+
+def test_server_engine_is_not_wrapped(registry):
+    classifier = registry.get("server")
+    assert not isinstance(classifier, SharedClassifier)  # the server's scheduler admits its calls
+    assert classifier.engine == "server"
+    assert registry.lease("server").classifier is classifier
+
+
+def test_unused_models_are_released(registry):
+    lease = registry.lease("onnx")
+    first = lease.classifier
+    lease.release()
+    assert registry.lease("onnx").classifier is not first  # reloaded after the last reference went away
@@ -0,0 +1,158 @@
+"""Admission order and per-class limits of scheduler.InferenceScheduler"""
+import threading
+import time
+
+import pytest
+
+from backend.fear_monger_processor.scheduler import (
+    InferenceScheduler, current_priority, inference_priority, set_priority,
+)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.001)
+
+
+class Call:
+    """A model call on its own thread that holds its slot until released"""
+
+    def __init__(self, scheduler, priority, order):
+        self.admitted = threading.Event()
+        self.release = threading.Event()
+
+        def body():
+            with scheduler.slot(priority):
+                order.append(self)
+                self.admitted.set()
+                self.release.wait(5)
+
+        self.thread = threading.Thread(target=body, daemon=True)
+        self.thread.start()
+
+    def finish(self):
+        self.release.set()
+        self.thread.join(5)
+
+
+def queued(scheduler, priority):
+    return scheduler.metrics()["classes"][priority]["queue_depth"]
+
+
+def test_interactive_overtakes_queued_batch_calls():
+    scheduler = InferenceScheduler(max_concurrency=1, limits={"interactive": 1, "batch": 1})
+    order = []
+    running = Call(scheduler, "batch", order)
+    running.admitted.wait(2)
+
+    batch = [Call(scheduler, "batch", order) for _ in range(2)]
+    wait_until(lambda: queued(scheduler, "batch") == 2)
+    interactive = Call(scheduler, "interactive", order)
+    wait_until(lambda: queued(scheduler, "interactive") == 1)
+
+    running.finish()
+    interactive.admitted.wait(2)
+    assert order == [running, interactive]
+
+    interactive.finish()
+    for call in batch:
+        call.admitted.wait(2)
+        call.finish()
+    assert order == [running, interactive, *batch]  # FIFO within the batch class
+
+
+def test_batch_limit_leaves_a_slot_for_interactive():
+    scheduler = InferenceScheduler(max_concurrency=2, limits={"interactive": 2, "batch": 1})
+    order = []
+    first = Call(scheduler, "batch", order)
+    first.admitted.wait(2)
+    second = Call(scheduler, "batch", order)
+    wait_until(lambda: queued(scheduler, "batch") == 1)
+    assert not second.admitted.is_set()  # a slot is free, but batch is at its limit
+
+    interactive = Call(scheduler, "interactive", order)
+    assert interactive.admitted.wait(2)
+    metrics = scheduler.metrics()["classes"]
+    assert metrics["batch"]["active"] == 1 and metrics["interactive"]["active"] == 1
+
+    first.finish()
+    assert second.admitted.wait(2)
+    second.finish()
+    interactive.finish()
+    assert scheduler.metrics()["classes"]["batch"]["admitted"] == 2
+
+
+def test_total_concurrency_is_capped():
+    scheduler = InferenceScheduler(max_concurrency=2, limits={"interactive": 2, "batch": 2})
+    order = []
+    calls = [Call(scheduler, "interactive", order) for _ in range(3)]
+    wait_until(lambda: len(order) == 2 and queued(scheduler, "interactive") == 1)
+    calls[0].finish()
+    wait_until(lambda: len(order) == 3)
+    for call in calls[1:]:
+        call.finish()
+
+
+def test_priority_follows_the_calling_context():
+    assert current_priority() == "interactive"
+    with inference_priority("batch"):
+        assert current_priority() == "batch"
+    assert current_priority() == "interactive"
+
+    seen = []
+    thread = threading.Thread(target=lambda: (set_priority("batch"), seen.append(current_priority())))
+    thread.start()
+    thread.join()
+    assert seen == ["batch"] and current_priority() == "interactive"  # set_priority is per thread / context
+
+
+def test_unknown_priority_is_rejected():
+    scheduler = InferenceScheduler()
+    with pytest.raises(ValueError):
+        with scheduler.slot("urgent"):
+            pass
+    with pytest.raises(ValueError):
+        with inference_priority("urgent"):
+            pass
+
+
+def test_single_slot_runs_batch_and_lets_interactive_in_next():
+    scheduler = InferenceScheduler(max_concurrency=1)  # default limits
+    assert scheduler.limits == {"interactive": 1, "batch": 1}
+    order = []
+    running = Call(scheduler, "batch", order)
+    assert running.admitted.wait(2)  # batch is not starved when it is alone
+
+    queued_batch = Call(scheduler, "batch", order)
+    wait_until(lambda: queued(scheduler, "batch") == 1)
+    interactive = Call(scheduler, "interactive", order)
+    wait_until(lambda: queued(scheduler, "interactive") == 1)
+
+    running.finish()
+    assert interactive.admitted.wait(2)
+    assert not queued_batch.admitted.is_set()
+    interactive.finish()
+    assert queued_batch.admitted.wait(2)
+    queued_batch.finish()
+    assert order == [running, interactive, queued_batch]
+
+
+def test_interrupted_wait_gives_up_its_place_in_line():
+    scheduler = InferenceScheduler(max_concurrency=1, limits={"interactive": 1, "batch": 1})
+
+    def interrupted(cls, ticket):
+        raise KeyboardInterrupt
+
+    scheduler._admissible = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        with scheduler.slot("interactive"):
+            pass
+    del scheduler._admissible
+    assert queued(scheduler, "interactive") == 0
+
+    call = Call(scheduler, "interactive", [])
+    assert call.admitted.wait(2)
+    call.finish()
@@ -0,0 +1,74 @@
+"""SentenceScoreStore: one model pass per sentence, any grouping re-aggregated from the stored scores"""
+import re
+
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor import sentence_store, utils
+from backend.fear_monger_processor.sentence_store import SentenceScoreStore
+
+TEXT = "Fear is here. It is real! Calm down now. We are fine? Yes we are. The end."
+
+
+def fear_or_real(sentence):
+    return 0.8 if re.search(r"fear|real", sentence, re.IGNORECASE) else 0.2
+
+
+@pytest.fixture(autouse=True)
+def regex_sentences(monkeypatch):
+    # Same contract as split_sentences without the NLTK Punkt data download
+    def split(text):
+        return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+    monkeypatch.setattr(sentence_store, "split_sentences", split)
+    monkeypatch.setattr(utils, "split_sentences", split)
+
+
+@pytest.fixture
+def store(fake_classifier):
+    store = SentenceScoreStore(TEXT)
+    store.classifier = fake_classifier(score=fear_or_real)
+    store.score(store.classifier, show_progress=False, use_cache=False)
+    return store
+
+
+def test_sentences_are_scored_once(store):
+    assert len(store.classifier.batches) == 1 and sorted(store.classifier.batches[0]) == sorted(store.sentences)
+    store.score(store.classifier, show_progress=False, use_cache=False)
+    for max_chars, max_sentences in ((20, 5), (40, 2), (400, 5)):
+        store.paragraphs(max_chars=max_chars, max_sentences=max_sentences)
+    assert len(store.classifier.batches) == 1
+
+
+@pytest.mark.parametrize("max_chars, max_sentences", [(20, 5), (30, 2), (40, 3), (400, 5)])
+def test_paragraphs_match_segment_text(store, max_chars, max_sentences):
+    paragraphs, scores = store.paragraphs(max_chars=max_chars, max_sentences=max_sentences)
+    assert paragraphs == utils.segment_text(TEXT, max_chars=max_chars, max_sentences=max_sentences)
+    assert scores.dtype == np.float32 and len(scores) == len(paragraphs)
+
+
+def test_mean_is_length_weighted_and_max_takes_the_worst_sentence(store):
+    paragraphs, mean = store.paragraphs(max_chars=400, max_sentences=3, how="mean")
+    _, worst = store.paragraphs(max_chars=400, max_sentences=3, how="max")
+    assert paragraphs == ["Fear is here. It is real! Calm down now.", "We are fine? Yes we are. The end."]
+
+    np.testing.assert_allclose(worst, [0.8, 0.2])
+    lengths = [len("Fear is here."), len("It is real!"), len("Calm down now.")]
+    expected = (0.8 * lengths[0] + 0.8 * lengths[1] + 0.2 * lengths[2]) / sum(lengths)
+    np.testing.assert_allclose(mean, [expected, 0.2], rtol=1e-6)
+
+
+def test_aggregating_needs_scores_and_a_known_mode(fake_classifier):
+    unscored = SentenceScoreStore(TEXT)
+    with pytest.raises(RuntimeError):
+        unscored.paragraphs()
+    unscored.score(fake_classifier(score=fear_or_real), show_progress=False, use_cache=False)
+    with pytest.raises(ValueError):
+        unscored.paragraphs(how="median")
+
+
+def test_empty_transcript(fake_classifier):
+    empty = SentenceScoreStore("")
+    empty.score(fake_classifier(score=fear_or_real), show_progress=False, use_cache=False)
+    paragraphs, scores = empty.paragraphs()
+    assert paragraphs == [] and scores.shape == (0,)
@@ -0,0 +1,84 @@
+"""MicroBatcher coalescing and the /predict route of the inference server, with a fake classifier"""
+import asyncio
+import json
+
+import pytest
+
+from backend.fear_monger_processor.server import MicroBatcher, make_handler
+
+
+def run_with_batcher(batcher, scenario):
+    async def main():
+        collector = asyncio.create_task(batcher.run())
+        try:
+            return await scenario()
+        finally:
+            collector.cancel()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_model_call_and_get_their_own_scores(fake_classifier):
+    classifier = fake_classifier()
+    batcher = MicroBatcher(classifier, max_batch=64, max_wait_ms=50, use_cache=False)
+    requests = [["a", "bb"], ["ccc"], ["bb", "dddd", "a"]]
+
+    results = run_with_batcher(batcher, lambda: asyncio.gather(*(batcher.predict(r) for r in requests)))
+
+    assert results == [[pytest.approx(len(p) / 100) for p in request] for request in requests]
+    assert len(classifier.batches) == 1
+    assert sorted(classifier.batches[0]) == ["a", "bb", "ccc", "dddd"]  # duplicates across requests scored once
+    assert batcher.stats["requests"] == 3 and batcher.stats["model_calls"] == 1
+    assert batcher.stats["paragraphs"] == 6 and batcher.stats["duplicates"] == 2
+
+
+def test_a_full_batch_does_not_wait_for_more_requests(fake_classifier):
+    classifier = fake_classifier()
+    batcher = MicroBatcher(classifier, max_batch=2, max_wait_ms=10_000, use_cache=False)
+
+    async def scenario():
+        return await asyncio.wait_for(batcher.predict(["one", "two"]), timeout=5)
+
+    assert run_with_batcher(batcher, scenario) == [pytest.approx(0.03), pytest.approx(0.03)]
+
+
+def test_model_errors_reach_every_coalesced_request(fake_classifier):
+    batcher = MicroBatcher(fake_classifier(fail=True), max_wait_ms=50, use_cache=False)
+
+    async def scenario():
+        return await asyncio.gather(batcher.predict(["a"]), batcher.predict(["b"]), return_exceptions=True)
+
+    results = run_with_batcher(batcher, scenario)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_unknown_priority_is_rejected(fake_classifier):
+    batcher = MicroBatcher(fake_classifier(), use_cache=False)
+    with pytest.raises(ValueError):
+        run_with_batcher(batcher, lambda: batcher.predict(["a"], priority="urgent"))
+
+
+async def post(port, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    status_line, _, response = (await reader.read()).partition(b"\r\n")
+    writer.close()
+    return int(status_line.split()[1]), json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def test_predict_route_over_http(fake_classifier):
+    batcher = MicroBatcher(fake_classifier(), max_wait_ms=5, use_cache=False)
+
+    async def scenario():
+        server = await asyncio.start_server(make_handler(batcher, {}), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            ok = await post(port, {"paragraphs": ["abcd", "ab"], "priority": "batch"})
+            bad = await post(port, {"paragraphs": "not a list"})
+        return ok, bad
+
+    (ok_status, ok_body), (bad_status, bad_body) = run_with_batcher(batcher, scenario)
+    assert ok_status == 200 and ok_body["scores"] == [pytest.approx(0.04), pytest.approx(0.02)]
+    assert bad_status == 400 and "paragraphs" in bad_body["error"]
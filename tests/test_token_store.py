@@ -0,0 +1,125 @@
+"""Pre-tokenized corpus store: layout, reuse and scoring from the memory map, with a fake tokenizer"""
+import re
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from backend.fear_monger_processor import utils  # noqa: E402
+from backend.fear_monger_processor.inference import softmax  # noqa: E402
+from backend.fear_monger_processor.token_store import (  # noqa: E402
+    build_token_store, open_token_store, score_store, store_key,
+)
+
+TRANSCRIPTS = [
+    "Fear is coming. Nobody is safe! Act now.",
+    "",
+    "Calm down, café owners. All is well. Really well. Thank you.",
+]
+
+
+class WordTokenizer:
+    """[CLS] + one id per word (its length) + [SEP]"""
+
+    pad_token_id = 0
+    all_special_ids = [0, 101, 102]
+    do_lower_case = True
+
+    def __init__(self, vocab_size=50):
+        self.vocab = {"[PAD]": 0, "[CLS]": 101, "[SEP]": 102, **{f"len{i}": i for i in range(1, vocab_size)}}
+
+    def get_vocab(self):
+        return self.vocab
+
+    def __call__(self, texts, truncation=False, max_length=None, **kwargs):
+        ids = [[101] + [len(word) for word in text.split()] + [102] for text in texts]
+        return {"input_ids": [row[:max_length] if truncation and max_length else row for row in ids]}
+
+
+class IdsClassifier:
+    """ONNX-like engine: the fear logit is a tenth of the token count, from ids or from text"""
+
+    input_names = ["input_ids", "attention_mask"]
+    fear_index = 1
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.session = self
+        self.texts_scored = 0
+
+    def run(self, outputs, feeds):
+        tokens = feeds["attention_mask"].sum(axis=1)
+        return [np.stack([np.zeros(len(tokens)), tokens / 10], axis=1)]
+
+    def predict_proba(self, texts):
+        self.texts_scored += len(texts)
+        tokens = np.array([len(ids) for ids in self.tokenizer(texts)["input_ids"]])
+        return softmax(np.stack([np.zeros(len(tokens)), tokens / 10], axis=1))[:, 1]
+
+
+@pytest.fixture(autouse=True)
+def regex_sentences(monkeypatch):
+    # Same contract as split_sentences without the NLTK Punkt data download
+    monkeypatch.setattr(utils, "split_sentences",
+                        lambda text: [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()])
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "transcripts.csv"
+    pd.DataFrame({"url": ["a", "b", "c"], "transcript": TRANSCRIPTS}).to_csv(path, index=False)
+    return path
+
+
+def build(tokenizer, source, root):
+    return build_token_store(tokenizer, source=source, root=root, max_chars=30, max_sentences=2, chunk=2)
+
+
+def test_layout_matches_segmentation_and_tokenization(tmp_path, source):
+    tokenizer = WordTokenizer()
+    store = build(tokenizer, source, tmp_path / "store")
+
+    segments = [utils.segment_text(text, max_chars=30, max_sentences=2) if text else [] for text in TRANSCRIPTS]
+    flat = [para for talk in segments for para in talk]
+    assert store.talks == 3 and len(store) == len(flat)
+    assert [store.text(i) for i in range(len(store))] == flat  # UTF-8 round trip ("café")
+    assert [len(store.talk_segments(t)) for t in range(3)] == [len(talk) for talk in segments]
+    for i, ids in enumerate(tokenizer(flat)["input_ids"]):
+        assert store.input_ids(i).tolist() == ids
+    assert store.meta["urls"] == ["a", "b", "c"] and store.meta["tokens"] == int(store.lengths.sum())
+
+
+def test_store_is_reused_until_the_source_or_tokenizer_changes(tmp_path, source):
+    root = tmp_path / "store"
+    tokenizer = WordTokenizer()
+    assert open_token_store(tokenizer, source=source, root=root, max_chars=30, max_sentences=2, build=False) is None
+    built = build(tokenizer, source, root)
+    reopened = open_token_store(tokenizer, source=source, root=root, max_chars=30, max_sentences=2, build=False)
+    assert reopened.path == built.path
+
+    key = store_key(tokenizer, source, 30, 2)
+    assert store_key(WordTokenizer(vocab_size=60), source, 30, 2) != key
+    source.write_text(source.read_text() + "d,More text here.\n")
+    assert store_key(tokenizer, source, 30, 2) != key
+
+
+def test_scores_from_stored_ids_match_scoring_the_text(tmp_path, source):
+    tokenizer = WordTokenizer()
+    store = build(tokenizer, source, tmp_path / "store")
+    classifier = IdsClassifier(tokenizer)
+
+    scores = score_store(classifier, store, use_cache=False)
+    assert classifier.texts_scored == 0  # the model read the memory-mapped ids
+    expected = classifier.predict_proba([store.text(i) for i in range(len(store))])
+    np.testing.assert_allclose(scores, expected, rtol=1e-6)
+
+    subset = [2, 0]
+    np.testing.assert_allclose(score_store(classifier, store, segments=subset, use_cache=False), expected[subset],
+                               rtol=1e-6)
+
+
+def test_a_store_from_another_tokenizer_is_rejected(tmp_path, source):
+    store = build(WordTokenizer(), source, tmp_path / "store")
+    with pytest.raises(ValueError):
+        score_store(IdsClassifier(WordTokenizer(vocab_size=60)), store, use_cache=False)
@@ -0,0 +1,118 @@
+"""Batching, packing, windowing and the token report of tokens.py, with a small fake tokenizer"""
+import re
+
+from backend.fear_monger_processor.tokens import make_batches, pack_by_tokens, token_report, token_windows
+
+
+class PieceTokenizer:
+    """WordPiece-like: a word's first piece has 2 characters, continuation pieces 4.
+
+    A substring that starts inside a word is re-tokenized from a fresh word start, so it
+    can take more pieces than it had inside the full text (as with real subword tokenizers).
+    """
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    @staticmethod
+    def offsets(text):
+        spans = []
+        for word in re.finditer(r"\S+", text):
+            start, end = word.span()
+            spans.append((start, min(start + 2, end)))
+            for piece in range(start + 2, end, 4):
+                spans.append((piece, min(piece + 4, end)))
+        return spans
+
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False, truncation=False,
+                 max_length=None):
+        single = isinstance(texts, str)
+        ids, offsets = [], []
+        for text in [texts] if single else texts:
+            spans = self.offsets(text)
+            row = list(range(1, len(spans) + 1))
+            if add_special_tokens:
+                row = [0] + row + [0]
+            if truncation and max_length:
+                row = row[:max_length]
+            ids.append(row)
+            offsets.append(spans)
+        encoded = {"input_ids": ids[0] if single else ids}
+        if return_offsets_mapping:
+            encoded["offset_mapping"] = offsets[0] if single else offsets
+        return encoded
+
+
+TOKENIZER = PieceTokenizer()
+TEXT = " ".join(f"w{i}" + "x" * (i % 11) for i in range(200))  # words of 1 to 4 pieces
+
+
+def pieces(text):
+    return len(TOKENIZER.offsets(text))
+
+
+def test_make_batches_are_length_sorted_and_complete():
+    lengths = [5, 1, 9, 3, 3, 7, 2]
+    batches = make_batches(lengths, batch_size=3)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    flat = [i for batch in batches for i in batch]
+    assert sorted(flat) == list(range(len(lengths)))
+    assert [lengths[i] for i in flat] == sorted(lengths)
+    assert make_batches([], batch_size=4) == []
+
+
+def test_pack_by_tokens_respects_both_budgets():
+    sentences = [f"Sentence {i} " + "word " * (i % 5) for i in range(30)]
+    paragraphs = pack_by_tokens(sentences, TOKENIZER, max_tokens=16, max_sentences=3)
+
+    assert " ".join(paragraphs) == " ".join(sentences)
+    for para in paragraphs:
+        assert pieces(para) + 2 <= 16
+    assert len(paragraphs) >= len(sentences) / 3
+
+
+def test_pack_by_tokens_keeps_an_oversized_sentence_alone():
+    long = "y" * 200  # 1 + 50 pieces
+    assert pack_by_tokens(["a b", long, "c d"], TOKENIZER, max_tokens=16) == ["a b", long, "c d"]
+
+
+def test_token_windows_fit_after_retokenizing():
+    for max_length, overlap in ((12, 3), (20, 5), (33, 0)):
+        windows, counts = token_windows(TEXT, TOKENIZER, max_length=max_length, overlap=overlap)
+        assert len(windows) > 1
+        for window, count in zip(windows, counts):
+            assert window in TEXT and window == window.strip()
+            assert count == pieces(window) <= max_length - 2
+        assert TEXT.startswith(windows[0]) and TEXT.endswith(windows[-1])
+
+
+def test_token_windows_cut_between_words_and_cover_the_text():
+    windows, _ = token_windows(TEXT, TOKENIZER, max_length=20, overlap=4)
+    words = TEXT.split()
+    covered = set()
+    for window in windows:
+        first = words.index(window.split()[0])
+        assert window.split() == words[first:first + len(window.split())]  # whole words only
+        covered.update(range(first, first + len(window.split())))
+    assert covered == set(range(len(words)))
+
+
+def test_token_windows_split_a_word_longer_than_the_budget():
+    text = "short " + "z" * 120 + " tail"
+    windows, counts = token_windows(text, TOKENIZER, max_length=12)
+    assert all(count <= 10 for count in counts)
+    assert windows[0] == "short" or windows[0].startswith("short z")
+
+
+def test_short_text_is_one_window():
+    assert token_windows("a few words", TOKENIZER, max_length=12) == (["a few words"], [5])  # a | fe w | wo rds
+
+
+def test_token_report_counts_padding_and_truncation():
+    # piece counts 1, 3, 9 (+2 specials each): 3, 5, 11 tokens; the 11-token segment is truncated to 8
+    paragraphs = ["ab", "abcdefghij", "a" * 34]
+    report = token_report(paragraphs, TOKENIZER, batch_size=2, max_length=8)
+    assert report["tokens"] == 3 + 5 + 8
+    assert report["padding_tokens"] == 2  # batches [3, 5] and [8]
+    assert report["truncated_segments"] == 1 and report["truncated_tokens"] == 3
+    assert report["context_fill"] == (3 + 5 + 8) / (3 * 8)
@@ -0,0 +1,65 @@
+"""Proportional allocation, stratified draws and the stratified estimator of triage.py"""
+import numpy as np
+import pytest
+
+from backend.fear_monger_processor.triage import TalkSample, allocate, stratified_estimate
+
+
+def test_allocate_is_proportional_and_capped():
+    assert allocate([10, 20, 70], 10).tolist() == [1, 2, 7]
+    assert allocate([2, 3], 10).tolist() == [2, 3]  # never more than the population
+    assert allocate([5, 5], 0).tolist() == [0, 0]
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        sizes = rng.integers(1, 10, size=rng.integers(1, 7))
+        n = int(rng.integers(0, sizes.sum() + 3))
+        counts = allocate(sizes, n)
+        assert counts.sum() == min(n, sizes.sum())
+        assert np.all(counts <= sizes) and np.all(counts >= 0)
+
+
+def test_draw_spends_the_whole_budget_when_a_stratum_is_ahead():
+    sample = TalkSample(list(range(12)), strata=2, rng=np.random.default_rng(0))
+    sample.taken[:] = [4, 0]  # stratum 0 already past its share of any 6-segment sample
+    drawn = sample.draw(2)
+    assert [len(d) for d in drawn] == [0, 2]
+    assert sample.sampled == 6
+
+
+def test_draws_return_exactly_k_until_the_talk_runs_out():
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        n = int(rng.integers(1, 60))
+        sample = TalkSample(list(range(n)), strata=int(rng.integers(1, 6)), rng=rng)
+        seen = []
+        while sample.sampled < n:
+            k = int(rng.integers(1, 8))
+            before = sample.sampled
+            drawn = sample.draw(k)
+            assert sum(len(d) for d in drawn) == min(k, n - before) == sample.sampled - before
+            seen.extend(int(i) for d in drawn for i in d)
+        assert sorted(seen) == list(range(n))  # every segment once, none twice
+
+
+def test_stratified_estimate_is_unbiased_on_a_known_population():
+    rng = np.random.default_rng(2)
+    population = [rng.beta(2, 5, size=20), rng.beta(5, 2, size=30), rng.beta(1, 1, size=50)]
+    true_mean = float(np.concatenate(population).mean())
+    sizes, samples = [20, 30, 50], [3, 4, 5]
+
+    estimates, covered = [], 0
+    for _ in range(4000):
+        values = [rng.choice(stratum, size=n, replace=False) for stratum, n in zip(population, samples)]
+        mean, low, high = stratified_estimate(values, sizes, samples)
+        estimates.append(mean)
+        covered += low <= true_mean <= high
+    assert np.mean(estimates) == pytest.approx(true_mean, abs=0.005)
+    assert covered / 4000 > 0.8  # near the nominal 95% (small strata make it a little lower)
+
+
+def test_full_census_has_a_zero_width_interval():
+    values = [np.array([0.1, 0.3]), np.array([0.9, 0.5, 0.7])]
+    mean, low, high = stratified_estimate(values, [2, 3], [2, 3])
+    assert mean == pytest.approx(2.5 / 5)
+    assert low == pytest.approx(mean) and high == pytest.approx(mean)
@@ -0,0 +1,100 @@
+"""ZeroShotClassifier pair building, cache namespace and output order, with a stub tokenizer and NLI model"""
+import sys
+import types
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from backend.fear_monger_processor import zero_shot  # noqa: E402
+from backend.fear_monger_processor.config import MAX_TOKENS  # noqa: E402
+from backend.fear_monger_processor.scheduler import InferenceScheduler  # noqa: E402
+
+CLS, SEP = 1, 2
+HYPOTHESES = ("x", "yy", "zzz")
+
+
+class StubTokenizer:
+    """One id per character; BERT-style pairs: [CLS] premise [SEP] hypothesis [SEP]"""
+
+    model_input_names = ["input_ids", "attention_mask"]
+
+    def __call__(self, texts, add_special_tokens=True, truncation=False, max_length=None):
+        ids = [[ord(c) for c in text] for text in texts]
+        if truncation:
+            ids = [row[:max_length] for row in ids]
+        return {"input_ids": ids}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 3 if pair else 2
+
+    def build_inputs_with_special_tokens(self, first, second):
+        return [CLS, *first, SEP, *second, SEP]
+
+    def pad(self, features, return_tensors=None):
+        width = max(len(f["input_ids"]) for f in features)
+        ids = [f["input_ids"] + [0] * (width - len(f["input_ids"])) for f in features]
+        mask = [[1] * len(f["input_ids"]) + [0] * (width - len(f["input_ids"])) for f in features]
+        return {"input_ids": torch.tensor(ids), "attention_mask": torch.tensor(mask)}
+
+
+class StubNLIModel(torch.nn.Module):
+    """Entailment probability (premise * 3 + hypothesis + 1) / 10, read off the first premise and last hypothesis id"""
+
+    config = types.SimpleNamespace(label2id={"CONTRADICTION": 0, "NEUTRAL": 1, "ENTAILMENT": 2})
+
+    def forward(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(dim=1)
+        premise = input_ids[:, 1] - ord("A")
+        hypothesis = input_ids[torch.arange(len(input_ids)), lengths - 2] - ord("x")
+        p = (premise * 3 + hypothesis + 1).double() / 10
+        logits = torch.zeros(len(input_ids), 3, dtype=torch.float64)
+        logits[:, 2] = torch.log(p / (1 - p))
+        return types.SimpleNamespace(logits=logits)
+
+
+@pytest.fixture
+def make_classifier(monkeypatch):
+    fake = types.ModuleType("transformers")
+    fake.AutoTokenizer = types.SimpleNamespace(from_pretrained=lambda name, revision=None: StubTokenizer())
+    fake.AutoModelForSequenceClassification = types.SimpleNamespace(
+        from_pretrained=lambda name, revision=None: StubNLIModel()
+    )
+    monkeypatch.setitem(sys.modules, "transformers", fake)
+    monkeypatch.setattr(zero_shot, "resolve_revision", lambda model_name, revision: "sha")
+
+    def make(hypotheses=HYPOTHESES, aggregate="max", pair_batch_size=2):
+        return zero_shot.ZeroShotClassifier(model_name="test/nli", hypotheses=hypotheses, aggregate=aggregate,
+                                            pair_batch_size=pair_batch_size, scheduler=InferenceScheduler())
+    return make
+
+
+def test_long_premise_is_truncated_but_keeps_the_hypothesis(make_classifier):
+    classifier = make_classifier()
+    pairs = classifier.pairs(["A" * (MAX_TOKENS * 2)])
+
+    assert len(pairs) == len(HYPOTHESES)
+    for pair, hypothesis in zip(pairs, HYPOTHESES):
+        ids = pair["input_ids"]
+        assert len(ids) == MAX_TOKENS
+        assert ids[-len(hypothesis) - 1:] == [ord(c) for c in hypothesis] + [SEP]
+
+
+def test_cache_revision_depends_on_hypotheses_and_aggregate(make_classifier):
+    base = make_classifier()
+    assert base.cache_revision.startswith("test/nli@sha+nli-")
+    assert make_classifier().cache_revision == base.cache_revision
+    assert make_classifier(hypotheses=("x", "yy")).cache_revision != base.cache_revision
+    assert make_classifier(aggregate="mean").cache_revision != base.cache_revision
+
+
+def test_entailment_is_premise_major_despite_length_sorted_batches(make_classifier):
+    classifier = make_classifier()
+    texts = ["A", "BBBBBB"]  # different lengths, so the pair batches mix premises
+
+    entailment = classifier.entailment(texts)
+    assert entailment.shape == (2, 3)
+    assert entailment.ravel().tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+
+    assert classifier.predict_proba(texts).tolist() == pytest.approx([0.3, 0.6])
+    assert make_classifier(aggregate="mean").predict_proba(texts).tolist() == pytest.approx([0.2, 0.5])